@@ -1,17 +1,28 @@
 import os
 import sys
 import curses
+import importlib
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 BIN_DIR = os.path.join(BASE_DIR, "bin")
 if BIN_DIR not in sys.path:
     sys.path.insert(0, BIN_DIR)
 
-from impact_setup_pdb import run_setup_pdb
-from impact_setup_namd import run_setup_namd
-from impact_config_editor import run_config_editor
-from impact_run_namd import run_run_namd
-from impact_run_gamd import run_run_gamd
+from impact_render import begin_frame, end_frame
+
+# Submenus are imported the first time they are opened, in MENU order;
+# diagnostics/startup_bench.py checks none of them load before the first frame
+SUBMENUS = [
+    ("impact_setup_pdb", "run_setup_pdb"),
+    ("impact_setup_namd", "run_setup_namd"),
+    ("impact_run_namd", "run_run_namd"),
+    ("impact_run_gamd", "run_run_gamd"),
+    ("impact_config_editor", "run_config_editor"),
+]
+
+def load_submenu(idx):
+    mod, fn = SUBMENUS[idx]
+    return getattr(importlib.import_module(mod), fn)
 
 TITLE = "IMPACT – Interactive Molecular Processing and Analysis for Contact/TCRs"
 MENU = ["1) Setup PDB", "2) Setup NAMD", "3) Run NAMD", "4) Run GaMD", "5) Change config"]
@@ -50,7 +61,7 @@ def setup_attrs():
     return hint_attr, warn_attr
 
 def draw_too_small(stdscr, stage, hint_attr, warn_attr):
-    stdscr.clear()
+    begin_frame(stdscr)
     h, w = stdscr.getmaxyx()
     center(stdscr, max(0, h // 2 - 2), f"Terminal too small: {w}x{h}")
     center(stdscr, h // 2 - 1, f"Resize to at least {MIN_W}x{MIN_H}.", hint_attr)
@@ -60,10 +71,10 @@ def draw_too_small(stdscr, stage, hint_attr, warn_attr):
     else:
         center(stdscr, h // 2 + 1, "Warning: UI may render incorrectly at this size.", warn_attr)
         center(stdscr, h // 2 + 2, "Press B again to continue anyway • Esc/q to cancel", warn_attr)
-    stdscr.refresh()
+    end_frame(stdscr)
 
 def draw_menu(stdscr, idx, hint_attr, ignore_min=False):
-    stdscr.clear()
+    begin_frame(stdscr)
     h, w = stdscr.getmaxyx()
     if not ignore_min and (h < MIN_H or w < MIN_W):
         return False
@@ -75,7 +86,7 @@ def draw_menu(stdscr, idx, hint_attr, ignore_min=False):
     y_exit = max(0, h - 2)
     a = curses.A_REVERSE if idx == len(MENU) else 0
     center(stdscr, y_exit, EXIT, a)
-    stdscr.refresh()
+    end_frame(stdscr)
     return True
 
 def menu(stdscr, hint_attr, warn_attr):
@@ -121,18 +132,11 @@ def main(stdscr):
         choice = menu(stdscr, hint_attr, warn_attr)
         if choice == len(MENU) or choice is None:
             break
-        if choice == 0:
-            run_setup_pdb(stdscr, hint_attr)
-        elif choice == 1:
-            run_setup_namd(stdscr, hint_attr)
-        elif choice == 2:
-            run_run_namd(stdscr, hint_attr)
-        elif choice == 3:
-            run_run_gamd(stdscr, hint_attr)
-        elif choice == 4:
-            run_config_editor(stdscr, hint_attr)
-        else:
-            pass
+        if 0 <= choice < len(SUBMENUS):
+            load_submenu(choice)(stdscr, hint_attr)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from impact_cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
     curses.wrapper(main)
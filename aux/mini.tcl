@@ -10,6 +10,7 @@ set output_file "${prefix}-mini-LF.pdb"
 
 mol new $psf_file
 mol addfile $dcd_file waitfor all
-animate write pdb $output_file beg 99 end 99
+set last [expr {[molinfo top get numframes] - 1}]
+animate write pdb $output_file beg $last end $last
 quit
 
@@ -0,0 +1,32 @@
+#!/bin/bash
+#SBATCH --time=00:15:00
+#SBATCH --nodes=1
+#SBATCH --ntasks=1
+
+# Usage: sbatch --dependency=afterok:<mini_jobid> run_mini_lf.sh <aux_dir> <combined>
+# Submitted from the target's run directory. Writes <combined>-mini-LF.pdb
+# next to the PSF from the last minimization frame so the dependent equil
+# job can start from it. bin/impact_lf_extract.py does this natively; VMD
+# (mini.tcl) is only used if that fails, e.g. without Python/NumPy.
+
+# Arguments
+aux_dir=$1
+combined=$2
+
+set -euo pipefail
+
+rm -f mini/*.restart.*
+
+bin_dir="${aux_dir}/../bin"
+if ! python3 "${bin_dir}/impact_lf_extract.py" --force "$PWD"; then
+  echo "Native LF extraction failed; falling back to VMD" >&2
+  module load vmd
+  # mini.tcl resolves ./<combined>/mini relative to the NAMD_PROC_DIR root
+  (cd .. && vmd -dispdev text -e "${aux_dir}/mini.tcl" -args "${combined}")
+  if [[ -f "mini/${combined}-mini-LF.pdb" ]]; then
+    mv -f "mini/${combined}-mini-LF.pdb" "${combined}-mini-LF.pdb"
+  fi
+fi
+
+# Fail the job (and hold the afterok chain) if no LF frame was written
+test -f "${combined}-mini-LF.pdb"
@@ -0,0 +1,229 @@
+# bin/impact_analysis.py
+# Contact maps for many systems on a process pool. The work is split into
+# (system, segment, frame range) tasks; each worker reads its range in
+# CHUNK_FRAMES chunks, so its memory stays at one chunk of the selected
+# atoms whatever the trajectory length. Every finished task leaves a sparse
+# partial result in
+#   <run>/analysis/.contacts-<key>/<segment>.<start>-<stop>.<tag>.npz
+# where <key> hashes the selections, cutoff and stride and <tag> the frames
+# the range was read from (see range_tag), so a segment rewritten with the
+# same length is recomputed. A rerun (after an interrupt, or once more
+# frames exist) only runs the missing ranges; the per-system map is the sum
+# of its parts. decimated=True runs on the
+# analysis/<name>-solute.qtrj copy (impact_decimate) instead of the DCDs.
+import os
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import impact_contacts as contacts
+from impact_config import load_config
+from impact_dcd import DCDError
+from impact_decimate import QTrajError, QTrajFile, open_trajectory
+from impact_project_index import get_project_index
+from impact_topology import TopologyError, load_psf
+
+FRAMES_PER_TASK = 2000
+TAG_ATOMS = 4096
+
+class Task(NamedTuple):
+    name: str
+    segment: str
+    dcd: str
+    start: int
+    stop: int
+    stride: int
+    part: str                 # where the partial result goes
+
+class Job(NamedTuple):
+    name: str
+    run_dir: str
+    iface: contacts.Interface
+    part_dir: str
+    tasks: List[Task]         # every range of every segment
+    todo: List[Task]          # ranges without a part file yet
+
+def part_key(sel_a: str, sel_b: str, cutoff: float, stride: int, decimated: bool = False) -> str:
+    key = f"{sel_a}|{sel_b}|{cutoff:g}|{stride}" + ("|decimated" if decimated else "")
+    return hashlib.sha1(key.encode()).hexdigest()[:10]
+
+def range_tag(traj, start: int, stop: int) -> str:
+    # A .qtrj is rebuilt as a whole: its sources and parameters identify it.
+    # A DCD only grows in place, so the first and last frame of the range
+    # (the leading atoms of each, plus the cell) tell a rewrite apart
+    # without reading the whole range.
+    h = hashlib.sha1()
+    if isinstance(traj, QTrajFile):
+        h.update(json.dumps([traj.meta.get(k) for k in ("sources", "stride", "precision", "strip")]).encode())
+    else:
+        for i in sorted({start, stop - 1}):
+            for ax in traj.coords(i, i + 1):
+                h.update(np.ascontiguousarray(ax[0, :TAG_ATOMS]).tobytes())
+            box = traj.boxes(i, i + 1)
+            if box is not None:
+                h.update(np.ascontiguousarray(box).tobytes())
+    return h.hexdigest()[:10]
+
+def plan(namd_proc_dir: str, name: str, sel_a: str, sel_b: str, cutoff: float = contacts.DEFAULT_CUTOFF,
+         stride: int = 1, pattern: Optional[str] = None, frames_per_task: int = FRAMES_PER_TASK,
+         decimated: bool = False) -> Job:
+    if stride < 1 or frames_per_task < 1:
+        raise ValueError("stride and frames per task must be at least 1")
+    run_dir = os.path.join(namd_proc_dir, name)
+    trajs = contacts.trajectories(run_dir, name, pattern, decimated)
+    if not trajs:
+        raise contacts.ContactError(contacts.missing(name, decimated))
+    iface = contacts.interface(load_psf(contacts.psf_path(run_dir, name)), sel_a, sel_b, cutoff)
+    key = part_key(sel_a, sel_b, cutoff, stride, decimated)
+    part_dir = os.path.join(run_dir, contacts.RESULT_DIR, f".contacts-{key}")
+    # Ranges start on a multiple of stride so a split run picks the same frames
+    span = max(stride, frames_per_task - frames_per_task % stride)
+    tasks = []
+    for seg, dcd in trajs:
+        with open_trajectory(dcd) as traj:
+            n = len(traj)
+            for s in range(0, n, span):
+                e = min(n, s + span)
+                tag = range_tag(traj, s, e)
+                part = os.path.join(part_dir, f"{seg.replace('/', '_')}.{s}-{e}.{tag}.npz")
+                tasks.append(Task(name, seg, dcd, s, e, stride, part))
+    todo = [t for t in tasks if not os.path.isfile(t.part)]
+    return Job(name, run_dir, iface, part_dir, tasks, todo)
+
+def _save_part(path: str, counts: np.ndarray, nframes: int):
+    ii, jj = np.nonzero(counts)
+    fd, tmp = tempfile.mkstemp(prefix=".part.", suffix=".npz", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, pairs=np.stack((ii, jj), axis=1).astype(np.int32), counts=counts[ii, jj], nframes=nframes)
+        os.replace(tmp, path)
+    except Exception:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+
+def run_task(task: Task, iface: contacts.Interface, chunk: int = contacts.CHUNK_FRAMES) -> Tuple[Task, int]:
+    # Worker side: one frame range of one DCD -> part file
+    counts, n = contacts.count_contacts(task.dcd, iface, task.start, task.stop, task.stride, chunk)
+    os.makedirs(os.path.dirname(task.part), exist_ok=True)
+    _save_part(task.part, counts, n)
+    return task, n
+
+def reduce(job: Job) -> contacts.ContactMap:
+    # Sum the parts of every planned range; parts from older plans are removed
+    iface = job.iface
+    total = np.zeros((len(iface.labels_a), len(iface.labels_b)), dtype=np.int64)
+    per_seg: Dict[str, int] = {}
+    for t in job.tasks:
+        with np.load(t.part) as z:
+            p = z["pairs"]
+            np.add.at(total, (p[:, 0], p[:, 1]), z["counts"])
+            per_seg[t.segment] = per_seg.get(t.segment, 0) + int(z["nframes"])
+    keep = {os.path.basename(t.part) for t in job.tasks}
+    for f in os.listdir(job.part_dir) if os.path.isdir(job.part_dir) else ():
+        if f.endswith(".npz") and f not in keep:
+            try: os.unlink(os.path.join(job.part_dir, f))
+            except OSError: pass
+    return contacts.ContactMap(job.name, iface.labels_a, iface.labels_b, total, sum(per_seg.values()),
+                               iface.cutoff, iface.sel_a, iface.sel_b, list(per_seg.items()))
+
+def workers_from_conf(conf) -> int:
+    return conf.get_int("ANALYSIS_WORKERS", os.cpu_count() or 1, minimum=1)
+
+def run(namd_proc_dir: str, names: List[str], sel_a: str, sel_b: str, cutoff: float = contacts.DEFAULT_CUTOFF,
+        stride: int = 1, pattern: Optional[str] = None, workers: int = 1,
+        frames_per_task: int = FRAMES_PER_TASK, chunk: int = contacts.CHUNK_FRAMES, log=None,
+        decimated: bool = False) -> List[dict]:
+    # One result dict per system: name, ok, detail (+ path, nframes, pairs)
+    log = log or (lambda m: None)
+    results: Dict[str, dict] = {}
+    jobs: Dict[str, Job] = {}
+    for n in names:
+        try:
+            jobs[n] = plan(namd_proc_dir, n, sel_a, sel_b, cutoff, stride, pattern, frames_per_task, decimated)
+        except (OSError, ValueError, DCDError, QTrajError, TopologyError, contacts.ContactError) as e:
+            results[n] = {"name": n, "ok": False, "detail": str(e)}
+    pending = {n: len(j.todo) for n, j in jobs.items()}
+    failed: Dict[str, str] = {}
+    total = sum(pending.values())
+    log(f"{total} task(s) to run, {sum(len(j.tasks) for j in jobs.values()) - total} already done, {workers} worker(s)")
+
+    def finish(n):
+        job = jobs[n]
+        if n in failed:
+            results[n] = {"name": n, "ok": False, "detail": failed[n]}
+            return
+        cm = reduce(job)
+        path = contacts.save(cm, contacts.result_path(job.run_dir, n))
+        results[n] = {"name": n, "ok": True, "path": path, "nframes": cm.nframes,
+                      "pairs": int(np.count_nonzero(cm.counts)),
+                      "detail": f"{cm.nframes} frames, {int(np.count_nonzero(cm.counts))} pairs"}
+
+    for n in [n for n, k in pending.items() if k == 0]:
+        finish(n)
+    if total:
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, total))) as pool:
+            futs = {pool.submit(run_task, t, jobs[t.name].iface, chunk): t for j in jobs.values() for t in j.todo}
+            done = 0
+            try:
+                for f in as_completed(futs):
+                    t = futs[f]
+                    done += 1
+                    try:
+                        _task, nf = f.result()
+                        log(f"[{done}/{total}] {t.name} {t.segment} {t.start}-{t.stop}: {nf} frames")
+                    except Exception as e:
+                        failed.setdefault(t.name, f"{t.segment} {t.start}-{t.stop}: {e}")
+                        log(f"[{done}/{total}] {t.name} {t.segment} {t.start}-{t.stop}: failed: {e}")
+                    pending[t.name] -= 1
+                    if pending[t.name] == 0:
+                        finish(t.name)
+            except KeyboardInterrupt:
+                for f in futs:
+                    f.cancel()
+                log("interrupted; finished ranges are kept and skipped on the next run")
+                raise
+    return [results[n] for n in names]
+
+def main(argv=None) -> int:
+    conf = load_config()
+    sel_a, sel_b, cutoff = contacts.conf_selections(conf)
+    ap = argparse.ArgumentParser(description="Contact maps for many systems on a process pool (resumable)")
+    ap.add_argument("names", nargs="*", help="run names (default: every GaMD candidate)")
+    ap.add_argument("--sel-a", default=sel_a)
+    ap.add_argument("--sel-b", default=sel_b)
+    ap.add_argument("--cutoff", type=float, default=cutoff)
+    ap.add_argument("--stride", type=int, default=1)
+    ap.add_argument("--segments", default=None, metavar="GLOB")
+    ap.add_argument("--decimated", action="store_true", help="use analysis/<name>-solute.qtrj instead of the DCDs")
+    ap.add_argument("-w", "--workers", type=int, default=workers_from_conf(conf))
+    ap.add_argument("--frames-per-task", type=int, default=FRAMES_PER_TASK)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    if not (args.sel_a and args.sel_b):
+        ap.error("set CONTACT_SEL_A / CONTACT_SEL_B in IMPACT.conf or pass --sel-a / --sel-b")
+    if args.stride < 1 or args.frames_per_task < 1 or args.workers < 1:
+        ap.error("--stride, --frames-per-task and --workers must be at least 1")
+    namd_proc_dir = conf.namd_proc_dir
+    names = args.names or get_project_index().gamd_candidates(namd_proc_dir)
+    try:
+        results = run(namd_proc_dir, names, args.sel_a, args.sel_b, args.cutoff, args.stride, args.segments,
+                      args.workers, args.frames_per_task, log=lambda m: print(m, file=sys.stderr, flush=True),
+                      decimated=args.decimated)
+    except KeyboardInterrupt:
+        return 130
+    if args.json:
+        print(json.dumps(results, indent=1))
+    else:
+        for r in results:
+            print(f"  [{'✓' if r['ok'] else '!'}] {r['name']}: {r['detail']}")
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
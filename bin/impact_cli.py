@@ -0,0 +1,472 @@
+# bin/impact_cli.py
+# Headless front end for the menu actions, for cron / SLURM / scripted use:
+#   IMPACT.py setup-pdb --all-unprocessed --local -j 16
+#   IMPACT.py setup-namd --all-unprepared --trial 1
+#   IMPACT.py run-namd --select 'TCR_0*_1' --submit
+#   IMPACT.py run-gamd --select 'TCR_0*_1' --submit
+#   IMPACT.py gamd-stats --select 'TCR_0*_1'
+#   IMPACT.py decimate --all --stride 10
+#   IMPACT.py contacts --all --workers 32
+#   IMPACT.py status --json
+# Every command reuses the same functions as the TUI. With --json one JSON
+# document goes to stdout; progress and tool output go to stderr. Exit code
+# is 0 if every system succeeded, 1 if any failed, 2 for usage errors.
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import impact_setup_pdb as setup_pdb
+import impact_setup_namd as setup_namd
+import impact_run_namd as run_namd
+import impact_run_gamd as run_gamd
+from impact_logs import tail_lines
+from impact_project_index import get_project_index
+from impact_config import load_config
+from impact_namdlog import fmt_eta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+
+POLL_SEC = 0.2
+SLURM_POLL_SEC = 5.0
+
+class UsageError(Exception):
+    pass
+
+def _log(msg):
+    print(msg, file=sys.stderr, flush=True)
+
+def _select(candidates, args, default=None):
+    # Explicit names, --select globs, --all, or a command-specific default set
+    picked = []
+    if getattr(args, "all", False):
+        picked = list(candidates)
+    elif default is not None:
+        picked = list(default)
+    unknown = [n for n in args.names if n not in candidates]
+    if unknown:
+        raise UsageError("Not found: " + ", ".join(unknown))
+    picked += args.names
+    for pat in args.select or []:
+        hits = fnmatch.filter(candidates, pat)
+        if not hits:
+            raise UsageError(f"No match for --select {pat!r}")
+        picked += hits
+    return sorted(set(picked))
+
+def _emit(args, command, results, **extra):
+    ok = all(r.get("ok") for r in results)
+    if args.json:
+        doc = {"command": command, "ok": ok}
+        doc.update(extra)
+        doc["results"] = results
+        json.dump(doc, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+    else:
+        for r in results:
+            mark = "✓" if r.get("ok") else "!"
+            print(f"  [{mark}] {r['name']}: {r.get('detail', '')}")
+        print(f"{sum(1 for r in results if r.get('ok'))}/{len(results)} ok")
+    sys.stdout.flush()
+    return 0 if ok else 1
+
+# -------------------- setup-pdb --------------------
+
+def _setup_pdb_local(sels, conf_path, jobs):
+    batch = setup_pdb.LocalBatch(sels, conf_path, setup_pdb.SETUP_SH, jobs)
+    reported = set()
+    try:
+        while True:
+            done = batch.poll()
+            for it in batch.items:
+                if it["state"] in ("ok", "failed") and it["name"] not in reported:
+                    reported.add(it["name"])
+                    _log(f"[{it['state']}] {it['name']} ({int(it['t1'] - it['t0'])}s)")
+            if done:
+                break
+            time.sleep(POLL_SEC)
+    except KeyboardInterrupt:
+        batch.cancel()
+    finally:
+        batch.close_logs()
+    results = []
+    for it in batch.items:
+        r = {"name": it["name"], "ok": it["state"] == "ok", "state": it["state"], "rc": it["rc"],
+             "seconds": round(it["t1"] - it["t0"], 1) if it["t0"] and it["t1"] else None}
+        if it["state"] == "failed":
+            r["detail"] = " | ".join(tail_lines(it["err"], n=3, w=200)) or f"exit {it['rc']}"
+        else:
+            r["detail"] = it["state"]
+        results.append(r)
+    return results
+
+def _setup_pdb_slurm(sels, conf_path, mode, max_inflight, force, wait):
+    script = setup_pdb.SETUP_SH
+    if mode == "array":
+        ok, jobid, msg = setup_pdb.submit_array_slurm(sels, conf_path, script, force, max_inflight)
+        if not ok:
+            return [{"name": n, "ok": False, "state": "SUBMIT_FAILED", "jobid": None, "detail": msg} for n in sels]
+        rows = [setup_pdb._job_row(n, setup_pdb.array_log_name(jobid, i), jobid=f"{jobid}_{i}") for i, n in enumerate(sels, 1)]
+        submit = None
+    else:
+        if mode == "sequential":
+            max_inflight = 1
+        rows = [setup_pdb._job_row(n, f"IMPACT_{n}") for n in sels]
+        submit = lambda name: setup_pdb.submit_one_slurm(name, conf_path, script, force)
+    try:
+        while True:
+            setup_pdb.advance_jobs(rows, max_inflight=max_inflight, submit=submit)
+            pending = any(r["state"] == "WAITING" for r in rows)
+            if not pending and (not wait or all(r["done"] for r in rows)):
+                break
+            time.sleep(SLURM_POLL_SEC)
+    except KeyboardInterrupt:
+        live = [r["jobid"] for r in rows if r["jobid"] and not r["done"]]
+        if live:
+            setup_pdb._run(["scancel"] + live)
+        _log(f"Cancelled ({len(live)} job(s) scancelled)")
+    finally:
+        for r in rows:
+            r["out"].close(); r["err"].close()
+    results = []
+    for r in rows:
+        ok = (r["state"] == "COMPLETED") if wait else (r["jobid"] is not None and r["state"] != "SUBMIT_FAILED")
+        results.append({"name": r["name"], "ok": ok, "state": r["state"], "jobid": r["jobid"],
+                        "detail": r["note"] or f"{r['jobid'] or '-'} {r['state']}"})
+    return results
+
+def cmd_setup_pdb(args):
+    pdb_dir, pdb_proc_dir, slurm_cfg, has_slurm, conf_path = setup_pdb.read_config()
+    idx = get_project_index()
+    pdbs = idx.pdbs(pdb_dir)
+    processed = idx.processed(pdb_proc_dir)
+    default = [p for p in pdbs if p not in processed] if args.all_unprocessed else None
+    sels = _select(pdbs, args, default)
+    if not sels:
+        raise UsageError("Selection is empty")
+    if not os.path.isfile(conf_path):
+        raise UsageError(f"Missing {conf_path}")
+    if args.slurm:
+        if not has_slurm and not args.force:
+            raise UsageError("SLURM not configured (SLURM_ACCOUNT/SLURM_PARTITION/SLURM_CMD); use --force to submit anyway")
+        mode, max_inflight = setup_pdb.slurm_submit_options(slurm_cfg)
+        mode = args.mode or mode
+        if args.max_inflight is not None:
+            max_inflight = max(0, args.max_inflight)
+        results = _setup_pdb_slurm(sels, conf_path, mode, max_inflight, args.force, args.wait)
+        return _emit(args, "setup-pdb", results, backend="slurm", mode=mode)
+    jobs = args.jobs or setup_pdb.local_jobs_from_conf(conf_path)
+    results = _setup_pdb_local(sels, conf_path, jobs)
+    return _emit(args, "setup-pdb", results, backend="local", jobs=jobs)
+
+# -------------------- setup-namd --------------------
+
+def cmd_setup_namd(args):
+    pdb_proc_dir, namd_proc_dir, conf_path = setup_namd.read_config()
+    idx = get_project_index()
+    names = idx.processed_systems(pdb_proc_dir)
+    default = None
+    if args.all_unprepared:
+        prepared = idx.namd_prepared(namd_proc_dir, [f"{n}_{args.trial}" for n in names])
+        default = [n for n in names if f"{n}_{args.trial}" not in prepared]
+    sels = _select(names, args, default)
+    if not sels:
+        raise UsageError("Selection is empty")
+    if not os.path.isfile(conf_path):
+        raise UsageError(f"Missing {conf_path}")
+    with tempfile.NamedTemporaryFile("w", delete=False, prefix="impact_sel_", suffix=".txt") as fsel:
+        fsel.write("\n".join(sels) + "\n")
+        sel_path = fsel.name
+    cmd = [setup_namd.RUN_TESTS_SH, "--conf", conf_path, "--trial", str(args.trial), sel_path]
+    try:
+        rc = subprocess.run(cmd, stdout=sys.stderr, stderr=sys.stderr, cwd=ROOT_DIR).returncode
+    except OSError as e:
+        _log(str(e))
+        rc = 127
+    finally:
+        try: os.unlink(sel_path)
+        except Exception: pass
+    results = []
+    for n in sels:
+        combined = f"{n}_{args.trial}"
+        ok = rc == 0 and os.path.isfile(os.path.join(namd_proc_dir, combined, "mini", f"{combined}-mini.sh"))
+        results.append({"name": n, "combined": combined, "ok": ok,
+                        "detail": f"generated in {os.path.join(namd_proc_dir, combined)}" if ok else f"not generated (exit {rc})"})
+    get_project_index().invalidate()
+    return _emit(args, "setup-namd", results, trial=args.trial)
+
+# -------------------- run-namd --------------------
+
+def cmd_run_namd(args):
+    _, namd_proc_dir, conf_path = setup_namd.read_config()
+    conf = load_config(conf_path)
+    targets = {it["combined"]: it for it in run_namd.list_targets_from_namd(namd_proc_dir)}
+    sels = _select(sorted(targets), args)
+    if not sels:
+        raise UsageError("Selection is empty")
+    results = []
+    if not args.submit:
+        for n in sels:
+            have = [c["stage"] for c in targets[n]["chain"] if c["script"]]
+            results.append({"name": n, "ok": True, "stages": have, "detail": "would submit " + (" → ".join(have) or "nothing")})
+        return _emit(args, "run-namd", results, dry_run=True)
+    sbatch = conf.get("SLURM_CMD", "sbatch").strip() or "sbatch"
+    extra = conf.get("SBATCH_EXTRA", "").strip()
+    sbatch_extra = run_namd.sbatch_defaults_from_conf(conf) + (extra.split() if extra else [])
+    aux_dir = os.path.join(ROOT_DIR, "aux")
+    for n in sels:
+        it = targets[n]
+        ok, detail = run_namd.submit_chain_protocol(it["dir"], it["combined"], sbatch, sbatch_extra, aux_dir)
+        _log(f"[{'ok' if ok else 'failed'}] {n}: {detail}")
+        results.append({"name": n, "ok": ok, "detail": detail})
+    return _emit(args, "run-namd", results, dry_run=False)
+
+# -------------------- run-gamd --------------------
+
+def _perf_fields(perf):
+    # Running-stage numbers from the NAMD log (impact_namdlog)
+    if not perf:
+        return {}
+    cur, chain_eta = perf
+    ns_day, eta = cur.ns_per_day, cur.eta_sec
+    return {"step": cur.step, "target_steps": cur.target,
+            "ns_per_day": round(ns_day, 2) if ns_day is not None else None,
+            "eta_sec": int(eta) if eta is not None else None,
+            "chain_eta_sec": int(chain_eta) if chain_eta is not None else None}
+
+def cmd_run_gamd(args):
+    namd_proc_dir, conf_path = run_gamd.read_config()
+    conf = load_config(conf_path)
+    idx = get_project_index()
+    names = idx.gamd_candidates(namd_proc_dir)
+    sels = _select(names, args)
+    if not sels:
+        raise UsageError("Selection is empty")
+    if not (args.build or args.submit):
+        results = [dict({"name": t[0], "ok": True, "done": t[1], "total": t[2], "next": t[3], "jobid": t[4], "state": t[5],
+                         "detail": f"{t[1]}/{t[2]} next={t[3]} {t[5]}"}, **_perf_fields(t[6]))
+                   for t in run_gamd._status_items(namd_proc_dir, sels)]
+        return _emit(args, "run-gamd", results, dry_run=True)
+    if args.build and not args.submit:
+        results = []
+        for n in sels:
+            try:
+                ok, detail, _scripts = run_gamd.build_gamd_chain(os.path.join(namd_proc_dir, n), n, ROOT_DIR, conf)
+            except Exception as e:
+                ok, detail = False, f"build error: {e}"
+            _log(f"[{'ok' if ok else 'failed'}] {n}: {detail}")
+            results.append({"name": n, "ok": ok, "detail": detail})
+        idx.invalidate()
+        return _emit(args, "run-gamd", results, dry_run=False)
+    sbatch = conf.get("SLURM_CMD", "sbatch").strip() or "sbatch"
+    extra = conf.get("SBATCH_EXTRA", "").strip()
+    sbatch_extra = extra.split() if extra else []
+    workers = args.jobs or run_gamd.gamd_workers_from_conf(conf)
+    rows = [{"name": n, "state": "queued", "detail": "", "t_start": None, "t_end": None} for n in sels]
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=min(workers, len(rows))) as pool:
+        futures = [pool.submit(run_gamd._gamd_chain_task, r, lock, namd_proc_dir, ROOT_DIR, conf, sbatch, sbatch_extra) for r in rows]
+        try:
+            for f, r in zip(futures, rows):
+                f.result()
+                _log(f"[{r['state']}] {r['name']}: {r['detail']}")
+        except KeyboardInterrupt:
+            for f, r in zip(futures, rows):
+                if f.cancel():
+                    r["state"], r["detail"] = "cancelled", "not started"
+    idx.invalidate()
+    results = [{"name": r["name"], "ok": r["state"] == "ok", "state": r["state"], "detail": r["detail"]} for r in rows]
+    return _emit(args, "run-gamd", results, dry_run=False, workers=workers)
+
+# -------------------- gamd-stats --------------------
+
+def cmd_gamd_stats(args):
+    import impact_gamd_stats as gamd_stats
+    namd_proc_dir, _conf_path = run_gamd.read_config()
+    sels = _select(get_project_index().gamd_candidates(namd_proc_dir), args)
+    if not sels:
+        raise UsageError("Selection is empty")
+    results = []
+    for n in sels:
+        rep = gamd_stats.chain_report(namd_proc_dir, n, args.equil, args.max_std, args.max_anharm)
+        t = rep["total"]
+        detail = (f"n={t['n']} mean={t['mean']:.3f} std={t['std']:.3f} anharm={t['anharm']:.4f}"
+                  if t else "no boost lines yet")
+        if rep["warnings"]:
+            detail += " • " + "; ".join(rep["warnings"])
+        results.append(dict(rep, ok=not rep["warnings"], detail=detail))
+    return _emit(args, "gamd-stats", results, max_std=args.max_std, max_anharm=args.max_anharm)
+
+# -------------------- decimate --------------------
+
+def cmd_decimate(args):
+    import impact_decimate as decimate
+    conf = load_config()
+    namd_proc_dir = conf.namd_proc_dir
+    sels = _select(get_project_index().gamd_candidates(namd_proc_dir), args)
+    if not sels:
+        raise UsageError("Selection is empty")
+    stride = args.stride or decimate.stride_from_conf(conf)
+    results = decimate.run(namd_proc_dir, sels, args.workers, stride=stride, precision=args.precision,
+                           pattern=args.segments, force=args.force)
+    return _emit(args, "decimate", results, stride=stride, precision=args.precision)
+
+# -------------------- contacts --------------------
+
+def cmd_contacts(args):
+    import impact_analysis as analysis
+    import impact_contacts as contacts
+    conf = load_config()
+    sel_a, sel_b, cutoff = contacts.conf_selections(conf)
+    sel_a, sel_b = args.sel_a or sel_a, args.sel_b or sel_b
+    if not (sel_a and sel_b):
+        raise UsageError("set CONTACT_SEL_A / CONTACT_SEL_B in IMPACT.conf or pass --sel-a / --sel-b")
+    if args.stride < 1:
+        raise UsageError("--stride must be at least 1")
+    namd_proc_dir = conf.namd_proc_dir
+    sels = _select(get_project_index().gamd_candidates(namd_proc_dir), args)
+    if not sels:
+        raise UsageError("Selection is empty")
+    workers = args.workers or analysis.workers_from_conf(conf)
+    cutoff = args.cutoff or cutoff
+    try:
+        results = analysis.run(namd_proc_dir, sels, sel_a, sel_b, cutoff, args.stride, args.segments,
+                               workers, log=_log, decimated=args.decimated)
+    except KeyboardInterrupt:
+        return 130
+    return _emit(args, "contacts", results, sel_a=sel_a, sel_b=sel_b, cutoff=cutoff, workers=workers)
+
+# -------------------- status --------------------
+
+def cmd_status(args):
+    pdb_dir, pdb_proc_dir, _slurm, has_slurm, conf_path = setup_pdb.read_config()
+    _, namd_proc_dir, _ = setup_namd.read_config()
+    idx = get_project_index()
+    pdbs = idx.pdbs(pdb_dir)
+    processed = idx.processed(pdb_proc_dir)
+    namd = []
+    for it in run_namd.list_targets_from_namd(namd_proc_dir):
+        p = run_namd.chain_progress(it)
+        namd.append(dict({"name": it["combined"], "stages": [c["stage"] for c in it["chain"] if c["script"]],
+                          "current": p[0] if p else None}, **_perf_fields(p[1:] if p else None)))
+    cands = idx.gamd_candidates(namd_proc_dir)
+    prepared = idx.gamd_prepared(namd_proc_dir, cands)
+    gamd = [dict({"name": t[0], "prepared": t[0] in prepared, "done": t[1], "total": t[2], "next": t[3], "jobid": t[4], "state": t[5]},
+                 **_perf_fields(t[6]))
+            for t in run_gamd._status_items(namd_proc_dir, cands)]
+    doc = {
+        "conf": conf_path,
+        "slurm_configured": has_slurm,
+        "pdb": {"dir": pdb_dir, "proc_dir": pdb_proc_dir, "total": len(pdbs),
+                "processed": [p for p in pdbs if p in processed],
+                "unprocessed": [p for p in pdbs if p not in processed]},
+        "namd": {"dir": namd_proc_dir, "targets": namd},
+        "gamd": gamd,
+    }
+    if args.json:
+        json.dump(doc, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+        return 0
+    pdb = doc["pdb"]
+    print(f"Config: {conf_path}  (SLURM {'configured' if has_slurm else 'not configured'})")
+    print(f"PDB:  {pdb['total']} in {pdb_dir} • processed {len(pdb['processed'])} • unprocessed {len(pdb['unprocessed'])}")
+    print(f"NAMD: {len(namd)} target(s) in {namd_proc_dir}")
+    for t in namd:
+        line = f"  {t['name']}: {' → '.join(t['stages']) or 'no scripts'}"
+        if t.get("ns_per_day") is not None:
+            line += f" • {t['current']} {t['ns_per_day']} ns/day eta={fmt_eta(t['chain_eta_sec'])}"
+        print(line)
+    print(f"GaMD: {len(gamd)} candidate(s), {len(prepared)} prepared")
+    for g in gamd:
+        line = f"  {g['name']}: {g['done']}/{g['total']} next={g['next']} jid={g['jobid']} {g['state']}"
+        if g.get("ns_per_day") is not None:
+            line += f" {g['ns_per_day']} ns/day eta={fmt_eta(g['chain_eta_sec'])}"
+        print(line)
+    return 0
+
+# -------------------- entry --------------------
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="print one JSON document on stdout")
+    sel = argparse.ArgumentParser(add_help=False)
+    sel.add_argument("names", nargs="*", help="system names")
+    sel.add_argument("--select", action="append", metavar="GLOB", help="add names matching a shell glob (repeatable)")
+    sel.add_argument("--all", action="store_true", help="select every candidate")
+
+    ap = argparse.ArgumentParser(prog="IMPACT.py", description="Run IMPACT menu actions without the TUI")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("setup-pdb", parents=[common, sel], help="generate systems from PDB_DIR")
+    p.add_argument("--all-unprocessed", action="store_true", help="select PDBs not yet in PDB_PROC_DIR")
+    where = p.add_mutually_exclusive_group()
+    where.add_argument("--local", action="store_true", help="run here (default)")
+    where.add_argument("--slurm", action="store_true", help="submit one job per system")
+    p.add_argument("-j", "--jobs", type=int, default=0, help="local workers (default LOCAL_JOBS)")
+    p.add_argument("--mode", choices=["pipelined", "sequential", "array"], help="SLURM submit mode (default SLURM_SUBMIT_MODE)")
+    p.add_argument("--max-inflight", type=int, default=None, help="SLURM in-flight cap (default SLURM_MAX_INFLIGHT)")
+    p.add_argument("--force", action="store_true", help="submit even if SLURM_* is not configured")
+    p.add_argument("--wait", action="store_true", help="wait for SLURM jobs to finish and report final states")
+    p.set_defaults(func=cmd_setup_pdb)
+
+    p = sub.add_parser("setup-namd", parents=[common, sel], help="stage NAMD runs from PDB_PROC_DIR")
+    p.add_argument("--all-unprepared", action="store_true", help="select systems without a run dir for this trial")
+    p.add_argument("-t", "--trial", type=int, default=1)
+    p.set_defaults(func=cmd_setup_namd)
+
+    p = sub.add_parser("run-namd", parents=[common, sel], help="submit mini → lf → equil → NPT1 → NPT2 chains")
+    p.add_argument("--submit", action="store_true", help="submit (without it, only list what would be submitted)")
+    p.set_defaults(func=cmd_run_namd)
+
+    p = sub.add_parser("run-gamd", parents=[common, sel], help="build and submit GaMD chains")
+    p.add_argument("--build", action="store_true", help="build gamd/ job files only")
+    p.add_argument("--submit", action="store_true", help="build and submit (without --build/--submit, show status)")
+    p.add_argument("-j", "--jobs", type=int, default=0, help="workers (default GAMD_WORKERS)")
+    p.set_defaults(func=cmd_run_gamd)
+
+    p = sub.add_parser("gamd-stats", parents=[common, sel], help="boost potential (dV) mean / std / anharmonicity per GaMD segment")
+    p.add_argument("--equil", action="store_true", help="also report the equil stage")
+    p.add_argument("--max-std", type=float, default=6.0, help="flag segments whose dV std exceeds this (kcal/mol, default 6.0)")
+    p.add_argument("--max-anharm", type=float, default=0.01, help="flag segments whose anharmonicity exceeds this (default 0.01)")
+    p.set_defaults(func=cmd_gamd_stats)
+
+    p = sub.add_parser("decimate", parents=[common, sel], help="strided, water-free, compressed trajectory copies (analysis/<name>-solute.qtrj)")
+    p.add_argument("--stride", type=int, default=0, help="keep every Nth frame (default DECIMATE_STRIDE or 10)")
+    p.add_argument("--precision", type=float, default=0.01, help="coordinate step in A (default 0.01)")
+    p.add_argument("--segments", default=None, metavar="GLOB", help="only trajectories whose segment matches")
+    p.add_argument("-w", "--workers", type=int, default=1, help="systems written in parallel")
+    p.add_argument("--force", action="store_true", help="rewrite even if up to date")
+    p.set_defaults(func=cmd_decimate)
+
+    p = sub.add_parser("contacts", parents=[common, sel], help="residue contact maps between CONTACT_SEL_A and CONTACT_SEL_B")
+    p.add_argument("--sel-a", default=None, help="override CONTACT_SEL_A (segids[:first-last])")
+    p.add_argument("--sel-b", default=None, help="override CONTACT_SEL_B")
+    p.add_argument("--cutoff", type=float, default=None, help="heavy-atom cutoff in A (default CONTACT_CUTOFF or 4.5)")
+    p.add_argument("--stride", type=int, default=1, help="use every Nth frame")
+    p.add_argument("--segments", default=None, metavar="GLOB", help="only trajectories whose segment matches (e.g. 'gamd-npt*')")
+    p.add_argument("--decimated", action="store_true", help="read analysis/<name>-solute.qtrj instead of the DCDs")
+    p.add_argument("-w", "--workers", type=int, default=0, help="worker processes (default ANALYSIS_WORKERS or all cores)")
+    p.set_defaults(func=cmd_contacts)
+
+    p = sub.add_parser("status", parents=[common], help="summarize PDB / NAMD / GaMD progress")
+    p.set_defaults(func=cmd_status)
+    return ap
+
+def main(argv=None) -> int:
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    try:
+        return args.func(args)
+    except UsageError as e:
+        print(f"{ap.prog} {args.command}: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
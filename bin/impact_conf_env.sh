@@ -0,0 +1,23 @@
+# bin/impact_conf_env.sh
+# Sourced by the .sh drivers once conf_abs is set. Loads IMPACT.conf through
+# impact_config.py as IMPACT_<KEY> variables (path keys already absolute).
+# The generated .IMPACT.conf.env next to the conf is reused until the conf
+# changes, so a run usually neither forks awk per key nor starts Python.
+
+_impact_bin="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+_impact_env="$(dirname "$conf_abs")/.$(basename "$conf_abs").env"
+
+if [[ -f "$_impact_env" && "$_impact_env" -nt "$conf_abs" ]]; then
+  # shellcheck disable=SC1090
+  source "$_impact_env"
+fi
+if [[ "${IMPACT_CONF:-}" != "$conf_abs" ]]; then
+  if "${PYTHON:-python3}" "${_impact_bin}/impact_config.py" env --conf "$conf_abs" --out "$_impact_env" >/dev/null 2>&1; then
+    # shellcheck disable=SC1090
+    source "$_impact_env"
+  else
+    # Conf dir not writable: read the assignments straight from stdout
+    eval "$("${PYTHON:-python3}" "${_impact_bin}/impact_config.py" env --conf "$conf_abs" --stdout)"
+  fi
+fi
+unset _impact_bin _impact_env
@@ -0,0 +1,218 @@
+# bin/impact_config.py
+# The one IMPACT.conf parser. Every menu, the CLI and the shell scripts read
+# the file through here:
+#   - `KEY = value` lines; blank lines and # comments are skipped, a " #"
+#     starts an inline comment, surrounding quotes are dropped, last one wins
+#   - parsed once per (mtime, size) and shared
+#   - path keys resolve against the directory holding IMPACT.conf
+#   - `impact_config.py env` writes a sourceable KEY=value file for the .sh
+#     drivers, so they do not fork awk once per key
+import os
+import re
+import sys
+import shlex
+import argparse
+import tempfile
+import threading
+from collections.abc import Mapping
+from typing import Dict, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+CONF_BASENAME = "IMPACT.conf"
+DEFAULT_CONF = os.path.join(ROOT_DIR, CONF_BASENAME)
+
+# Path keys and their defaults (relative to the conf directory)
+PATH_KEYS = {
+    "PDB_DIR": ".",
+    "PDB_PROC_DIR": "1_output",
+    "NAMD_PROC_DIR": "2_output",
+}
+ENV_PREFIX = "IMPACT_"
+_KEY_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_COMMENT_RE = re.compile(r"\s#.*$")
+
+def find_conf() -> str:
+    # The repo copy first, then the cwd; DEFAULT_CONF if neither exists
+    if os.path.exists(DEFAULT_CONF):
+        return DEFAULT_CONF
+    p = os.path.join(os.getcwd(), CONF_BASENAME)
+    return p if os.path.exists(p) else DEFAULT_CONF
+
+def split_line(raw: str) -> Optional[Tuple[str, str]]:
+    # (key, raw value) for a KEY = value line, None for blanks/comments/junk
+    s = raw.strip()
+    if not s or s.startswith("#") or "=" not in s:
+        return None
+    k, v = s.split("=", 1)
+    return k.strip(), v.strip()
+
+def clean_value(v: str) -> str:
+    v = _COMMENT_RE.sub("", v).strip()
+    if len(v) >= 2 and v[0] == v[-1] and v[0] in "\"'":
+        v = v[1:-1]
+    return v.strip()
+
+def parse_text(text: str) -> Dict[str, str]:
+    out = {}
+    for raw in text.splitlines():
+        kv = split_line(raw)
+        if kv:
+            out[kv[0]] = clean_value(kv[1])
+    return out
+
+class Config(Mapping):
+    # Read-only mapping of raw values plus typed accessors; passes anywhere a
+    # conf dict did (conf.get("X", "") still works)
+    def __init__(self, path: str, values: Dict[str, str], key=None):
+        self.path = os.path.abspath(path)
+        self.dir = os.path.dirname(self.path)
+        self.key = key
+        self._values = values
+
+    def __getitem__(self, k):
+        return self._values[k]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def exists(self) -> bool:
+        return self.key is not None
+
+    def get_str(self, k, default="") -> str:
+        return self._values.get(k) or default
+
+    def get_int(self, k, default=None, minimum=None):
+        try:
+            v = int(self._values.get(k, ""))
+        except ValueError:
+            return default
+        return max(minimum, v) if minimum is not None else v
+
+    def get_float(self, k, default=None):
+        try:
+            return float(self._values.get(k, ""))
+        except ValueError:
+            return default
+
+    def get_bool(self, k, default=False) -> bool:
+        v = self._values.get(k, "").lower()
+        if v in ("1", "yes", "true", "on"):
+            return True
+        if v in ("0", "no", "false", "off"):
+            return False
+        return default
+
+    def get_path(self, k, default=None) -> str:
+        v = self._values.get(k) or (default if default is not None else PATH_KEYS.get(k, "."))
+        return os.path.abspath(os.path.join(self.dir, os.path.expanduser(v)))
+
+    @property
+    def pdb_dir(self) -> str:
+        return self.get_path("PDB_DIR")
+
+    @property
+    def pdb_proc_dir(self) -> str:
+        return self.get_path("PDB_PROC_DIR")
+
+    @property
+    def namd_proc_dir(self) -> str:
+        return self.get_path("NAMD_PROC_DIR")
+
+    @property
+    def slurm(self) -> Dict[str, str]:
+        return {k: v for k, v in self._values.items() if k.startswith("SLURM_")}
+
+    @property
+    def has_slurm(self) -> bool:
+        return all(self._values.get(k) for k in ("SLURM_ACCOUNT", "SLURM_PARTITION", "SLURM_CMD"))
+
+    def env_lines(self):
+        yield f"{ENV_PREFIX}CONF={shlex.quote(self.path)}"
+        yield f"{ENV_PREFIX}CONF_DIR={shlex.quote(self.dir)}"
+        for k in PATH_KEYS:
+            yield f"{ENV_PREFIX}{k}={shlex.quote(self.get_path(k))}"
+        for k, v in self._values.items():
+            if k not in PATH_KEYS and _KEY_RE.match(k):
+                yield f"{ENV_PREFIX}{k}={shlex.quote(v)}"
+
+_LOCK = threading.Lock()
+_CACHE: Dict[str, Config] = {}
+
+def load_config(path: str = None) -> Config:
+    path = os.path.abspath(path or find_conf())
+    try:
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+    with _LOCK:
+        c = _CACHE.get(path)
+    if c is not None and c.key == key:
+        return c
+    values = {}
+    if key is not None:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                values = parse_text(f.read())
+        except OSError:
+            key = None
+    c = Config(path, values, key)
+    with _LOCK:
+        _CACHE[path] = c
+    return c
+
+def env_file_for(conf_path: str) -> str:
+    d, base = os.path.split(os.path.abspath(conf_path))
+    return os.path.join(d, f".{base}.env")
+
+def write_env(conf_path: str, out: str = None) -> str:
+    cfg = load_config(conf_path)
+    out = out or env_file_for(cfg.path)
+    text = "# Generated from %s; rewritten when it changes\n" % cfg.path + "\n".join(cfg.env_lines()) + "\n"
+    fd, tmp = tempfile.mkstemp(prefix=".tmp.", dir=os.path.dirname(out) or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, out)
+    except Exception:
+        try: os.unlink(tmp)
+        except Exception: pass
+        raise
+    return out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Read IMPACT.conf")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("env", help="write the sourceable env file (or print it with --stdout)")
+    p.add_argument("--conf", default=None)
+    p.add_argument("--out", default=None)
+    p.add_argument("--stdout", action="store_true")
+    p = sub.add_parser("get", help="print one value (paths resolved)")
+    p.add_argument("--conf", default=None)
+    p.add_argument("key")
+    args = ap.parse_args(argv)
+    cfg = load_config(args.conf)
+    if not cfg.exists:
+        print(f"Missing {CONF_BASENAME} at {cfg.path}", file=sys.stderr)
+        return 1
+    if args.cmd == "get":
+        print(cfg.get_path(args.key) if args.key in PATH_KEYS else cfg.get_str(args.key))
+        return 0
+    if args.stdout:
+        print("\n".join(cfg.env_lines()))
+        return 0
+    try:
+        print(write_env(cfg.path, args.out))
+    except OSError as e:
+        print(f"Cannot write env file: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
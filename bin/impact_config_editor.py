@@ -3,16 +3,13 @@ import curses
 from curses import textpad, ascii
 from datetime import datetime
 
-CONF_BASENAME = "IMPACT.conf"
+from impact_config import find_conf, split_line
+from impact_render import begin_frame, end_frame
+
 BACKUP_DIR = "conf_backups"
 
 # ---------------------------- FS helpers ----------------------------
 
-def find_conf():
-    cwd = os.getcwd()
-    p = os.path.join(cwd, CONF_BASENAME)
-    return p
-
 def load_conf_lines(path):
     if not path or not os.path.exists(path):
         return []
@@ -23,13 +20,9 @@ def parse_lines(lines):
     out = []
     for i, raw in enumerate(lines):
         s = raw.rstrip("\n")
-        stripped = s.strip()
-        if not stripped or stripped.startswith("#"):
-            out.append({"idx": i, "raw": s, "is_kv": False})
-            continue
-        if "=" in stripped:
-            k, v = stripped.split("=", 1)
-            out.append({"idx": i, "raw": s, "is_kv": True, "key": k.strip(), "value": v.strip()})
+        kv = split_line(s)
+        if kv:
+            out.append({"idx": i, "raw": s, "is_kv": True, "key": kv[0], "value": kv[1]})
         else:
             out.append({"idx": i, "raw": s, "is_kv": False})
     return out
@@ -123,7 +116,7 @@ def pick_backup(stdscr, path, hint_attr):
 
     idx = 0
     while True:
-        stdscr.clear()
+        begin_frame(stdscr)
         h, w = stdscr.getmaxyx()
         center(stdscr, 1, "Select config or backup (Enter=load • Esc=cancel)", curses.A_BOLD)
         start_y = 3
@@ -133,7 +126,7 @@ def pick_backup(stdscr, path, hint_attr):
             label = f"cur  — {name}" if kind == "cur" else name
             attr = curses.A_REVERSE if i == idx else 0
             safe_addstr(stdscr, start_y + i, 2, label[: max(0, w - 4)], attr)
-        stdscr.refresh()
+        end_frame(stdscr)
 
         k = stdscr.getch()
         if k in (27,):  # Esc
@@ -201,7 +194,7 @@ def restore_backup(path, selected_fp):
 
 def draw(stdscr, title, path, entries, cursor, top, err_attr, hint_attr, ok_attr,
          footer_cursor, focus, msg="", msg_attr=0):
-    stdscr.clear()
+    begin_frame(stdscr)
     h, w = stdscr.getmaxyx()
     center(stdscr, 1, title, curses.A_BOLD)
     safe_addstr(stdscr, 3, 2, f"Config: {path or '(not found)'}", hint_attr)
@@ -235,7 +228,7 @@ def draw(stdscr, title, path, entries, cursor, top, err_attr, hint_attr, ok_attr
         safe_addstr(stdscr, footer_y, x, b, attr)
         x += len(b) + 2
 
-    stdscr.refresh()
+    end_frame(stdscr)
     return top, view_h
 
 def prompt_edit(stdscr, key, old_value, hint_attr):
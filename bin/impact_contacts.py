@@ -0,0 +1,355 @@
+# bin/impact_contacts.py
+# Residue-residue contact frequencies between two selections (e.g. TCR
+# chains vs peptide+MHC) over a run's NPT / GaMD trajectories:
+#   - atoms come from <run_dir>/<name>_ionized.psf (impact_topology, cached)
+#   - a selection is a list of segids, each optionally with a resid range:
+#     "PROA PROB"  or  "PROC:1-180,PROD"  (CONTACT_SEL_A / CONTACT_SEL_B)
+#   - two residues are in contact in a frame if any pair of their heavy
+#     atoms is closer than CONTACT_CUTOFF (default 4.5 A)
+#   - neighbour search is a cell list over the orthorhombic unit cell with
+#     minimum-image distances, vectorized over all atoms of a frame
+#   - frames are read in chunks from the DCD memmap, touching only the pages
+#     that hold the selected atoms
+#   - with decimated=True (--decimated) the input is the strided, water-free
+#     <run_dir>/analysis/<name>-solute.qtrj from impact_decimate instead
+# The result is written to <run_dir>/analysis/<name>-contacts.npz as the
+# nonzero residue pairs and how many frames each was in contact.
+import os
+import re
+import sys
+import json
+import glob
+import fnmatch
+import argparse
+import tempfile
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from impact_config import load_config
+from impact_decimate import SUFFIX as DECIMATED_SUFFIX, QTrajError, open_trajectory
+from impact_topology import Topology, TopologyError, load_psf
+
+DEFAULT_CUTOFF = 4.5
+CHUNK_FRAMES = 256
+HEAVY_MASS = 1.5
+RESULT_DIR = "analysis"
+TRAJ_DIRS = ("NPT1", "NPT2", "gamd")
+
+class ContactError(Exception):
+    pass
+
+# -------------------- selections --------------------
+
+_TERM_RE = re.compile(r"^([^:]+)(?::(-?\d+)-(-?\d+))?$")
+
+def parse_selection(text: str) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    terms = []
+    for tok in text.replace(",", " ").split():
+        m = _TERM_RE.match(tok)
+        if not m:
+            raise ContactError(f"bad selection term {tok!r} (use SEGID or SEGID:first-last)")
+        lo, hi = m.group(2), m.group(3)
+        terms.append((m.group(1), int(lo) if lo else None, int(hi) if hi else None))
+    if not terms:
+        raise ContactError("empty selection")
+    return terms
+
+def select(topo: Topology, text: str, heavy: bool = True) -> np.ndarray:
+    # Sorted atom indices matching the selection
+    atoms = topo.atoms
+    mask = np.zeros(len(atoms), dtype=bool)
+    for seg, lo, hi in parse_selection(text):
+        m = atoms["segid"] == seg
+        if lo is not None:
+            m &= (atoms["resid"] >= lo) & (atoms["resid"] <= hi)
+        mask |= m
+    if heavy:
+        mask &= atoms["mass"] > HEAVY_MASS
+    if not mask.any():
+        raise ContactError(f"selection {text!r} matches no atoms")
+    return np.flatnonzero(mask)
+
+class Interface(NamedTuple):
+    idx_a: np.ndarray       # atom indices, selection A
+    idx_b: np.ndarray
+    res_a: np.ndarray       # residue number (0..len(labels_a)-1) per atom of idx_a
+    res_b: np.ndarray
+    labels_a: np.ndarray    # "SEG:RESID:RESNAME"
+    labels_b: np.ndarray
+    cutoff: float
+    sel_a: str
+    sel_b: str
+
+def _residues(topo: Topology, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # (residue index per atom of idx, "SEG:RESID[ICODE]:RESNAME" labels)
+    res, first = topo.residue_index(idx)
+    a = topo.atoms[first]
+    labels = np.array([f"{s}:{r}{i}:{n}" for s, r, i, n in zip(a["segid"], a["resid"], a["icode"], a["resname"])])
+    return res, labels
+
+def interface(topo: Topology, sel_a: str, sel_b: str, cutoff: float = DEFAULT_CUTOFF) -> Interface:
+    ia, ib = select(topo, sel_a), select(topo, sel_b)
+    if np.intersect1d(ia, ib).size:
+        raise ContactError("selections A and B overlap")
+    ra, la = _residues(topo, ia)
+    rb, lb = _residues(topo, ib)
+    return Interface(ia, ib, ra, rb, la, lb, float(cutoff), sel_a, sel_b)
+
+# -------------------- neighbour search --------------------
+
+def _offsets(n: np.ndarray) -> np.ndarray:
+    # Distinct neighbour-cell offsets; fewer than 27 when a side has < 3 cells
+    axes = [sorted({d % k for d in (-1, 0, 1)}) for k in n]
+    return np.array(np.meshgrid(*axes, indexing="ij")).reshape(3, -1).T
+
+def _near(cells: np.ndarray, n: np.ndarray) -> np.ndarray:
+    # Boolean grid: occupied cells and their (periodic) neighbours
+    occ = np.zeros(tuple(n), dtype=bool)
+    occ[cells[:, 0], cells[:, 1], cells[:, 2]] = True
+    for ax in range(3):
+        if n[ax] > 1:
+            occ = occ | np.roll(occ, 1, ax) | np.roll(occ, -1, ax)
+    return occ
+
+def neighbor_pairs(a: np.ndarray, b: np.ndarray, cutoff: float, box: Optional[np.ndarray] = None):
+    # (i, j) with |a[i] - b[j]| < cutoff; box = orthorhombic edges for PBC
+    # (minimum image), None for no periodicity
+    periodic = box is not None and bool(np.all(box > 0))
+    if periodic:
+        box = np.asarray(box, dtype=a.dtype)
+        a = a - box * np.floor(a / box)
+        b = b - box * np.floor(b / box)
+    else:
+        lo = np.minimum(a.min(0), b.min(0))
+        a, b = a - lo, b - lo
+        # Wide enough that cells joined by the wrap-around are > cutoff apart
+        box = np.maximum(a.max(0), b.max(0)) + cutoff
+    n = np.maximum(1, np.floor(box / cutoff)).astype(np.int64)
+    size = box / n
+    ca = np.minimum((a / size).astype(np.int64), n - 1)
+    cb = np.minimum((b / size).astype(np.int64), n - 1)
+    # Only atoms within one cell of the other selection can be in contact;
+    # for two proteins that is the interface, a small part of either side
+    keep_a = np.flatnonzero(_near(cb, n)[ca[:, 0], ca[:, 1], ca[:, 2]])
+    keep_b = np.flatnonzero(_near(ca, n)[cb[:, 0], cb[:, 1], cb[:, 2]])
+    if not (len(keep_a) and len(keep_b)):
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    a, ca = a[keep_a], ca[keep_a]
+    b, cb = b[keep_b], cb[keep_b]
+    flat_b = (cb[:, 0] * n[1] + cb[:, 1]) * n[2] + cb[:, 2]
+    order = np.argsort(flat_b, kind="stable")
+    bounds = np.searchsorted(flat_b[order], np.arange(int(n.prod()) + 1))
+    cut2 = cutoff * cutoff
+    out_i, out_j = [], []
+    for off in _offsets(n):
+        nc = (ca + off) % n
+        cell = (nc[:, 0] * n[1] + nc[:, 1]) * n[2] + nc[:, 2]
+        start = bounds[cell]
+        cnt = bounds[cell + 1] - start
+        total = int(cnt.sum())
+        if not total:
+            continue
+        i = np.repeat(np.arange(len(a)), cnt)
+        j = order[np.repeat(start - (np.cumsum(cnt) - cnt), cnt) + np.arange(total)]
+        d = a[i] - b[j]
+        if periodic:
+            d -= box * np.round(d / box)
+        near = np.einsum("ij,ij->i", d, d) < cut2
+        out_i.append(i[near])
+        out_j.append(j[near])
+    if not out_i:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return keep_a[np.concatenate(out_i)], keep_b[np.concatenate(out_j)]
+
+# -------------------- trajectories --------------------
+
+def _stage_key(path: str):
+    m = re.search(r"(npt|NPT)(\d+)", os.path.basename(path))
+    return (0 if "equil" in os.path.basename(path) else 1, int(m.group(2)) if m else 0, path)
+
+def trajectories(run_dir: str, name: str, pattern: Optional[str] = None,
+                 decimated: bool = False) -> List[Tuple[str, str]]:
+    # [(segment, dcd)] in run order: NPT1, NPT2, then gamd equil, npt1..npt8.
+    # pattern filters on the segment name (glob). decimated: just the .qtrj,
+    # which already holds every segment it was written from.
+    if decimated:
+        p = os.path.join(run_dir, RESULT_DIR, name + DECIMATED_SUFFIX)
+        return [("decimated", p)] if os.path.isfile(p) else []
+    out = []
+    for d in TRAJ_DIRS:
+        dcds = sorted(glob.glob(os.path.join(run_dir, d, "*.dcd")), key=_stage_key)
+        for p in dcds:
+            stem = os.path.splitext(os.path.basename(p))[0]
+            if d == "gamd":
+                seg = stem[len(name) + 1:] if stem.startswith(name + "-") else stem
+            else:
+                seg = d if len(dcds) == 1 else f"{d}/{stem}"
+            if pattern is None or fnmatch.fnmatch(seg, pattern):
+                out.append((seg, p))
+    return out
+
+def missing(name: str, decimated: bool = False) -> str:
+    if decimated:
+        return f"no {RESULT_DIR}/{name}{DECIMATED_SUFFIX} (run impact_decimate.py first)"
+    return f"no .dcd files under {', '.join(TRAJ_DIRS)}"
+
+def psf_path(run_dir: str, name: str) -> str:
+    return os.path.join(run_dir, f"{name}_ionized.psf")
+
+# -------------------- counting --------------------
+
+def count_contacts(path: str, iface: Interface, start: int = 0, stop: Optional[int] = None,
+                   stride: int = 1, chunk: int = CHUNK_FRAMES) -> Tuple[np.ndarray, int]:
+    # (counts (len(labels_a), len(labels_b)), frames used) for one DCD (or
+    # .qtrj) range
+    na, nb = len(iface.labels_a), len(iface.labels_b)
+    counts = np.zeros(na * nb, dtype=np.int64)
+    nframes = 0
+    both = np.concatenate((iface.idx_a, iface.idx_b))
+    split = len(iface.idx_a)
+    with open_trajectory(path) as traj:
+        cols = both
+        if traj.atom_indices is not None:
+            # Stripped file: topology index -> column
+            kept = traj.atom_indices
+            cols = np.minimum(np.searchsorted(kept, both), len(kept) - 1)
+            if not np.array_equal(kept[cols], both):
+                raise ContactError(f"{path}: selection includes atoms that were stripped")
+        elif traj.natoms <= int(both.max()):
+            raise ContactError(f"{path}: {traj.natoms} atoms, topology needs {int(both.max()) + 1}")
+        first, last, step = slice(start, stop, stride).indices(len(traj))
+        for c0 in range(first, last, chunk * step):
+            c1 = min(last, c0 + chunk * step)
+            x, y, z = traj.coords(c0, c1, step)
+            boxes = traj.boxes(c0, c1, step)
+            # Gather only the selected columns of the chunk out of the memmap
+            xyz = np.stack((x[:, cols], y[:, cols], z[:, cols]), axis=2)
+            keys = []
+            for k in range(len(xyz)):
+                box = boxes[k] if boxes is not None else None
+                i, j = neighbor_pairs(xyz[k, :split], xyz[k, split:], iface.cutoff, box)
+                keys.append(np.unique(iface.res_a[i].astype(np.int64) * nb + iface.res_b[j]))
+            if keys:
+                counts += np.bincount(np.concatenate(keys), minlength=na * nb)
+            nframes += len(keys)
+    return counts.reshape(na, nb), nframes
+
+class ContactMap(NamedTuple):
+    name: str
+    labels_a: np.ndarray
+    labels_b: np.ndarray
+    counts: np.ndarray          # (len(labels_a), len(labels_b)) frames in contact
+    nframes: int
+    cutoff: float
+    sel_a: str
+    sel_b: str
+    segments: List[Tuple[str, int]]   # (segment, frames used)
+
+    def frequency(self) -> np.ndarray:
+        return self.counts / max(1, self.nframes)
+
+    def top(self, n: int = 20) -> List[Tuple[str, str, float]]:
+        f = self.frequency()
+        flat = np.argsort(f, axis=None)[::-1][:n]
+        ii, jj = np.unravel_index(flat, f.shape)
+        return [(str(self.labels_a[i]), str(self.labels_b[j]), float(f[i, j])) for i, j in zip(ii, jj) if f[i, j] > 0]
+
+def result_path(run_dir: str, name: str) -> str:
+    return os.path.join(run_dir, RESULT_DIR, f"{name}-contacts.npz")
+
+def save(cm: ContactMap, path: str) -> str:
+    ii, jj = np.nonzero(cm.counts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".contacts.", suffix=".npz", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, labels_a=cm.labels_a, labels_b=cm.labels_b,
+                                pairs=np.stack((ii, jj), axis=1).astype(np.int32),
+                                counts=cm.counts[ii, jj], nframes=cm.nframes, cutoff=cm.cutoff,
+                                sel_a=cm.sel_a, sel_b=cm.sel_b,
+                                segments=np.array([s for s, _ in cm.segments], dtype=str),
+                                segment_frames=np.array([n for _, n in cm.segments], dtype=np.int64))
+        os.replace(tmp, path)
+    except Exception:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+    return path
+
+def load(path: str, name: str = "") -> ContactMap:
+    with np.load(path) as z:
+        la, lb = z["labels_a"], z["labels_b"]
+        counts = np.zeros((len(la), len(lb)), dtype=np.int64)
+        pairs = z["pairs"]
+        counts[pairs[:, 0], pairs[:, 1]] = z["counts"]
+        return ContactMap(name or os.path.basename(path).replace("-contacts.npz", ""), la, lb, counts,
+                          int(z["nframes"]), float(z["cutoff"]), str(z["sel_a"]), str(z["sel_b"]),
+                          list(zip(z["segments"].tolist(), z["segment_frames"].tolist())))
+
+def contact_map(run_dir: str, name: str, sel_a: str, sel_b: str, cutoff: float = DEFAULT_CUTOFF,
+                stride: int = 1, pattern: Optional[str] = None, progress=None,
+                decimated: bool = False) -> ContactMap:
+    trajs = trajectories(run_dir, name, pattern, decimated)
+    if not trajs:
+        raise ContactError(f"{name}: {missing(name, decimated)}")
+    iface = interface(load_psf(psf_path(run_dir, name)), sel_a, sel_b, cutoff)
+    total = np.zeros((len(iface.labels_a), len(iface.labels_b)), dtype=np.int64)
+    nframes, segs = 0, []
+    for seg, dcd in trajs:
+        counts, n = count_contacts(dcd, iface, stride=stride)
+        total += counts
+        nframes += n
+        segs.append((seg, n))
+        if progress:
+            progress(f"{name} {seg}: {n} frames")
+    return ContactMap(name, iface.labels_a, iface.labels_b, total, nframes, iface.cutoff, sel_a, sel_b, segs)
+
+def conf_selections(conf) -> Tuple[str, str, float]:
+    return (conf.get_str("CONTACT_SEL_A"), conf.get_str("CONTACT_SEL_B"),
+            conf.get_float("CONTACT_CUTOFF", DEFAULT_CUTOFF))
+
+def main(argv=None) -> int:
+    conf = load_config()
+    sel_a, sel_b, cutoff = conf_selections(conf)
+    ap = argparse.ArgumentParser(description="Residue contact frequencies between two selections over a run's trajectories")
+    ap.add_argument("names", nargs="+", help="run names under NAMD_PROC_DIR (e.g. TCR_06_1)")
+    ap.add_argument("--sel-a", default=sel_a, help="segids[:first-last] (default CONTACT_SEL_A)")
+    ap.add_argument("--sel-b", default=sel_b, help="segids[:first-last] (default CONTACT_SEL_B)")
+    ap.add_argument("--cutoff", type=float, default=cutoff, help="heavy-atom distance in A (default CONTACT_CUTOFF or 4.5)")
+    ap.add_argument("--stride", type=int, default=1, help="use every Nth frame")
+    ap.add_argument("--segments", default=None, metavar="GLOB", help="only trajectories whose segment matches (e.g. 'gamd-npt*')")
+    ap.add_argument("--decimated", action="store_true", help="read analysis/<name>-solute.qtrj (impact_decimate.py) instead of the DCDs")
+    ap.add_argument("--top", type=int, default=10, help="print the N most frequent pairs")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    if not (args.sel_a and args.sel_b):
+        ap.error("set CONTACT_SEL_A / CONTACT_SEL_B in IMPACT.conf or pass --sel-a / --sel-b")
+    rc, out = 0, []
+    for n in args.names:
+        run_dir = os.path.join(conf.namd_proc_dir, n)
+        try:
+            cm = contact_map(run_dir, n, args.sel_a, args.sel_b, args.cutoff, args.stride, args.segments,
+                             progress=lambda m: print(m, file=sys.stderr, flush=True), decimated=args.decimated)
+            path = save(cm, result_path(run_dir, n))
+        except (OSError, ValueError, ContactError, TopologyError, QTrajError) as e:
+            out.append({"name": n, "error": str(e)})
+            rc = 1
+            continue
+        out.append({"name": n, "path": path, "nframes": cm.nframes, "segments": cm.segments,
+                    "pairs": int(np.count_nonzero(cm.counts)),
+                    "top": [{"a": a, "b": b, "freq": round(f, 4)} for a, b, f in cm.top(args.top)]})
+    if args.json:
+        print(json.dumps(out, indent=1))
+        return rc
+    for d in out:
+        if "error" in d:
+            print(f"{d['name']}: {d['error']}", file=sys.stderr)
+            continue
+        print(f"{d['name']}: {d['nframes']} frames, {d['pairs']} residue pairs -> {d['path']}")
+        for t in d["top"]:
+            print(f"  {t['a']:<18} {t['b']:<18} {t['freq']:.3f}")
+    return rc
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+# bin/impact_dcd.py
+# DCD trajectory reader (CHARMM/NAMD layout) without VMD:
+#   - the header is parsed with struct; the frame block is a numpy memmap of
+#     one structured record per frame, so x/y/z come back as float32 views
+#     into the page cache, never copies
+#   - endianness is taken from the first record marker
+#   - the frame count comes from the file size, not the header, so a file a
+#     running job is still appending to reports what is on disk (a partial
+#     last frame is ignored)
+# Fixed-atom DCDs (NAMNF > 0) and 64-bit record markers are rejected.
+import os
+import sys
+import json
+import struct
+import argparse
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+
+AKMA_FS = 48.88821  # one AKMA time unit in fs
+
+class DCDError(Exception):
+    pass
+
+class DCDHeader(NamedTuple):
+    natoms: int
+    nframes: int          # complete frames on disk
+    nframes_header: int   # what the writer last recorded
+    istart: int
+    nsavc: int
+    delta: float          # integration step, AKMA units
+    has_cell: bool
+    has_4d: bool
+    charmm: int
+    title: str
+    endian: str
+    data_offset: int
+    frame_bytes: int
+
+    @property
+    def timestep_fs(self) -> float:
+        return self.delta * AKMA_FS
+
+    @property
+    def frame_interval_fs(self) -> float:
+        # Simulated time between two saved frames
+        return self.delta * AKMA_FS * max(1, self.nsavc)
+
+def _record(f, endian, what):
+    raw = f.read(4)
+    if len(raw) < 4:
+        raise DCDError(f"truncated {what} record")
+    (n,) = struct.unpack(endian + "i", raw)
+    body = f.read(n)
+    tail = f.read(4)
+    if len(body) < n or len(tail) < 4 or struct.unpack(endian + "i", tail)[0] != n:
+        raise DCDError(f"bad {what} record")
+    return body
+
+def read_header(path: str) -> DCDHeader:
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        first = f.read(8)
+        if len(first) < 8:
+            raise DCDError("not a DCD file (too short)")
+        for endian in ("<", ">"):
+            if struct.unpack(endian + "i", first[:4])[0] == 84 and first[4:8] == b"CORD":
+                break
+        else:
+            raise DCDError("not a DCD file (no CORD header)")
+        f.seek(0)
+        body = _record(f, endian, "header")
+        icntrl = struct.unpack(endian + "20i", body[4:84])
+        charmm = icntrl[19]
+        if charmm:
+            delta = struct.unpack(endian + "f", body[40:44])[0]
+        else:
+            delta = struct.unpack(endian + "d", body[40:48])[0]
+        has_cell = bool(charmm and icntrl[10])
+        has_4d = bool(charmm and icntrl[11])
+        if icntrl[8]:
+            raise DCDError(f"fixed atoms (NAMNF={icntrl[8]}) are not supported")
+
+        body = _record(f, endian, "title")
+        (ntitle,) = struct.unpack(endian + "i", body[:4])
+        lines = [body[4 + 80 * i: 4 + 80 * (i + 1)] for i in range(ntitle)]
+        title = "\n".join(l.decode("ascii", "replace").rstrip("\x00 ") for l in lines)
+
+        body = _record(f, endian, "atom count")
+        (natoms,) = struct.unpack(endian + "i", body[:4])
+        data_offset = f.tell()
+
+    frame_bytes = (56 if has_cell else 0) + (4 if has_4d else 3) * (8 + 4 * natoms)
+    nframes = max(0, (size - data_offset) // frame_bytes) if natoms > 0 else 0
+    return DCDHeader(natoms, nframes, icntrl[0], icntrl[1], icntrl[2], delta,
+                     has_cell, has_4d, charmm, title, endian, data_offset, frame_bytes)
+
+class Frame(NamedTuple):
+    index: int
+    x: np.ndarray         # float32 views, length natoms
+    y: np.ndarray
+    z: np.ndarray
+    cell: Optional[np.ndarray]   # the 6 raw unit cell doubles, DCD order
+
+    def xyz(self) -> np.ndarray:
+        # (natoms, 3) copy for code that wants interleaved coordinates
+        return np.stack((self.x, self.y, self.z), axis=1)
+
+    @property
+    def box(self) -> Optional[np.ndarray]:
+        # a, b, c edge lengths (NAMD writes A, gamma, B, beta, alpha, C)
+        return None if self.cell is None else self.cell[[0, 2, 5]]
+
+def _frame_dtype(h: DCDHeader) -> np.dtype:
+    e = h.endian
+    fields = []
+    if h.has_cell:
+        fields += [("_c0", e + "i4"), ("cell", e + "f8", (6,)), ("_c1", e + "i4")]
+    for ax in ("x", "y", "z", "w")[: 4 if h.has_4d else 3]:
+        fields += [("_%s0" % ax, e + "i4"), (ax, e + "f4", (h.natoms,)), ("_%s1" % ax, e + "i4")]
+    return np.dtype(fields)
+
+class DCDFile:
+    # Random access and strided iteration over a DCD; frames are views into
+    # a read-only memmap, so keep the DCDFile alive while using them.
+    atom_indices = None       # columns are the full topology (see impact_decimate.QTrajFile)
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header = read_header(path)
+        self._mm = None
+        if self.header.nframes:
+            self._mm = np.memmap(path, dtype=_frame_dtype(self.header), mode="r",
+                                 offset=self.header.data_offset, shape=(self.header.nframes,))
+            self._check(0)
+
+    def __len__(self):
+        return self.header.nframes
+
+    @property
+    def natoms(self) -> int:
+        return self.header.natoms
+
+    def _check(self, i):
+        rec = self._mm[i]
+        want = 4 * self.header.natoms
+        for ax in ("x", "y", "z"):
+            if rec["_%s0" % ax] != want or rec["_%s1" % ax] != want:
+                raise DCDError(f"frame {i}: bad {ax} record marker")
+        if self.header.has_cell and (rec["_c0"] != 48 or rec["_c1"] != 48):
+            raise DCDError(f"frame {i}: bad unit cell record marker")
+
+    def frame(self, i: int) -> Frame:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"frame {i} out of range ({n} frames)")
+        rec = self._mm[i]
+        return Frame(i, rec["x"], rec["y"], rec["z"], rec["cell"] if self.header.has_cell else None)
+
+    __getitem__ = frame
+
+    def frames(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator[Frame]:
+        for i in range(*slice(start, stop, step).indices(len(self))):
+            yield self.frame(i)
+
+    __iter__ = frames
+
+    def coords(self, start: int = 0, stop: Optional[int] = None, step: int = 1):
+        # (x, y, z) as (nsel, natoms) strided views over the whole range
+        if self._mm is None:
+            empty = np.empty((0, self.natoms), np.float32)
+            return empty, empty, empty
+        sel = self._mm[start:stop:step]
+        return sel["x"], sel["y"], sel["z"]
+
+    def boxes(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Optional[np.ndarray]:
+        # (nsel, 3) a, b, c per frame, or None without a unit cell
+        if self._mm is None or not self.header.has_cell:
+            return None
+        return self._mm[start:stop:step]["cell"][:, [0, 2, 5]]
+
+    def close(self):
+        if self._mm is not None:
+            mm = getattr(self._mm, "_mmap", None)
+            self._mm = None
+            if mm is not None:
+                try: mm.close()
+                except (BufferError, ValueError): pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def info(path: str) -> dict:
+    h = read_header(path)
+    return {
+        "path": path,
+        "natoms": h.natoms,
+        "nframes": h.nframes,
+        "nframes_header": h.nframes_header,
+        "istart": h.istart,
+        "nsavc": h.nsavc,
+        "timestep_fs": round(h.timestep_fs, 6),
+        "frame_interval_ps": round(h.frame_interval_fs / 1000.0, 6),
+        "unit_cell": h.has_cell,
+        "endian": "little" if h.endian == "<" else "big",
+        "title": h.title,
+    }
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Inspect DCD trajectories")
+    ap.add_argument("dcd", nargs="+")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    rc = 0
+    out = []
+    for p in args.dcd:
+        try:
+            out.append(info(p))
+        except (OSError, DCDError) as e:
+            out.append({"path": p, "error": str(e)})
+            rc = 1
+    if args.json:
+        print(json.dumps(out, indent=2))
+        return rc
+    for d in out:
+        if "error" in d:
+            print(f"{d['path']}: {d['error']}", file=sys.stderr)
+        else:
+            print(f"{d['path']}: {d['natoms']} atoms, {d['nframes']} frames "
+                  f"(header {d['nframes_header']}), every {d['frame_interval_ps']} ps, "
+                  f"cell={'yes' if d['unit_cell'] else 'no'}")
+    return rc
+
+if __name__ == "__main__":
+    sys.exit(main())
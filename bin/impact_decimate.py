@@ -0,0 +1,293 @@
+# bin/impact_decimate.py
+# Strided, solute-only copies of a run's trajectories in a compact format:
+#   <run>/analysis/<name>-solute.qtrj
+# Water (STRIP_RESNAMES) is dropped using the PSF, every Nth frame of the
+# NPT / GaMD DCDs is kept, and each frame is stored as
+#   - coordinates quantized to PRECISION (0.01 A by default)
+#   - differences between consecutive atoms (bonded neighbours, so small),
+#     int16 unless a jump needs int32
+#   - byte planes split (all low bytes, then all high bytes) and zlib'd
+# An index at the end of the file gives each frame's offset and size, its
+# box, and the segment/source frame it came from, so any frame is one seek
+# and one decompress. QTrajFile reads it with the same calls as DCDFile
+# (len, frame, frames, coords, boxes), with atom_indices mapping columns
+# back to the full topology.
+#
+# Layout: MAGIC | frame blobs | zlib(index arrays) | meta JSON |
+#         footer (index offset, index size, meta size, MAGIC)
+import os
+import sys
+import json
+import zlib
+import struct
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from impact_config import load_config
+from impact_dcd import DCDError, DCDFile, Frame
+from impact_topology import TopologyError, load_psf
+
+MAGIC = b"IMPQTRJ1"
+FOOTER = struct.Struct("<QQQ8s")
+SUFFIX = "-solute.qtrj"
+DEFAULT_STRIDE = 10
+PRECISION = 0.01
+LEVEL = 6
+CHUNK_FRAMES = 64
+STRIP_RESNAMES = ("TIP3", "TIP3P", "TIP4", "SPC", "SPCE", "WAT", "HOH", "SOL")
+
+class QTrajError(Exception):
+    pass
+
+# -------------------- frame codec --------------------
+
+def encode_frame(xyz: np.ndarray, precision: float = PRECISION, level: int = LEVEL) -> bytes:
+    q = np.rint(np.asarray(xyz, dtype=np.float64) / precision).astype(np.int64)
+    d = np.diff(q, axis=0, prepend=np.zeros((1, 3), np.int64)).T.ravel()
+    wide = d.size and (d.max() > 32767 or d.min() < -32768)
+    arr = d.astype("<i4" if wide else "<i2")
+    planes = arr.view(np.uint8).reshape(-1, arr.itemsize).T.tobytes()
+    return (b"\x04" if wide else b"\x02") + zlib.compress(planes, level)
+
+def decode_frame(blob: bytes, natoms: int, precision: float = PRECISION) -> np.ndarray:
+    # -> (3, natoms) float32 (x, y, z rows)
+    size = blob[0]
+    planes = np.frombuffer(zlib.decompress(blob[1:]), dtype=np.uint8)
+    if planes.size != size * 3 * natoms:
+        raise QTrajError("corrupt frame")
+    d = planes.reshape(size, -1).T.copy().view("<i4" if size == 4 else "<i2").ravel()
+    q = np.cumsum(d.reshape(3, natoms).astype(np.int64), axis=1)
+    return (q * precision).astype(np.float32)
+
+# -------------------- reader --------------------
+
+class QTrajFile:
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            self._read_index()
+        except Exception:
+            self._f.close()
+            raise
+
+    def _read_index(self):
+        f = self._f
+        if f.read(len(MAGIC)) != MAGIC:
+            raise QTrajError(f"{self.path}: not a .qtrj file")
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if end < len(MAGIC) + FOOTER.size:
+            raise QTrajError(f"{self.path}: truncated")
+        f.seek(end - FOOTER.size)
+        index_off, index_len, meta_len, magic = FOOTER.unpack(f.read(FOOTER.size))
+        if magic != MAGIC:
+            raise QTrajError(f"{self.path}: truncated (no footer)")
+        f.seek(index_off)
+        raw = zlib.decompress(f.read(index_len))
+        self.meta = json.loads(f.read(meta_len).decode("utf-8"))
+        n, na = self.meta["nframes"], self.meta["natoms"]
+        parts, pos = [], 0
+        for dt, count in (("<i8", n), ("<i4", n), ("<f4", 3 * n), ("<i2", n), ("<i4", n), ("<i4", na)):
+            k = np.dtype(dt).itemsize * count
+            parts.append(np.frombuffer(raw[pos:pos + k], dtype=dt))
+            pos += k
+        self._offsets, self._sizes, boxes, self._segment, self._source, self.atom_indices = parts
+        self._boxes = boxes.reshape(n, 3)
+        self.precision = self.meta["precision"]
+
+    def __len__(self):
+        return self.meta["nframes"]
+
+    @property
+    def natoms(self) -> int:
+        return self.meta["natoms"]
+
+    @property
+    def segments(self) -> List[str]:
+        return self.meta["segments"]
+
+    def source(self, i: int) -> Tuple[str, int]:
+        # (segment, frame in that segment's DCD)
+        return self.segments[self._segment[i]], int(self._source[i])
+
+    def _xyz(self, i: int) -> np.ndarray:
+        self._f.seek(int(self._offsets[i]))
+        return decode_frame(self._f.read(int(self._sizes[i])), self.natoms, self.precision)
+
+    def frame(self, i: int) -> Frame:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"frame {i} out of range ({n} frames)")
+        x, y, z = self._xyz(i)
+        a, b, c = (float(v) for v in self._boxes[i])
+        cell = np.array([a, 90.0, b, 90.0, 90.0, c]) if a > 0 else None
+        return Frame(i, x, y, z, cell)
+
+    __getitem__ = frame
+
+    def frames(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator[Frame]:
+        for i in range(*slice(start, stop, step).indices(len(self))):
+            yield self.frame(i)
+
+    __iter__ = frames
+
+    def coords(self, start: int = 0, stop: Optional[int] = None, step: int = 1):
+        # (x, y, z) as (nsel, natoms) arrays, decoded
+        idx = range(*slice(start, stop, step).indices(len(self)))
+        out = np.empty((3, len(idx), self.natoms), dtype=np.float32)
+        for k, i in enumerate(idx):
+            out[:, k] = self._xyz(i)
+        return out[0], out[1], out[2]
+
+    def boxes(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> np.ndarray:
+        # (nsel, 3) a, b, c; zeros where the source had no unit cell
+        return self._boxes[start:stop:step]
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_trajectory(path: str):
+    # DCDFile or QTrajFile by extension
+    return QTrajFile(path) if path.endswith(".qtrj") else DCDFile(path)
+
+# -------------------- writer --------------------
+
+def _write(out: str, sources: List[Tuple[str, str]], keep: np.ndarray, stride: int,
+           precision: float, level: int, meta: dict) -> Tuple[int, int]:
+    # -> (frames written, bytes of DCD data they replace)
+    offsets, sizes, boxes, segs, src = [], [], [], [], []
+    replaced = 0
+    fd, tmp = tempfile.mkstemp(prefix=".qtrj.", suffix=".tmp", dir=os.path.dirname(out))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            for si, (_seg, path) in enumerate(sources):
+                with DCDFile(path) as dcd:
+                    if dcd.natoms <= int(keep[-1]):
+                        raise QTrajError(f"{path}: {dcd.natoms} atoms, topology needs {int(keep[-1]) + 1}")
+                    n = len(dcd)
+                    for c0 in range(0, n, CHUNK_FRAMES * stride):
+                        c1 = min(n, c0 + CHUNK_FRAMES * stride)
+                        x, y, z = dcd.coords(c0, c1, stride)
+                        bx = dcd.boxes(c0, c1, stride)
+                        xyz = np.stack((x[:, keep], y[:, keep], z[:, keep]), axis=2)
+                        for k, fi in enumerate(range(c0, c1, stride)):
+                            blob = encode_frame(xyz[k], precision, level)
+                            offsets.append(f.tell())
+                            sizes.append(len(blob))
+                            f.write(blob)
+                            boxes.append(bx[k] if bx is not None else (0.0, 0.0, 0.0))
+                            segs.append(si)
+                            src.append(fi)
+                            replaced += dcd.header.frame_bytes
+            nf = len(offsets)
+            index = b"".join([np.asarray(offsets, "<i8").tobytes(), np.asarray(sizes, "<i4").tobytes(),
+                              np.asarray(boxes, "<f4").reshape(nf, 3).tobytes(), np.asarray(segs, "<i2").tobytes(),
+                              np.asarray(src, "<i4").tobytes(), np.asarray(keep, "<i4").tobytes()])
+            index = zlib.compress(index, level)
+            meta = dict(meta, nframes=nf, natoms=int(len(keep)), precision=precision, stride=stride,
+                        segments=[s for s, _ in sources])
+            blob = json.dumps(meta).encode("utf-8")
+            index_off = f.tell()
+            f.write(index)
+            f.write(blob)
+            f.write(FOOTER.pack(index_off, len(index), len(blob), MAGIC))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, out)
+    except BaseException:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+    return nf, replaced
+
+def output_path(run_dir: str, name: str) -> str:
+    from impact_contacts import RESULT_DIR
+    return os.path.join(run_dir, RESULT_DIR, name + SUFFIX)
+
+def decimate(run_dir: str, name: str, stride: int = DEFAULT_STRIDE, precision: float = PRECISION,
+             strip=STRIP_RESNAMES, pattern: Optional[str] = None, level: int = LEVEL,
+             force: bool = False) -> Tuple[bool, str]:
+    from impact_contacts import psf_path, trajectories
+    try:
+        sources = trajectories(run_dir, name, pattern)
+        if not sources:
+            return False, "no .dcd files"
+        out = output_path(run_dir, name)
+        stamp = [[p, os.path.getsize(p), os.stat(p).st_mtime_ns] for _, p in sources]
+        params = {"stride": stride, "precision": precision, "strip": sorted(strip)}
+        if not force and os.path.isfile(out):
+            try:
+                with QTrajFile(out) as q:
+                    if q.meta.get("sources") == stamp and all(q.meta.get(k) == v for k, v in params.items()):
+                        return True, f"up to date ({len(q)} frames)"
+            except (OSError, ValueError, QTrajError):
+                pass
+        atoms = load_psf(psf_path(run_dir, name)).atoms
+        keep = np.flatnonzero(~np.isin(atoms["resname"], list(strip))).astype(np.int32)
+        if not len(keep):
+            return False, "selection is empty after stripping water"
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        nf, replaced = _write(out, sources, keep, stride, precision, level,
+                              {"name": name, "sources": stamp, "strip": sorted(strip)})
+    except (OSError, ValueError, DCDError, TopologyError, QTrajError) as e:
+        return False, str(e)
+    size = os.path.getsize(out)
+    ratio = replaced / size if size else 0.0
+    return True, f"{nf} frames, {len(keep)} atoms, {size / 1e6:.1f} MB ({ratio:.0f}x smaller than the frames it replaces)"
+
+def stride_from_conf(conf) -> int:
+    return conf.get_int("DECIMATE_STRIDE", DEFAULT_STRIDE, minimum=1)
+
+def _decimate_task(args):
+    return args[1], decimate(*args)
+
+def run(namd_proc_dir: str, names: List[str], workers: int = 1, **kw) -> List[dict]:
+    # One system per worker process
+    jobs = [(os.path.join(namd_proc_dir, n), n, kw.get("stride", DEFAULT_STRIDE), kw.get("precision", PRECISION),
+             kw.get("strip", STRIP_RESNAMES), kw.get("pattern"), kw.get("level", LEVEL), kw.get("force", False))
+            for n in names]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            done = dict(pool.map(_decimate_task, jobs))
+    else:
+        done = dict(map(_decimate_task, jobs))
+    return [{"name": n, "ok": done[n][0], "detail": done[n][1]} for n in names]
+
+def main(argv=None) -> int:
+    from impact_project_index import get_project_index
+    conf = load_config()
+    ap = argparse.ArgumentParser(description="Write strided, water-stripped, compressed copies of run trajectories")
+    ap.add_argument("names", nargs="*", help="run names (default: every GaMD candidate)")
+    ap.add_argument("--stride", type=int, default=stride_from_conf(conf), help="keep every Nth frame (default DECIMATE_STRIDE or 10)")
+    ap.add_argument("--precision", type=float, default=PRECISION, help=f"coordinate step in A (default {PRECISION})")
+    ap.add_argument("--segments", default=None, metavar="GLOB")
+    ap.add_argument("-w", "--workers", type=int, default=1)
+    ap.add_argument("--force", action="store_true", help="rewrite even if up to date")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    namd_proc_dir = conf.namd_proc_dir
+    names = args.names or get_project_index().gamd_candidates(namd_proc_dir)
+    results = run(namd_proc_dir, names, args.workers, stride=args.stride, precision=args.precision,
+                  pattern=args.segments, force=args.force)
+    if args.json:
+        print(json.dumps(results, indent=1))
+    else:
+        for r in results:
+            print(f"  [{'✓' if r['ok'] else '!'}] {r['name']}: {r['detail']}")
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
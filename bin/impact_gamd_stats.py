@@ -0,0 +1,213 @@
+# bin/impact_gamd_stats.py
+# GaMD boost-potential (dV) statistics from the stage logs. With
+# accelMDOutFreq set, NAMD logs one line per output step:
+#   ACCELERATED MD: STEP <step> dV <dV> dVAVG ... POTENTIAL ...
+# Logs are scanned in fixed-size chunks and each chunk's matches go
+# straight into numpy arrays. The arrays are cached under log/gamd_boost/
+# with the offset they cover and a hash of the bytes just before it, so a
+# growing segment is only read from where the last scan stopped, and a log
+# rewritten by a rerun (same inode, via >) is read again from the start. Per segment (equil, npt1..npt8) and for npt1..npt8
+# together we report mean, std and the anharmonicity
+#   gamma = S_max - S(dV),  S_max = 1/2 ln(2 pi e sigma^2)
+# which is 0 for a Gaussian; a wide or skewed dV distribution means
+# cumulant reweighting will not be trustworthy (check sigma0P/sigma0D).
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from impact_config import load_config
+from impact_namdlog import gamd_stage_scripts, stage_files
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+CACHE_DIR = os.path.join(ROOT_DIR, "log", "gamd_boost")
+SIG_BYTES = 4096
+
+ACCEL_RE = re.compile(rb"^ACCELERATED MD: STEP\s+(\d+)\s+dV\s+(\S+)", re.M)
+SIGMA_RE = re.compile(r"^\s*accelMDGsigma0([PD])\s+([0-9.]+)", re.I | re.M)
+CHUNK = 4 * 1024 * 1024
+DEFAULT_MAX_STD = 6.0       # kcal/mol, the usual sigma0 ceiling
+DEFAULT_MAX_ANHARM = 0.01
+
+class BoostStats(NamedTuple):
+    n: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    anharm: float
+
+    def as_dict(self):
+        return {k: (round(v, 4) if isinstance(v, float) else v) for k, v in self._asdict().items()}
+
+def _parse(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    hits = ACCEL_RE.findall(data)
+    if not hits:
+        return np.empty(0, np.int64), np.empty(0, np.float64)
+    arr = np.array(hits)
+    return arr[:, 0].astype(np.int64), arr[:, 1].astype(np.float64)
+
+def _scan(path: str, start: int = 0, chunk: int = CHUNK):
+    # (steps, dV, offset of the last full line read)
+    steps, dvs = [], []
+    with open(path, "rb") as f:
+        f.seek(start)
+        carry = b""
+        while True:
+            buf = f.read(chunk)
+            if not buf:
+                break
+            data = carry + buf
+            cut = data.rfind(b"\n")
+            if cut < 0:
+                carry = data
+                continue
+            carry = data[cut + 1:]
+            s, v = _parse(data[:cut + 1])
+            steps.append(s)
+            dvs.append(v)
+        end = f.tell() - len(carry)
+    if not steps:
+        return np.empty(0, np.int64), np.empty(0, np.float64), end
+    return np.concatenate(steps), np.concatenate(dvs), end
+
+def _cache_path(log_path: str) -> str:
+    h = hashlib.sha1(os.path.abspath(log_path).encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{h}.npz")
+
+def _signature(path: str, end: int) -> int:
+    # Hash of the SIG_BYTES before offset end (the last boost lines scanned)
+    with open(path, "rb") as f:
+        f.seek(max(0, end - SIG_BYTES))
+        data = f.read(min(end, SIG_BYTES))
+    return int.from_bytes(hashlib.sha1(data).digest()[:8], "little", signed=True)
+
+def load_boost(log_path: str, use_cache: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    # (steps, dV) for one log; appends to the cached arrays when it grew
+    st = os.stat(log_path)
+    cpath = _cache_path(log_path)
+    steps = dv = None
+    start = 0
+    if use_cache:
+        try:
+            with np.load(cpath) as z:
+                meta = z["meta"]
+                if (len(meta) == 3 and int(meta[0]) == st.st_ino and int(meta[1]) <= st.st_size
+                        and _signature(log_path, int(meta[1])) == int(meta[2])):
+                    steps, dv, start = z["steps"], z["dv"], int(meta[1])
+        except (OSError, KeyError, ValueError):
+            pass
+    if steps is not None and start == st.st_size:
+        return steps, dv
+    s, v, end = _scan(log_path, start)
+    if steps is not None:
+        if s.size and steps.size and s[0] <= steps[-1]:
+            # Steps went back: not a continuation of the cached scan
+            s, v, end = _scan(log_path, 0)
+        else:
+            s, v = np.concatenate((steps, s)), np.concatenate((dv, v))
+    if use_cache:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".boost.", suffix=".npz", dir=CACHE_DIR)
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, steps=s, dv=v, meta=np.array([st.st_ino, end, _signature(log_path, end)], np.int64))
+            os.replace(tmp, cpath)
+        except OSError:
+            pass
+    return s, v
+
+def anharmonicity(dv: np.ndarray) -> float:
+    var = float(np.var(dv))
+    if dv.size < 3 or var <= 0.0:
+        return 0.0
+    p, edges = np.histogram(dv, bins="fd", density=True)
+    width = np.diff(edges)
+    nz = p > 0
+    s = -float(np.sum(p[nz] * np.log(p[nz]) * width[nz]))
+    return 0.5 * np.log(2.0 * np.pi * np.e * var) - s
+
+def boost_stats(dv: np.ndarray) -> Optional[BoostStats]:
+    if dv.size == 0:
+        return None
+    return BoostStats(int(dv.size), float(dv.mean()), float(dv.std()),
+                      float(dv.min()), float(dv.max()), float(anharmonicity(dv)))
+
+def sigma0(conf_path: str) -> dict:
+    try:
+        with open(conf_path, "r", encoding="utf-8", errors="replace") as f:
+            return {f"sigma0{k.upper()}": float(v) for k, v in SIGMA_RE.findall(f.read())}
+    except OSError:
+        return {}
+
+def segment_logs(namd_proc_dir: str, name: str) -> List[Tuple[str, str, str]]:
+    # [(tag, conf, log)] for equil, npt1..npt8 in run order
+    return [(tag,) + stage_files(sh) for tag, sh in gamd_stage_scripts(namd_proc_dir, name)]
+
+def chain_report(namd_proc_dir: str, name: str, include_equil: bool = False,
+                 max_std: float = DEFAULT_MAX_STD, max_anharm: float = DEFAULT_MAX_ANHARM) -> dict:
+    segs, pooled, warnings = [], [], []
+    for tag, conf, log in segment_logs(namd_proc_dir, name):
+        if tag == "equil" and not include_equil:
+            continue
+        if not os.path.isfile(log):
+            continue
+        steps, dv = load_boost(log)
+        st = boost_stats(dv)
+        row = {"segment": tag, "log": log, **sigma0(conf)}
+        if st is None:
+            row["n"] = 0
+        else:
+            row.update(st.as_dict(), last_step=int(steps[-1]))
+            if st.std > max_std:
+                warnings.append(f"{tag}: std {st.std:.2f} > {max_std:g}")
+            if st.anharm > max_anharm:
+                warnings.append(f"{tag}: anharmonicity {st.anharm:.4f} > {max_anharm:g}")
+            if tag != "equil":
+                pooled.append(dv)
+        segs.append(row)
+    total = boost_stats(np.concatenate(pooled)) if pooled else None
+    return {"name": name, "segments": segs, "total": total.as_dict() if total else None, "warnings": warnings}
+
+def format_report(rep: dict) -> List[str]:
+    out = [f"{rep['name']}:"]
+    for s in rep["segments"]:
+        if not s.get("n"):
+            out.append(f"  {s['segment']:<6} no boost lines yet")
+            continue
+        sig = " ".join(f"{k}={s[k]:g}" for k in ("sigma0P", "sigma0D") if k in s)
+        out.append(f"  {s['segment']:<6} n={s['n']:<6} mean={s['mean']:8.3f} std={s['std']:7.3f} "
+                   f"anharm={s['anharm']:.4f}  {sig}")
+    t = rep["total"]
+    if t:
+        out.append(f"  {'npt*':<6} n={t['n']:<6} mean={t['mean']:8.3f} std={t['std']:7.3f} anharm={t['anharm']:.4f}")
+    for w in rep["warnings"]:
+        out.append(f"  ! {w}")
+    return out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="GaMD boost potential (dV) statistics per segment")
+    ap.add_argument("names", nargs="+", help="run names under NAMD_PROC_DIR (e.g. TCR_06_1)")
+    ap.add_argument("--equil", action="store_true", help="also report the equil stage")
+    ap.add_argument("--max-std", type=float, default=DEFAULT_MAX_STD)
+    ap.add_argument("--max-anharm", type=float, default=DEFAULT_MAX_ANHARM)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    namd_proc_dir = load_config().namd_proc_dir
+    reps = [chain_report(namd_proc_dir, n, args.equil, args.max_std, args.max_anharm) for n in args.names]
+    if args.json:
+        print(json.dumps(reps, indent=1))
+    else:
+        for r in reps:
+            print("\n".join(format_report(r)))
+    return 1 if any(r["warnings"] for r in reps) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
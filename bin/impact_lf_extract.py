@@ -0,0 +1,174 @@
+# bin/impact_lf_extract.py
+# Writes <run>/<name>-mini-LF.pdb, the structure equil starts from, without
+# VMD. The coordinates are the last complete frame of mini/<name>-mini.dcd
+# (whatever its length), or mini/<name>-mini.coor when there is no DCD.
+# Atom records are copied from the PDB mini started from
+# (mini/<name>_solvated_ionized_centered.pdb) with only x/y/z replaced; if
+# that is gone they are written from <name>_ionized.psf. One process handles
+# any number of targets:
+#   impact_lf_extract.py TCR_01_1 TCR_02_1      (names under NAMD_PROC_DIR)
+#   impact_lf_extract.py --all
+#   impact_lf_extract.py .                      (a run dir, as run_mini_lf.sh does)
+import os
+import sys
+import json
+import math
+import argparse
+import tempfile
+from typing import List, Tuple
+
+import numpy as np
+
+from impact_config import load_config
+from impact_dcd import DCDError, DCDFile
+from impact_topology import TopologyError, load_psf
+
+class LFError(Exception):
+    pass
+
+def mini_paths(run_dir: str, name: str) -> dict:
+    mini = os.path.join(run_dir, "mini")
+    return {
+        "dcd": os.path.join(mini, f"{name}-mini.dcd"),
+        "coor": os.path.join(mini, f"{name}-mini.coor"),
+        "template": os.path.join(mini, f"{name}_solvated_ionized_centered.pdb"),
+        "psf": os.path.join(run_dir, f"{name}_ionized.psf"),
+        "out": os.path.join(run_dir, f"{name}-mini-LF.pdb"),
+    }
+
+def read_coor(path: str) -> np.ndarray:
+    # NAMD binary coordinates: int32 natoms, then natoms x (x, y, z) doubles
+    with open(path, "rb") as f:
+        data = f.read()
+    for e in ("<", ">"):
+        if len(data) >= 4:
+            n = int(np.frombuffer(data[:4], dtype=e + "i4")[0])
+            if n > 0 and len(data) == 4 + 24 * n:
+                return np.frombuffer(data[4:], dtype=e + "f8").reshape(n, 3)
+    raise LFError(f"{path}: not a NAMD binary .coor file")
+
+def _cell_to_cryst(cell: np.ndarray) -> Tuple[float, float, float, float, float, float]:
+    # DCD unit cell (A, gamma, B, beta, alpha, C) -> a, b, c, alpha, beta, gamma;
+    # angles may be stored as cosines
+    a, gamma, b, beta, alpha, c = (float(v) for v in cell)
+    angles = [alpha, beta, gamma]
+    if all(-1.0 <= v <= 1.0 for v in angles):
+        angles = [math.degrees(math.acos(v)) for v in angles]
+    return a, b, c, angles[0], angles[1], angles[2]
+
+def final_coords(paths: dict, source: str = "auto"):
+    # (xyz (n, 3), CRYST1 tuple or None, description)
+    if source in ("auto", "dcd") and os.path.isfile(paths["dcd"]):
+        with DCDFile(paths["dcd"]) as dcd:
+            if len(dcd):
+                fr = dcd.frame(-1)
+                cryst = _cell_to_cryst(fr.cell) if fr.cell is not None and fr.box.all() else None
+                return fr.xyz().astype(np.float64), cryst, f"{os.path.basename(paths['dcd'])} frame {fr.index}"
+        if source == "dcd":
+            raise LFError(f"{paths['dcd']}: no complete frames")
+    if source in ("auto", "coor") and os.path.isfile(paths["coor"]):
+        return read_coor(paths["coor"]), None, os.path.basename(paths["coor"])
+    want = {"auto": "mini .dcd or .coor", "dcd": paths["dcd"], "coor": paths["coor"]}[source]
+    raise LFError(f"no {want} found")
+
+def _xyz_cols(xyz: np.ndarray) -> List[str]:
+    return [f"{x:8.3f}{y:8.3f}{z:8.3f}" for x, y, z in xyz.tolist()]
+
+def pdb_from_template(template: str, xyz: np.ndarray) -> List[str]:
+    with open(template, "r", encoding="utf-8", errors="replace") as f:
+        atoms = [l.rstrip("\n") for l in f if l.startswith(("ATOM  ", "HETATM"))]
+    if len(atoms) != len(xyz):
+        raise LFError(f"{os.path.basename(template)} has {len(atoms)} atoms, coordinates have {len(xyz)}")
+    return [l[:30] + c + l[54:] for l, c in zip(atoms, _xyz_cols(xyz))]
+
+def pdb_from_psf(psf: str, xyz: np.ndarray) -> List[str]:
+    a = load_psf(psf).atoms
+    if len(a) != len(xyz):
+        raise LFError(f"{os.path.basename(psf)} has {len(a)} atoms, coordinates have {len(xyz)}")
+    out = []
+    for i, (seg, rid, ic, rn, nm, c) in enumerate(zip(a["segid"].tolist(), a["resid"].tolist(), a["icode"].tolist(),
+                                                      a["resname"].tolist(), a["name"].tolist(), _xyz_cols(xyz)), 1):
+        serial = f"{i:5d}" if i < 100000 else "*****"
+        nm = nm if len(nm) >= 4 else " " + nm
+        out.append(f"ATOM  {serial} {nm:<4s} {rn:<4s} {rid % 10000:4d}{ic or ' ':1s}   {c}  1.00  0.00      {seg:<4s}")
+    return out
+
+def write_pdb(path: str, lines: List[str], cryst=None, remark: str = ""):
+    d = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".lf.", suffix=".pdb", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if remark:
+                f.write(f"REMARK    {remark}\n")
+            if cryst:
+                f.write("CRYST1%9.3f%9.3f%9.3f%7.2f%7.2f%7.2f P 1           1\n" % cryst)
+            f.write("\n".join(lines))
+            f.write("\nEND\n")
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except Exception:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+
+def extract(run_dir: str, name: str, source: str = "auto", force: bool = False) -> Tuple[bool, str]:
+    p = mini_paths(run_dir, name)
+    if not force and os.path.isfile(p["out"]):
+        newest = max((os.path.getmtime(p[k]) for k in ("dcd", "coor") if os.path.isfile(p[k])), default=0)
+        if os.path.getmtime(p["out"]) >= newest:
+            return True, "up to date"
+    try:
+        xyz, cryst, what = final_coords(p, source)
+        if os.path.isfile(p["template"]):
+            lines, atoms_from = pdb_from_template(p["template"], xyz), os.path.basename(p["template"])
+        else:
+            lines, atoms_from = pdb_from_psf(p["psf"], xyz), os.path.basename(p["psf"])
+        write_pdb(p["out"], lines, cryst, f"{name} mini last frame: {what}")
+    except (OSError, DCDError, TopologyError, LFError) as e:
+        return False, str(e)
+    return True, f"{what} + {atoms_from} -> {os.path.basename(p['out'])}"
+
+def resolve(arg: str, namd_proc_dir: str) -> Tuple[str, str]:
+    # A run dir path, or a name under NAMD_PROC_DIR -> (run_dir, name)
+    if os.path.isdir(arg) and (os.sep in arg or arg in (".", "..")):
+        run_dir = os.path.abspath(arg)
+        return run_dir, os.path.basename(run_dir)
+    return os.path.join(namd_proc_dir, arg), arg
+
+def targets(namd_proc_dir: str) -> List[str]:
+    # Run dirs with a mini DCD or .coor
+    out = []
+    for n in sorted(os.listdir(namd_proc_dir)) if os.path.isdir(namd_proc_dir) else ():
+        p = mini_paths(os.path.join(namd_proc_dir, n), n)
+        if os.path.isfile(p["dcd"]) or os.path.isfile(p["coor"]):
+            out.append(n)
+    return out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Write <name>-mini-LF.pdb from the last minimization frame (no VMD)")
+    ap.add_argument("targets", nargs="*", help="names under NAMD_PROC_DIR or run dir paths")
+    ap.add_argument("--all", action="store_true", help="every run dir with a mini .dcd/.coor")
+    ap.add_argument("--source", choices=["auto", "dcd", "coor"], default="auto",
+                    help="coordinates from the DCD's last frame or the final .coor (auto: DCD, else .coor)")
+    ap.add_argument("--force", action="store_true", help="rewrite even if the LF pdb is newer than its source")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    namd_proc_dir = load_config().namd_proc_dir
+    todo = [resolve(t, namd_proc_dir) for t in args.targets]
+    if args.all:
+        todo += [(os.path.join(namd_proc_dir, n), n) for n in targets(namd_proc_dir)]
+    if not todo:
+        ap.error("no targets (give names, run dirs or --all)")
+    results = []
+    for run_dir, name in todo:
+        ok, detail = extract(run_dir, name, args.source, args.force)
+        results.append({"name": name, "ok": ok, "detail": detail})
+    if args.json:
+        print(json.dumps(results, indent=1))
+    else:
+        for r in results:
+            print(f"  [{'✓' if r['ok'] else '!'}] {r['name']}: {r['detail']}")
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
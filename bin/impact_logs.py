@@ -0,0 +1,176 @@
+# bin/impact_logs.py
+# Log tailing for the progress screens. LogFollower keeps its offset and
+# inode between ticks, so each poll is one stat() plus a read of whatever
+# was appended since the last one. A hash of the bytes before the offset
+# tells an append from a rewrite on the same inode (SLURM truncating a
+# reused log/IMPACT_<name>.out when the job starts).
+import os
+import hashlib
+from itertools import islice
+from collections import deque
+from typing import List, Optional
+
+DEFAULT_LINES = 500
+INITIAL_BYTES = 256 * 1024
+MAX_READ = 1024 * 1024
+SIG_BYTES = 4096
+
+def signature(fh, end: int) -> bytes:
+    # Hash of the SIG_BYTES before offset end of an open binary file. A log
+    # truncated and rewritten on the same inode (a rerun with >) changes it
+    # even once it has grown past end again.
+    fh.seek(max(0, end - SIG_BYTES))
+    return hashlib.sha1(fh.read(min(end, SIG_BYTES))).digest()
+
+def _clip(lines, n, w):
+    lines = list(lines)[-n:] if n > 0 else []
+    return [ln[: max(0, w - 6)] for ln in lines]
+
+def tail_lines(path, n=50, w=120):
+    # One-shot tail: reads 4 KB blocks backwards until n lines are covered
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size <= 0:
+                return []
+            block = 4096
+            chunks = []
+            read = 0
+            newlines = 0
+            while size > 0 and read < MAX_READ and newlines <= n + 4:
+                to_read = block if size >= block else size
+                size -= to_read
+                f.seek(size)
+                chunk = f.read(to_read)
+                chunks.append(chunk)
+                newlines += chunk.count(b"\n")
+                read += to_read
+            data = b"".join(reversed(chunks))
+            return _clip(data.decode(errors="ignore").splitlines(), n, w)
+    except Exception:
+        return []
+
+class LogFollower:
+    def __init__(self, path: str, max_lines: int = DEFAULT_LINES, initial_bytes: int = INITIAL_BYTES):
+        self.path = path
+        self.lines = deque(maxlen=max_lines)
+        self.initial_bytes = initial_bytes
+        self._fh = None
+        self._ino: Optional[int] = None
+        self._offset = 0
+        self._partial = b""
+        self._sig = None
+        self._finished = False
+
+    def finish(self):
+        # The writer is done: read what is left, then close for good and
+        # keep serving the buffered lines (poll no longer reopens the file)
+        if not self._finished:
+            self.poll()
+        self.close()
+        self._finished = True
+
+    def close(self):
+        if self._fh is not None:
+            try: self._fh.close()
+            except Exception: pass
+        self._fh = None
+        self._ino = None
+        self._sig = None
+
+    def _open(self, from_start: bool):
+        try:
+            fh = open(self.path, "rb")
+            st = os.fstat(fh.fileno())
+        except OSError:
+            return False
+        start = 0 if from_start else max(0, st.st_size - self.initial_bytes)
+        self._fh, self._ino, self._partial = fh, st.st_ino, b""
+        self._seek(start)
+        return True
+
+    def _rewritten(self) -> bool:
+        try:
+            changed = self._sig is not None and signature(self._fh, self._offset) != self._sig
+            self._fh.seek(self._offset)
+            return changed
+        except OSError:
+            return False
+
+    def _seek(self, pos):
+        self._fh.seek(pos)
+        self._offset = pos
+        if pos > 0:
+            # Landed mid-file: drop the partial first line
+            self._fh.readline()
+            self._offset = self._fh.tell()
+
+    def _feed(self, data: bytes):
+        if not data:
+            return
+        data = self._partial + data
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            self._partial = data
+            return
+        self._partial = data[cut + 1:]
+        self.lines.extend(data[:cut].decode(errors="ignore").splitlines())
+
+    def _drain(self, limit=MAX_READ):
+        data = self._fh.read(limit)
+        self._offset += len(data)
+        self._feed(data)
+
+    def poll(self) -> bool:
+        # Returns True if new text was picked up
+        if self._finished:
+            return False
+        before = (self._offset, len(self._partial), self._ino)
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        if self._fh is None:
+            # (Re)open re-reads the tail, so start from an empty buffer
+            self.lines.clear()
+            if not self._open(from_start=False):
+                return False
+        elif st.st_ino != self._ino:
+            # Rotated: finish the old file, then follow the new one from the top
+            try: self._drain()
+            except Exception: pass
+            self.close()
+            if not self._open(from_start=True):
+                return False
+        elif st.st_size < self._offset or (st.st_size > self._offset and self._rewritten()):
+            # Truncated in place (e.g. sbatch reopening %x.out), maybe
+            # already grown past where we were
+            self.lines.clear()
+            self._partial = b""
+            self._seek(0)
+        try:
+            size = os.fstat(self._fh.fileno()).st_size
+            if size - self._offset > MAX_READ:
+                # Too far behind: jump to the tail rather than replaying it all
+                self._partial = b""
+                self._seek(max(0, size - self.initial_bytes))
+            if size > self._offset:
+                self._drain()
+                self._sig = signature(self._fh, self._offset)
+                self._fh.seek(self._offset)
+        except Exception:
+            self.close()
+            return False
+        return (self._offset, len(self._partial), self._ino) != before
+
+    def tail(self, n=50, w=120) -> List[str]:
+        self.poll()
+        if n <= 0:
+            return []
+        tail = [self._partial.decode(errors="ignore")] if self._partial else []
+        tail.extend(islice(reversed(self.lines), n - len(tail)))
+        return _clip(reversed(tail), n, w)
+
+    def last(self, w=120) -> str:
+        return (self.tail(n=1, w=w) or [""])[-1]
@@ -0,0 +1,347 @@
+# bin/impact_namdlog.py
+# Live progress for NAMD stage logs. A LogProgress keeps its offset and
+# inode, so a poll is one stat() plus a read of the bytes appended since the
+# last one (checked against a hash of the bytes already read, so a log
+# rewritten in place starts over); the first poll reads the head (TIMESTEP / FIRST TIMESTEP) and
+# then only the tail. From the log:
+#   TIMING:  <step> ... Wall: <t>, <s>/step, <h> hours remaining
+#   ENERGY:  <step> ...
+#   Info: Benchmark time: ... <s> s/step ...
+# and from the stage's .conf the steps it will run (sum of `run`/`minimize`,
+# else `numsteps`), it derives the current step, ns/day and an ETA.
+import os
+import re
+import glob
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from impact_logs import signature
+from impact_stage_index import DONE_RE
+
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 256 * 1024
+MAX_READ = 4 * 1024 * 1024
+
+_NUM = rb"([-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)"
+TIMING_RE = re.compile(rb"^TIMING:\s+(\d+)\s.*?Wall:\s+" + _NUM + rb",\s+" + _NUM + rb"/step", re.M)
+ENERGY_RE = re.compile(rb"^ENERGY:\s+(\d+)", re.M)
+BENCH_RE = re.compile(rb"Benchmark time:.*?" + _NUM + rb"\s+s/step", re.M)
+TIMESTEP_RE = re.compile(rb"^Info: TIMESTEP\s+" + _NUM, re.M)
+FIRST_RE = re.compile(rb"^Info: FIRST TIMESTEP\s+(\d+)", re.M)
+FATAL_RE = re.compile(rb"^FATAL ERROR", re.M)
+
+CONF_RUN_RE = re.compile(r"^\s*(run|minimize)\s+(\d+)\s*(?:[;#].*)?$", re.I | re.M)
+CONF_CMD_RE = re.compile(r"^\s*(run|minimize)\b", re.I)
+CONF_KEY_RE = re.compile(r"^\s*(numsteps|timestep|firsttimestep)\s+([0-9.]+)", re.I | re.M)
+SCRIPT_RE = re.compile(r"""^[^#\n]*?(['"]?)([^\s'"<>]+\.conf)\1[^\n>]*?&?>\s*(['"]?)([^\s'"]+\.log)\3""", re.M)
+
+def _last(rx, data):
+    m = None
+    for m in rx.finditer(data):
+        pass
+    return m
+
+class StageProgress(NamedTuple):
+    step: Optional[int]            # last step the log reported
+    first_step: int
+    target: Optional[int]          # steps the conf asks for
+    timestep_fs: Optional[float]
+    sec_per_step: Optional[float]  # wall time, latest TIMING (or Benchmark)
+    done: bool
+    failed: bool
+
+    @property
+    def progressed(self) -> int:
+        # Not clamped to target: a conf can run more steps than we counted
+        if self.done and self.target:
+            return self.target
+        if self.step is None:
+            return 0
+        return max(0, self.step - self.first_step)
+
+    @property
+    def fraction(self) -> Optional[float]:
+        # Below 1 until the log says it finished
+        if not self.target:
+            return None
+        f = self.progressed / self.target
+        return f if self.done else min(f, 0.99)
+
+    @property
+    def ns_per_day(self) -> Optional[float]:
+        if not self.sec_per_step or not self.timestep_fs:
+            return None
+        return self.timestep_fs * 1e-6 * 86400.0 / self.sec_per_step
+
+    @property
+    def eta_sec(self) -> Optional[float]:
+        if self.done:
+            return 0.0
+        if not self.target or not self.sec_per_step or self.progressed >= self.target:
+            return None
+        return (self.target - self.progressed) * self.sec_per_step
+
+EMPTY = StageProgress(None, 0, None, None, None, False, False)
+
+def parse_conf_text(text: str) -> Tuple[Optional[int], Optional[float], int]:
+    # (steps to run, timestep fs, firsttimestep). The target is unknown
+    # (None) when a run/minimize is inside a { } block (a Tcl loop or proc)
+    # or takes a variable, since the steps cannot be counted from the text.
+    keys = {k.lower(): v for k, v in CONF_KEY_RE.findall(text)}
+    runs, depth, countable = [], 0, True
+    for line in text.splitlines():
+        code = line.split("#", 1)[0] if not line.lstrip().startswith("#") else ""
+        if CONF_CMD_RE.match(code):
+            m = CONF_RUN_RE.match(code)
+            if depth > 0 or not m:
+                countable = False
+            else:
+                runs.append(int(m.group(2)))
+        depth = max(0, depth + code.count("{") - code.count("}"))
+    if not countable:
+        target = None
+    else:
+        target = sum(runs) if runs else (int(float(keys["numsteps"])) if "numsteps" in keys else None)
+    ts = float(keys["timestep"]) if "timestep" in keys else None
+    first = int(float(keys.get("firsttimestep", 0)))
+    return target, ts, first
+
+def stage_files(script_path: str) -> Tuple[str, str]:
+    # (conf, log) the stage script runs; falls back to <script>.conf/.log
+    base = os.path.splitext(script_path)[0]
+    conf, log = base + ".conf", base + ".log"
+    try:
+        with open(script_path, "r", encoding="utf-8", errors="replace") as f:
+            m = _last(SCRIPT_RE, f.read())
+    except OSError:
+        m = None
+    if m:
+        d = os.path.dirname(script_path)
+        conf, log = os.path.join(d, m.group(2)), os.path.join(d, m.group(4))
+    return conf, log
+
+def gamd_stage_scripts(namd_proc_dir: str, name: str) -> List[Tuple[str, str]]:
+    # [(tag, script)] of a run's GaMD chain in order: equil, npt1, npt2, ...
+    gdir = os.path.join(namd_proc_dir, name, "gamd")
+    stages = []
+    equil = os.path.join(gdir, f"{name}-gamd-equil.sh")
+    if os.path.isfile(equil):
+        stages.append(("equil", equil))
+    npts = []
+    for sh in glob.glob(os.path.join(gdir, f"{name}-gamd-npt*.sh")):
+        m = re.search(r"npt(\d+)\.sh$", sh)
+        if m:
+            npts.append((int(m.group(1)), sh))
+    stages.extend((f"npt{n}", sh) for n, sh in sorted(npts))
+    return stages
+
+class LogProgress:
+    def __init__(self, log_path: str, conf_path: Optional[str] = None):
+        self.log_path = log_path
+        self.conf_path = conf_path
+        self._conf_key = None
+        self._conf = (None, None, 0)
+        self._reset()
+
+    def _reset(self):
+        self._ino = None
+        self._offset = 0
+        self._partial = b""
+        self._stamp = None
+        self._sig = None
+        self.step = None
+        self.first_step = None
+        self.timestep_fs = None
+        self.sec_per_step = None
+        self.done = False
+        self.failed = False
+
+    def _read_conf(self):
+        if not self.conf_path:
+            return
+        try:
+            st = os.stat(self.conf_path)
+        except OSError:
+            return
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._conf_key:
+            return
+        try:
+            with open(self.conf_path, "r", encoding="utf-8", errors="replace") as f:
+                self._conf = parse_conf_text(f.read())
+            self._conf_key = key
+        except OSError:
+            pass
+
+    def _feed(self, data: bytes):
+        data = self._partial + data
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            self._partial = data
+            return
+        self._partial = data[cut + 1:]
+        data = data[:cut + 1]
+        m = _last(TIMING_RE, data)
+        if m:
+            self.step = max(self.step or 0, int(m.group(1)))
+            self.sec_per_step = float(m.group(3))
+        m = _last(ENERGY_RE, data)
+        if m:
+            self.step = max(self.step or 0, int(m.group(1)))
+        if self.sec_per_step is None:
+            m = _last(BENCH_RE, data)
+            if m:
+                self.sec_per_step = float(m.group(1))
+        if self.timestep_fs is None:
+            m = TIMESTEP_RE.search(data)
+            if m:
+                self.timestep_fs = float(m.group(1))
+        if self.first_step is None:
+            m = FIRST_RE.search(data)
+            if m:
+                self.first_step = int(m.group(1))
+        if not self.done and DONE_RE.search(data):
+            self.done = True
+        if not self.failed and FATAL_RE.search(data):
+            self.failed = True
+
+    def poll(self) -> StageProgress:
+        self._read_conf()
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            self._reset()
+            return self.snapshot()
+        stamp = (st.st_size, st.st_mtime_ns)
+        if stamp == self._stamp and st.st_ino == self._ino:
+            return self.snapshot()
+        try:
+            with open(self.log_path, "rb") as f:
+                if (st.st_ino != self._ino or st.st_size < self._offset
+                        or signature(f, self._offset) != self._sig):
+                    # New or rewritten log: header first, then jump to the tail
+                    self._reset()
+                    self._ino = st.st_ino
+                    f.seek(0)
+                    head = f.read(HEAD_BYTES)
+                    self._feed(head)
+                    self._offset = len(head)
+                    if st.st_size - self._offset > TAIL_BYTES:
+                        f.seek(st.st_size - TAIL_BYTES)
+                        f.readline()
+                        self._partial = b""
+                        self._offset = f.tell()
+                if st.st_size > self._offset:
+                    if st.st_size - self._offset > MAX_READ:
+                        f.seek(st.st_size - TAIL_BYTES)
+                        f.readline()
+                        self._partial = b""
+                    else:
+                        f.seek(self._offset)
+                    data = f.read(MAX_READ)
+                    self._offset = f.tell()
+                    self._feed(data)
+                self._sig = signature(f, self._offset)
+                self._stamp = stamp
+        except OSError:
+            self._reset()
+        return self.snapshot()
+
+    def snapshot(self) -> StageProgress:
+        target, conf_ts, conf_first = self._conf
+        return StageProgress(
+            self.step,
+            self.first_step if self.first_step is not None else conf_first,
+            target,
+            self.timestep_fs or conf_ts,
+            self.sec_per_step,
+            self.done,
+            self.failed,
+        )
+
+class NamdLogIndex:
+    # One LogProgress per log path, shared by every screen and thread
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trackers: Dict[str, LogProgress] = {}
+        self._targets: Dict[str, Tuple[Tuple[int, int], Optional[int]]] = {}
+
+    def stage(self, log_path: str, conf_path: Optional[str] = None) -> StageProgress:
+        key = os.path.abspath(log_path)
+        with self._lock:
+            t = self._trackers.get(key)
+            if t is None:
+                t = self._trackers[key] = LogProgress(key, conf_path)
+            elif conf_path:
+                t.conf_path = conf_path
+            return t.poll()
+
+    def target(self, conf_path: str) -> Optional[int]:
+        # Steps a not-yet-started stage will run, cached by (mtime, size)
+        try:
+            st = os.stat(conf_path)
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            hit = self._targets.get(conf_path)
+        if hit and hit[0] == key:
+            return hit[1]
+        try:
+            with open(conf_path, "r", encoding="utf-8", errors="replace") as f:
+                n = parse_conf_text(f.read())[0]
+        except OSError:
+            return None
+        with self._lock:
+            self._targets[conf_path] = (key, n)
+        return n
+
+    def chain(self, stages: List[Tuple[str, str]], first_pending: int) -> Tuple[StageProgress, Optional[float]]:
+        # stages: [(conf, log)] in run order. Returns the running stage's
+        # progress and an ETA for the rest of the chain, assuming the stages
+        # still to come run at the current stage's speed.
+        cur = self.stage(stages[first_pending][1], stages[first_pending][0])
+        eta = cur.eta_sec
+        if eta is None or not cur.sec_per_step:
+            return cur, None
+        for conf, _log in stages[first_pending + 1:]:
+            n = self.target(conf)
+            if n is None:
+                return cur, None
+            eta += n * cur.sec_per_step
+        return cur, eta
+
+_INDEX: Optional[NamdLogIndex] = None
+
+def get_namdlog_index() -> NamdLogIndex:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = NamdLogIndex()
+    return _INDEX
+
+def fmt_eta(sec: Optional[float]) -> str:
+    if sec is None:
+        return "-"
+    sec = int(sec)
+    if sec < 60:
+        return "<1m" if sec > 0 else "0m"
+    m = sec // 60
+    if m < 60:
+        return f"{m}m"
+    h, m = divmod(m, 60)
+    if h < 48:
+        return f"{h}h{m:02d}m"
+    d, h = divmod(h, 24)
+    return f"{d}d{h:02d}h"
+
+def fmt_rate(ns_day: Optional[float]) -> str:
+    if ns_day is None:
+        return "-"
+    return f"{ns_day:.1f}" if ns_day < 100 else f"{ns_day:.0f}"
+
+def fmt_steps(p: StageProgress) -> str:
+    if p.step is None and not p.done:
+        return "-"
+    if p.target:
+        return f"{100.0 * p.fraction:.0f}%"
+    return str(p.progressed)
@@ -0,0 +1,125 @@
+# bin/impact_project_index.py
+# Shared view of PDB_DIR / PDB_PROC_DIR / NAMD_PROC_DIR for all menus.
+# Each directory is read with one os.scandir() and cached with its mtime;
+# cached listings are re-validated (one stat per directory) at most every
+# CHECK_INTERVAL seconds, and only directories whose mtime moved are re-read.
+import os
+import time
+import threading
+from typing import Dict, List, Optional, Set
+
+CHECK_INTERVAL = 2.0
+
+class _Listing:
+    __slots__ = ("mtime", "checked_at", "entries")
+
+    def __init__(self, mtime, entries):
+        self.mtime = mtime
+        self.checked_at = time.time()
+        self.entries: Dict[str, bool] = entries  # name -> is_dir; mtime None = missing
+
+class ProjectIndex:
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, _Listing] = {}
+
+    def invalidate(self):
+        # Force the next lookup to re-stat; contents are re-read only if mtimes moved
+        with self._lock:
+            for li in self._dirs.values():
+                li.checked_at = 0.0
+
+    def _scandir(self, path) -> _Listing:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            entries = {}
+            with os.scandir(path) as it:
+                for e in it:
+                    try:
+                        entries[e.name] = e.is_dir()
+                    except OSError:
+                        entries[e.name] = False
+            return _Listing(mtime, entries)
+        except OSError:
+            return _Listing(None, {})
+
+    def listing(self, path) -> Dict[str, bool]:
+        path = os.path.abspath(path)
+        now = time.time()
+        with self._lock:
+            li = self._dirs.get(path)
+        if li is not None:
+            if now - li.checked_at < self.check_interval:
+                return li.entries
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime == li.mtime:
+                li.checked_at = now
+                return li.entries
+        li = self._scandir(path)
+        with self._lock:
+            self._dirs[path] = li
+        return li.entries
+
+    # -------------------- Setup PDB --------------------
+
+    def pdbs(self, pdb_dir) -> List[str]:
+        return sorted(os.path.splitext(f)[0] for f in self.listing(pdb_dir) if f.lower().endswith(".pdb"))
+
+    def processed(self, pdb_proc_dir) -> Set[str]:
+        return {f if is_dir else os.path.splitext(f)[0] for f, is_dir in self.listing(pdb_proc_dir).items()}
+
+    # -------------------- Setup NAMD --------------------
+
+    def processed_systems(self, pdb_proc_dir) -> List[str]:
+        names = set()
+        for f, is_dir in self.listing(pdb_proc_dir).items():
+            if is_dir:
+                names.add(f)
+            elif f.lower().endswith(".pdb"):
+                names.add(os.path.splitext(f)[0])
+        return sorted(names)
+
+    def namd_prepared(self, namd_proc_dir, names) -> Set[str]:
+        existing = self.listing(namd_proc_dir)
+        ready = set()
+        for n in names:
+            if n in existing or any((n + suf) in existing for suf in (".psf", ".conf", ".namd", ".xsc")):
+                ready.add(n)
+        return ready
+
+    # -------------------- Run GaMD --------------------
+
+    def gamd_candidates(self, namd_proc_dir) -> List[str]:
+        items = []
+        for entry, is_dir in sorted(self.listing(namd_proc_dir).items()):
+            if not is_dir:
+                continue
+            run_dir = os.path.join(namd_proc_dir, entry)
+            if not self.listing(run_dir).get("NPT2"):
+                continue
+            if any(f.endswith(".dcd") for f in self.listing(os.path.join(run_dir, "NPT2"))):
+                items.append(entry)
+        return items
+
+    def gamd_prepared(self, namd_proc_dir, names) -> Set[str]:
+        ready = set()
+        for n in names:
+            run_dir = os.path.join(namd_proc_dir, n)
+            if not self.listing(run_dir).get("gamd"):
+                continue
+            head = f"{n}-gamd-"
+            if any(f.startswith(head) and f.endswith(".sh") for f in self.listing(os.path.join(run_dir, "gamd"))):
+                ready.add(n)
+        return ready
+
+_INDEX: Optional[ProjectIndex] = None
+
+def get_project_index() -> ProjectIndex:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = ProjectIndex()
+    return _INDEX
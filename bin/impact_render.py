@@ -0,0 +1,42 @@
+# bin/impact_render.py
+# Frame helpers shared by every screen. curses already keeps a model of
+# what is on the terminal and sends only the cells that differ from it, as
+# long as a frame is not started with clear(): that marks the whole screen
+# for repaint and resends every cell. Screens therefore build a frame with
+#   begin_frame(stdscr)   erase() the backing window, no terminal output
+#   ... addstr ...
+#   end_frame(stdscr)     noutrefresh() + doupdate(): one diffed write
+# and progress loops gate their redraws with a FrameLimiter.
+import time
+import curses
+
+DEFAULT_FPS = 5
+
+def ui_fps() -> int:
+    # UI_FPS in IMPACT.conf caps progress-screen redraws; imported here so the
+    # main menu does not pay for the config module before its first frame
+    from impact_config import load_config
+    return load_config().get_int("UI_FPS", DEFAULT_FPS, minimum=1)
+
+def begin_frame(stdscr):
+    stdscr.erase()
+
+def end_frame(stdscr):
+    stdscr.noutrefresh()
+    curses.doupdate()
+
+def force_repaint(stdscr):
+    # Next end_frame() resends everything (after a resize or a stray write)
+    stdscr.clearok(True)
+
+class FrameLimiter:
+    def __init__(self, fps: int = None):
+        self.interval = 1.0 / max(1, fps or ui_fps())
+        self._last = 0.0
+
+    def due(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
@@ -1,15 +1,24 @@
-import os, re, glob, stat, shutil, subprocess, time, curses
+import os, re, subprocess, time, curses, threading
+from concurrent.futures import ThreadPoolExecutor
 from curses import textpad, ascii
-from pathlib import Path
 from typing import Optional, List, Tuple
 
+from impact_slurm import get_cache
+from impact_stage_index import get_index
+from impact_project_index import get_project_index
+from impact_templates import render_gamd, write_once
+from impact_config import load_config
+from impact_render import begin_frame, end_frame, FrameLimiter
+from impact_widgets import VirtualList, FILTER_KEY, summary_line
+from impact_namdlog import gamd_stage_scripts, get_namdlog_index, stage_files, fmt_eta, fmt_rate, fmt_steps
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(BASE_DIR)
-DEFAULT_CONF = os.path.join(ROOT_DIR, "IMPACT.conf")
 
 SUBTITLE = "Run GaMD"
 EXAMPLES_ADD = "Add: e.g., TCR_06_1 TCR_07_2"
 EXAMPLES_REMOVE = "Remove: e.g., TCR_06_1 TCR_07_2"
+BELOW_LIST = 13   # summaries, menu and message under the table
 
 CFG_KEYS = [
     "NAMD_PROC_DIR",
@@ -22,28 +31,12 @@ CFG_KEYS = [
     "QOS",
     "WALL_TIME_GAMD_EQUIL",
     "WALL_TIME_GAMD_PROD",
+    "GAMD_WORKERS",
 ]
 
-def find_conf():
-    if os.path.exists(DEFAULT_CONF):
-        return DEFAULT_CONF
-    p = os.path.join(os.getcwd(), "IMPACT.conf")
-    return p if os.path.exists(p) else None
-
 def read_config():
-    conf = find_conf()
-    namd_proc_dir = os.path.join(ROOT_DIR, "2_output")
-    if conf and os.path.exists(conf):
-        base = os.path.dirname(conf)
-        with open(conf) as fh:
-            for line in fh:
-                s = line.strip()
-                if not s or s.startswith("#"):
-                    continue
-                if s.startswith("NAMD_PROC_DIR"):
-                    _, v = s.split("=", 1)
-                    namd_proc_dir = os.path.abspath(os.path.join(base, v.strip().strip('"').strip("'")))
-    return namd_proc_dir, (conf if conf else DEFAULT_CONF)
+    cfg = load_config()
+    return cfg.namd_proc_dir, cfg.path
 
 def tokens_from(s):
     s = s.replace(",", " ")
@@ -67,84 +60,11 @@ def init_colors():
         curses.init_pair(12, curses.COLOR_GREEN, -1)
     return err_attr, hint_attr
 
-def wrap_line(s, w):
-    if w <= 0:
-        return [""]
-    out, cur = [], ""
-    for tok in s.split():
-        if len(cur) + len(tok) + (1 if cur else 0) <= w:
-            cur = (cur + " " + tok).strip()
-        else:
-            out.append(cur)
-            cur = tok
-    if cur:
-        out.append(cur)
-    return out or [""]
-
-def wrap_tokens(stdscr, y, x, w, tokens, hi_idx=None, attr_hi=0, attr_norm=0):
-    if w <= 4:
-        return 0
-    cx, cy = x, y
-    used = 1
-    for i, tok in enumerate(tokens):
-        t = tok + " "
-        if cx + len(t) > w - 2:
-            cy += 1
-            cx = x
-            used += 1
-        attr = attr_hi if (hi_idx is not None and i == hi_idx) else attr_norm
-        try:
-            stdscr.addstr(cy, cx, t, attr)
-        except curses.error:
-            pass
-        cx += len(t)
-    return used
-
-def tail_lines(path, n=50, w=120):
-    try:
-        with open(path, "rb") as f:
-            f.seek(0, os.SEEK_END)
-            size = f.tell()
-            if size <= 0:
-                return []
-            block = 4096
-            chunks = []
-            read = 0
-            while size > 0 and read < 1024 * 1024 and sum(c.count(b"\n") for c in chunks) <= n + 4:
-                to_read = block if size >= block else size
-                size -= to_read
-                f.seek(size)
-                chunks.insert(0, f.read(to_read))
-                read += to_read
-            data = b"".join(chunks)
-            lines = data.decode(errors="ignore").splitlines()[-n:]
-            return [ln[: max(0, w - 6)] for ln in lines]
-    except Exception:
-        return []
-
 def list_gamd_candidates(namd_proc_dir):
-    items = []
-    root = Path(namd_proc_dir)
-    if not root.is_dir():
-        return []
-    for entry in sorted(os.listdir(root)):
-        run_dir = root / entry
-        if not run_dir.is_dir():
-            continue
-        hits = glob.glob(str(run_dir / "NPT2" / "*.dcd"))
-        if hits:
-            items.append(entry)
-    return items
+    return get_project_index().gamd_candidates(namd_proc_dir)
 
 def list_gamd_prepared(namd_proc_dir, names):
-    ready = set()
-    for n in names:
-        gdir = os.path.join(namd_proc_dir, n, "gamd")
-        if os.path.isdir(gdir):
-            scripts = glob.glob(os.path.join(gdir, f"{n}-gamd-*.sh"))
-            if scripts:
-                ready.add(n)
-    return ready
+    return get_project_index().gamd_prepared(namd_proc_dir, names)
 
 def safe_addstr(stdscr, y, x, s, attr=0):
     try:
@@ -158,31 +78,31 @@ def parse_combined(name):
         return None, None
     return m.group(1), m.group(2)
 
-def _chmod_x(path):
-    st = os.stat(path)
-    os.chmod(path, st.st_mode | stat.S_IXUSR)
-
-def _replace_in_file(path, find_pat, repl):
-    with open(path, "r", encoding="utf-8") as f:
-        s = f.read()
-    s2 = re.sub(find_pat, repl, s)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(s2)
-
-def _remove_in_file(path, find_pat):
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    with open(path, "w", encoding="utf-8") as f:
-        for ln in lines:
-            if not re.search(find_pat, ln):
-                f.write(ln)
-
-def _ensure_slurm_header(script_path, account, partition, exclude=None, ntasks_per_node=None, num_gpu=None, qos=None, wall_time=None):
-    with open(script_path, "r", encoding="utf-8") as f:
-        text = f.read()
+# -------------------- in-memory script edits --------------------
+# Each helper takes and returns file text; build_gamd_chain() chains them and
+# writes every file once at the end.
+
+def _universal(s):
+    return s.replace("\r\n", "\n").replace("\r", "\n")
+
+def _split_keepends(s):
+    parts = s.split("\n")
+    lines = [p + "\n" for p in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+def _tx_replace(text, find_pat, repl):
+    return re.sub(find_pat, repl, _universal(text))
+
+def _tx_remove(text, find_pat):
+    return "".join(ln for ln in _split_keepends(_universal(text)) if not re.search(find_pat, ln))
+
+def _tx_slurm_header(text, account, partition, exclude=None, ntasks_per_node=None, num_gpu=None, qos=None, wall_time=None):
+    text = _universal(text)
     lines = text.splitlines()
     if not lines:
-        return
+        return text
     shebang_idx = 0 if lines[0].startswith("#!") else None
     def repl_flag(lines, klist, new_line):
         found = False
@@ -216,13 +136,10 @@ def _ensure_slurm_header(script_path, account, partition, exclude=None, ntasks_p
         repl_flag(lines, ["gres"], f"#SBATCH --gres=gpu:{gcount}")
     if qos:
         repl_flag(lines, ["qos"], f"#SBATCH --qos={qos}")
-    text2 = "\n".join(lines) + ("\n" if not text.endswith("\n") else "")
-    with open(script_path, "w", encoding="utf-8") as f:
-        f.write(text2)
+    return "\n".join(lines) + ("\n" if not text.endswith("\n") else "")
 
-def _ensure_job_name(script_path, job_name):
-    with open(script_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+def _tx_job_name(text, job_name):
+    lines = _split_keepends(_universal(text))
     shebang_idx = 0 if lines and lines[0].startswith("#!") else -1
     last_sbatch = -1
     found = False
@@ -235,15 +152,13 @@ def _ensure_job_name(script_path, job_name):
     if not found:
         insert_at = max(1 if shebang_idx == 0 else 0, last_sbatch + 1)
         lines.insert(insert_at, f"#SBATCH --job-name={job_name}\n")
-    with open(script_path, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+    return "".join(lines)
 
-def _ensure_cd(script_path, gamd_dir):
-    with open(script_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+def _tx_cd(text, gamd_dir):
+    lines = _split_keepends(_universal(text))
     for ln in lines:
         if re.search(r'^\s*cd\s+', ln) and gamd_dir in ln:
-            return
+            return "".join(lines)
     insert_at = 0
     if lines and lines[0].startswith("#!"):
         insert_at = 1
@@ -253,8 +168,7 @@ def _ensure_cd(script_path, gamd_dir):
             last_sbatch = i
     insert_at = max(insert_at, last_sbatch + 1)
     lines.insert(insert_at, f"cd {gamd_dir}\n")
-    with open(script_path, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+    return "".join(lines)
 
 def parse_jobid(s):
     m = re.search(r"\b(\d{3,})\b", (s or "").strip())
@@ -273,94 +187,76 @@ def sbatch_submit(sbatch, script_path, extra=None, dependency=None, cwd=None):
     return ok, parse_jobid(out), out
 
 def _log_done_for(script_path):
-    log_path = re.sub(r"\.sh$", ".log", script_path)
-    try:
-        with open(log_path, "rb") as f:
-            f.seek(0, os.SEEK_END)
-            size = f.tell()
-            take = min(size, 1_000_000)
-            f.seek(max(0, size - take))
-            tail = f.read(take).decode(errors="ignore")
-        if re.search(r"End of program", tail, re.IGNORECASE) or re.search(r"\bWall[Cc]lock\b", tail):
-            return True
-    except Exception:
-        pass
-    return False
+    return get_index().is_done(re.sub(r"\.sh$", ".log", script_path))
 
 def build_gamd_chain(run_dir, combined, base_dir, conf):
-    aux_dir = os.path.join(base_dir, "aux")
-    script_dir = os.path.join(base_dir, "gen_scripts")
-    dest_dir = os.path.join(run_dir)
-    src_runner = os.path.join(aux_dir, "run_gen_gamd.sh")
-    if not os.path.isfile(src_runner):
-        return False, "run_gen_gamd.sh missing", None
-    dst_runner = os.path.join(dest_dir, "run_gen_gamd.sh")
-    shutil.copy2(src_runner, dst_runner)
-    _chmod_x(dst_runner)
-    prefix, trial = parse_combined(combined)
-    subprocess.run([dst_runner, script_dir, prefix, str(trial)], cwd=dest_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    try:
-        os.remove(dst_runner)
-    except Exception:
-        pass
-    gamd_dir = os.path.join(dest_dir, "gamd")
-    if not os.path.isdir(gamd_dir):
-        return False, "gamd/ not created", None
-    equil_sh = os.path.join(gamd_dir, f"{combined}-gamd-equil.sh")
-    prod_sh  = os.path.join(gamd_dir, f"{combined}-gamd-prod.sh")
-    if not (os.path.isfile(equil_sh) and os.path.isfile(prod_sh)):
+    template_dir = os.path.join(base_dir, "gen_scripts", "gamd")
+    if not os.path.isdir(template_dir):
+        return False, "gen_scripts/gamd missing", None
+    files = render_gamd(run_dir, combined, template_dir, os.path.join(base_dir, "param"))
+    if files is None:
+        return False, f"{combined}_pbc.txt missing", None
+    files = {k: list(v) for k, v in files.items()}
+    dirty = set(files)
+    gamd_dir = os.path.join(run_dir, "gamd")
+    def name(tag, ext):
+        return f"{combined}-gamd-{tag}.{ext}"
+    def load(fn):
+        # Generated text if we have it, otherwise whatever an earlier build left on disk
+        if fn not in files:
+            p = os.path.join(gamd_dir, fn)
+            if not os.path.isfile(p):
+                return None
+            with open(p, "r", encoding="utf-8") as f:
+                files[fn] = [f.read(), os.stat(p).st_mode & 0o777]
+        return files[fn]
+    def put(fn, text, mode):
+        files[fn] = [text, mode]
+        dirty.add(fn)
+    equil_sh, prod_sh, npt1_sh = name("equil", "sh"), name("prod", "sh"), name("npt1", "sh")
+    if load(equil_sh) is None or load(prod_sh) is None:
         return False, "equil/prod scripts missing", None
-    npt1_sh = os.path.join(gamd_dir, f"{combined}-gamd-npt1.sh")
-    shutil.copy2(prod_sh, npt1_sh)
-    _replace_in_file(npt1_sh, r'\bgamd-prod\b', 'gamd-npt1')
-    _replace_in_file(npt1_sh, r'\bnpt\d+\b', 'npt1')
+    prod_text, sh_mode = files[prod_sh]
+    put(npt1_sh, _tx_replace(_tx_replace(prod_text, r'\bgamd-prod\b', 'gamd-npt1'), r'\bnpt\d+\b', 'npt1'), sh_mode)
     for i in range(1, 8):
         next_i = i + 1
-        cur_conf  = os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.conf")
-        next_conf = os.path.join(gamd_dir, f"{combined}-gamd-npt{next_i}.conf")
-        next_sh   = os.path.join(gamd_dir, f"{combined}-gamd-npt{next_i}.sh")
-        if not os.path.isfile(cur_conf):
+        cur = load(name(f"npt{i}", "conf"))
+        if cur is None:
             break
-        shutil.copy2(cur_conf, next_conf)
-        src_sh = os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.sh")
-        if os.path.isfile(src_sh):
-            shutil.copy2(src_sh, next_sh)
-        else:
-            shutil.copy2(npt1_sh, next_sh)
-        _replace_in_file(next_conf, r'\bnpt\d+\b', f"npt{next_i}")
-        _replace_in_file(next_sh,  r'\bnpt\d+\b', f"npt{next_i}")
-        _replace_in_file(next_conf, '-equil', f"npt{i}")
+        src = load(name(f"npt{i}", "sh")) or files[npt1_sh]
+        conf_text = _tx_replace(cur[0], r'\bnpt\d+\b', f"npt{next_i}")
+        sh_text = _tx_replace(src[0], r'\bnpt\d+\b', f"npt{next_i}")
+        conf_text = _tx_replace(conf_text, '-equil', f"npt{i}")
         if i >= 2:
-            _remove_in_file(next_conf, r'\breinitvels\s+\$temperature\b')
+            conf_text = _tx_remove(conf_text, r'\breinitvels\s+\$temperature\b')
+        put(name(f"npt{next_i}", "conf"), conf_text, cur[1])
+        put(name(f"npt{next_i}", "sh"), sh_text, src[1])
+    header = dict(
+        exclude=conf.get("EXCLUDE", "").strip(),
+        ntasks_per_node=conf.get("NTASKS_PER_NODE", "").strip(),
+        num_gpu=conf.get("NUM_GPU", "").strip(),
+        qos=conf.get("QOS", "").strip(),
+    )
     account   = conf.get("SLURM_ACCOUNT", "").strip()
     part      = conf.get("SLURM_PARTITION", "").strip()
-    exclude   = conf.get("EXCLUDE", "").strip()
-    ntasks    = conf.get("NTASKS_PER_NODE", "").strip()
-    num_gpu   = conf.get("NUM_GPU", "").strip()
-    qos       = conf.get("QOS", "").strip()
     wall_eq   = conf.get("WALL_TIME_GAMD_EQUIL", "").strip()
     wall_pr   = conf.get("WALL_TIME_GAMD_PROD", "").strip()
-    _ensure_slurm_header(equil_sh, account, part, exclude=exclude, ntasks_per_node=ntasks, num_gpu=num_gpu, qos=qos, wall_time=wall_eq or None)
-    _ensure_slurm_header(prod_sh,  account, part, exclude=exclude, ntasks_per_node=ntasks, num_gpu=num_gpu, qos=qos, wall_time=wall_pr or None)
-    _ensure_slurm_header(npt1_sh,  account, part, exclude=exclude, ntasks_per_node=ntasks, num_gpu=num_gpu, qos=qos, wall_time=wall_pr or None)
-    for i in range(2, 9):
-        sh = os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.sh")
-        if os.path.isfile(sh):
-            _ensure_slurm_header(sh, account, part, exclude=exclude, ntasks_per_node=ntasks, num_gpu=num_gpu, qos=qos, wall_time=wall_pr or None)
-    _ensure_job_name(equil_sh, f"{combined}-gamd-equil")
-    _ensure_job_name(prod_sh,  f"{combined}-gamd-prod")
-    _ensure_job_name(npt1_sh,  f"{combined}-gamd-npt1")
-    for i in range(2, 9):
-        sh = os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.sh")
-        if os.path.isfile(sh):
-            _ensure_job_name(sh, f"{combined}-gamd-npt{i}")
-    for sh in [equil_sh, prod_sh, npt1_sh] + [os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.sh") for i in range(2, 9) if os.path.isfile(os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.sh"))]:
-        if os.path.isfile(sh):
-            _ensure_cd(sh, gamd_dir)
+    stage_tags = ["equil", "prod", "npt1"] + [f"npt{i}" for i in range(2, 9) if load(name(f"npt{i}", "sh")) is not None]
+    for tag in stage_tags:
+        fn = name(tag, "sh")
+        text, mode = files[fn]
+        text = _tx_slurm_header(text, account, part, wall_time=(wall_eq if tag == "equil" else wall_pr) or None, **header)
+        text = _tx_job_name(text, f"{combined}-gamd-{tag}")
+        text = _tx_cd(text, gamd_dir)
+        put(fn, text, mode)
+    os.makedirs(gamd_dir, exist_ok=True)
+    for fn in sorted(dirty):
+        text, mode = files[fn]
+        write_once(os.path.join(gamd_dir, fn), text, mode)
     scripts = {
-        "equil": equil_sh,
-        "prod": prod_sh,
-        "npt": [os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.sh") for i in range(1, 9) if os.path.isfile(os.path.join(gamd_dir, f"{combined}-gamd-npt{i}.sh"))],
+        "equil": os.path.join(gamd_dir, equil_sh),
+        "prod": os.path.join(gamd_dir, prod_sh),
+        "npt": [os.path.join(gamd_dir, name(f"npt{i}", "sh")) for i in range(1, 9) if name(f"npt{i}", "sh") in files],
         "dir": gamd_dir
     }
     return True, "ok", scripts
@@ -370,6 +266,7 @@ def _detect_resume_index(scripts):
     done = []
     for sh in stages:
         done.append(_log_done_for(sh))
+    get_index().save()
     idx = 0
     for i, d in enumerate(done):
         if d:
@@ -399,150 +296,211 @@ def submit_gamd_chain(sbatch, sbatch_extra, scripts):
         dep = jid
     return ok, ", ".join(msgs)
 
-def _collect_stage_scripts_for_name(namd_proc_dir, name):
-    gdir = os.path.join(namd_proc_dir, name, "gamd")
-    stages = []
-    equil = os.path.join(gdir, f"{name}-gamd-equil.sh")
-    if os.path.isfile(equil):
-        stages.append(("equil", equil))
-    npts = sorted(glob.glob(os.path.join(gdir, f"{name}-gamd-npt*.sh")), key=lambda p: int(re.search(r'npt(\d+)\.sh$', p).group(1)) if re.search(r'npt(\d+)\.sh$', p) else 9999)
-    for sh in npts:
-        m = re.search(r'npt(\d+)\.sh$', sh)
-        if m:
-            stages.append((f"npt{m.group(1)}", sh))
-    return stages
-
 def _squeue_map():
-    try:
-        r = subprocess.run(["squeue", "-o", "%i %T %j", "-h"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=3)
-        mp = {}
-        if r.returncode == 0:
-            for ln in r.stdout.splitlines():
-                parts = ln.strip().split(maxsplit=2)
-                if len(parts) == 3:
-                    jid, state, jname = parts
-                    mp[jname.strip()] = (jid.strip(), state.strip())
-        return mp
-    except Exception:
-        return {}
+    return get_cache().jobs_by_name()
 
 def _progress_tuple(namd_proc_dir, name, sqmap):
-    stages = _collect_stage_scripts_for_name(namd_proc_dir, name)
+    stages = gamd_stage_scripts(namd_proc_dir, name)
     if not stages:
-        return (name, 0, 0, "-", "-", "[not-prepared]")
+        return (name, 0, 0, "-", "-", "[not-prepared]", None)
     done = 0
     first_pending = None
-    for tag, sh in stages:
+    for i, (tag, sh) in enumerate(stages):
         if _log_done_for(sh):
             done += 1
         elif first_pending is None:
-            first_pending = (tag, sh)
+            first_pending = i
     total = len(stages)
     if done >= total and total > 0:
-        return (name, done, total, "-", "-", "[done]")
+        return (name, done, total, "-", "-", "[done]", None)
     if first_pending is None:
-        return (name, done, total, "-", "-", "[not-prepared]")
-    nxt = first_pending[0]
+        return (name, done, total, "-", "-", "[not-prepared]", None)
+    nxt = stages[first_pending][0]
     jn = f"{name}-gamd-{nxt}"
     jid, state = "-", None
     if jn in sqmap:
         jid, state = sqmap[jn]
-    return (name, done, total, nxt, jid, state or "-")
+    # (running stage progress, ETA for the rest of the chain)
+    perf = get_namdlog_index().chain([stage_files(sh) for _, sh in stages], first_pending)
+    return (name, done, total, nxt, jid, state or "-", perf)
 
 def _status_items(namd_proc_dir, names):
     sq = _squeue_map()
     out = []
     for n in names:
         out.append(_progress_tuple(namd_proc_dir, n, sq))
+    get_index().save()
     return out
 
-def _draw_status_table(stdscr, y, x, w, items, cursor_idx, focused, hint_attr):
+STATUS_REFRESH_SEC = 3.0
+STATUS_TICK_MS = 500
+
+class StatusRefresher:
+    # Keeps the status table's rows fresh on a background thread so squeue
+    # and log checks never block key handling.
+    def __init__(self, namd_proc_dir, interval=STATUS_REFRESH_SEC):
+        self.namd_proc_dir = namd_proc_dir
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._names: List[str] = []
+        self._visible: List[str] = []
+        self._rows = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gamd-status", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+
+    def kick(self):
+        self._wake.set()
+
+    def set_names(self, names):
+        names = list(names)
+        with self._lock:
+            if names == self._names:
+                return
+            self._names = names
+        self.kick()
+
+    def set_visible(self, names):
+        # Rows on screen are refreshed first on the next pass
+        with self._lock:
+            self._visible = list(names)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            with self._lock:
+                known = set(self._names)
+                vis = [n for n in self._visible if n in known]
+                seen = set(vis)
+                names = vis + [n for n in self._names if n not in seen]
+            try:
+                sq = _squeue_map()
+            except Exception:
+                sq = {}
+            for n in names:
+                if self._stop.is_set():
+                    return
+                try:
+                    row = _progress_tuple(self.namd_proc_dir, n, sq)
+                except Exception:
+                    continue
+                with self._lock:
+                    self._rows[n] = (row, time.time())
+            get_index().save()
+            self._wake.wait(self.interval)
+
+    def items(self, names):
+        now = time.time()
+        out = []
+        with self._lock:
+            for n in names:
+                if n in self._rows:
+                    row, at = self._rows[n]
+                    out.append(row + (now - at,))
+                else:
+                    out.append((n, 0, 0, "-", "-", "…", None, None))
+        return out
+
+def _fmt_age(age):
+    if age is None:
+        return "…"
+    age = int(age)
+    return f"{age}s" if age < 120 else f"{age // 60}m"
+
+STATE_W = 14
+
+def _status_header(name_w, w):
     if w < 40:
-        lines = [" ".join([f"{a} [{b}/{c}]", f"next={d}", f"jid={e}", f"{f}"]).strip() for (a,b,c,d,e,f) in items]
-        hi_idx = cursor_idx if focused else None
-        return wrap_tokens(stdscr, y, x, w, lines, hi_idx=hi_idx, attr_hi=curses.A_REVERSE, attr_norm=0)
-    name_w = max(12, min(32, max((len(a) for a,_,_,_,_,_ in items), default=12)))
-    prog_w = 9
-    next_w = 8
-    jid_w = 8
-    state_w = max(8, min(16, max((len(f) for *_, f in items), default=8)))
-    header = f"{'System'.ljust(name_w)}  {'Done'.ljust(prog_w)}  {'Next'.ljust(next_w)}  {'JID'.ljust(jid_w)}  {'State'.ljust(state_w)}"
-    try:
-        stdscr.addstr(y, x, header, curses.A_UNDERLINE)
-    except curses.error:
-        pass
-    yy = y + 1
-    for i, (a,b,c,d,e,f) in enumerate(items):
-        prog = f"{b}/{c}".ljust(prog_w)
-        line = f"{a.ljust(name_w)}  {prog}  {d.ljust(next_w)}  {str(e).ljust(jid_w)}  {f.ljust(state_w)}"
+        return ""
+    return (f"{'System'.ljust(name_w)}  {'Done'.ljust(9)}  {'Next'.ljust(8)}  {'JID'.ljust(8)}  {'State'.ljust(STATE_W)}  "
+            f"{'Step'.rjust(5)}  {'ns/day'.rjust(6)}  {'ETA'.rjust(7)}  {'Chain'.rjust(7)}  Updated")
+
+def _status_rows(items, name_w, w):
+    # (line, attr) for each status row; the window passes only visible rows
+    out = []
+    for (a,b,c,d,e,f,p,g) in items:
+        cur, chain_eta = p if p else (None, None)
+        step = fmt_steps(cur) if cur else "-"
+        rate = fmt_rate(cur.ns_per_day) if cur else "-"
+        eta = fmt_eta(cur.eta_sec) if cur else "-"
+        if w < 40:
+            line = f"{a} [{b}/{c}] next={d} jid={e} {f} {step} eta={fmt_eta(chain_eta)} upd={_fmt_age(g)}"
+        else:
+            line = (f"{a.ljust(name_w)}  {f'{b}/{c}'.ljust(9)}  {d.ljust(8)}  {str(e).ljust(8)}  {f.ljust(STATE_W)}  "
+                    f"{step.rjust(5)}  {rate.rjust(6)}  {eta.rjust(7)}  {fmt_eta(chain_eta).rjust(7)}  {_fmt_age(g)}")
         attr = 0
         if f in ("RUNNING","COMPLETING"):
             attr = curses.color_pair(11) | curses.A_BOLD if curses.has_colors() else curses.A_BOLD
         if f in ("COMPLETED","[done]"):
             attr = curses.color_pair(12) if curses.has_colors() else 0
-        if focused and i == cursor_idx:
-            attr |= curses.A_REVERSE
-        try:
-            stdscr.addstr(yy + i, x, line[: max(0, w - x - 2)], attr)
-        except curses.error:
-            pass
-    return 1 + len(items)
+        out.append((line, attr))
+    return out
 
-def _names_with_progress(namd_proc_dir, names):
-    return _status_items(namd_proc_dir, names)
+def _names_with_progress(namd_proc_dir, names, status=None):
+    if status is not None:
+        return status.items(names)
+    return [row + (0.0,) for row in _status_items(namd_proc_dir, names)]
+
+def _cfg_lines(cfgs, w):
+    # CFG_KEYS packed several to a line so the table keeps its rows
+    lines, cur = [], ""
+    for k in CFG_KEYS:
+        s = f"{k}: {cfgs.get(k, '')}"
+        if cur and len(cur) + 3 + len(s) > w - 4:
+            lines.append(cur)
+            cur = s
+        else:
+            cur = f"{cur} • {s}" if cur else s
+    if cur:
+        lines.append(cur)
+    return lines
 
-def compute_input_y(stdscr, names, ready, selection):
+def compute_input_y(stdscr, menu_y):
+    # Under the menu, but never so low that the 4-line prompt leaves the screen
     h, w = stdscr.getmaxyx()
-    names_lines = 1 + len(names)
-    ready_line = " ".join(sorted(set(names) & set(ready))) or "(none)"
-    ready_lines = max(1, len(wrap_line(ready_line, max(10, w - 4))))
-    sel_line = " ".join(sorted(selection)) if selection else "(empty)"
-    sel_lines = max(1, len(wrap_line(sel_line, max(10, w - 4))))
-    cur_y = 10 + names_lines
-    cur2_y = cur_y + 1 + ready_lines + 1
-    menu_y = cur2_y + 2 + sel_lines + 1
-    return menu_y + 10
-
-def draw(stdscr, title, hint_attr, namd_proc_dir, names, ready, selection, cursor_idx, focus, menu_cursor, cfgs, msg="", msg_attr=0, err_attr=0):
-    stdscr.clear()
+    return max(0, min(menu_y + 8, h - 5))
+
+def draw(stdscr, title, hint_attr, namd_proc_dir, plist, ready, selection, focus, menu_cursor, cfgs, msg="", msg_attr=0, err_attr=0, status=None):
+    begin_frame(stdscr)
     h, w = stdscr.getmaxyx()
     tx = max(0, (w - len(title)) // 2)
     try:
         stdscr.addstr(1, tx, title, curses.A_BOLD)
         stdscr.addstr(3, 2, "Focus: Tab switches • Esc/0 Back • Enter activates", hint_attr)
         stdscr.addstr(4, 2, "Menu: ↑/↓ or j/k move • 1–6 shortcuts", hint_attr)
-        stdscr.addstr(5, 2, "Systems: ←/→ move • Enter toggles add/remove", hint_attr)
-        y = 7
-        for k in CFG_KEYS:
-            v = cfgs.get(k, "")
-            s = f"{k}: {v}"
-            stdscr.addstr(y, 2, s[: max(0, w - 4)], hint_attr)
-            y += 1
-        y += 1
-        stdscr.addstr(y, 2, "GaMD-eligible systems (NPT2 detected):", curses.A_UNDERLINE)
-        y += 1
-    except curses.error:
-        y = 12
-    items = _names_with_progress(namd_proc_dir, names)
-    lines_used = _draw_status_table(stdscr, y, 2, w, items, cursor_idx, focus == "proc", hint_attr)
-    cur_y = y + max(1, lines_used)
-    try:
-        stdscr.addstr(cur_y, 2, "Already GaMD-prepared:", curses.A_UNDERLINE)
+        stdscr.addstr(5, 2, "Systems: ↑/↓ or j/k • PgUp/PgDn • / filter • Enter toggles add/remove", hint_attr)
     except curses.error:
         pass
-    shown_ready = sorted(set(names) & set(ready))
-    ready_line = " ".join(shown_ready) if shown_ready else "(none)"
-    for j, line in enumerate(wrap_line(ready_line, max(10, w - 4))):
-        try: stdscr.addstr(cur_y + 1 + j, 2, line)
-        except curses.error: pass
-    cur2_y = cur_y + 2 + max(1, len(wrap_line(ready_line, max(10, w - 4))))
-    try: stdscr.addstr(cur2_y, 2, "Current selection:", curses.A_UNDERLINE)
-    except curses.error: pass
-    sel_line = " ".join(sorted(selection)) if selection else "(empty)"
-    for k, line in enumerate(wrap_line(sel_line, max(10, w - 4))):
-        try: stdscr.addstr(cur2_y + 1 + k, 2, line)
-        except curses.error: pass
-    menu_y = cur2_y + 3 + max(1, len(wrap_line(sel_line, max(10, w - 4))))
+    y = 7
+    for line in _cfg_lines(cfgs, w):
+        safe_addstr(stdscr, y, 2, line[: max(0, w - 4)], hint_attr)
+        y += 1
+    y += 1
+    head_y = y
+    y += 1
+    name_w = max(12, min(32, plist.longest))
+    header = _status_header(name_w, w)
+    def render(names):
+        if status is not None:
+            status.set_visible(names)
+        return _status_rows(_names_with_progress(namd_proc_dir, names, status), name_w, w)
+    rows = max(4, h - y - BELOW_LIST)
+    lines_used = plist.draw_table(stdscr, y, 2, w, min(rows, 1 + len(plist.view)), header, render, focus == "proc")
+    safe_addstr(stdscr, head_y, 2, plist.header("GaMD-eligible systems (NPT2 detected)")[: max(0, w - 4)], curses.A_UNDERLINE)
+    cur_y = y + lines_used + 1
+    n_ready = sum(1 for n in plist.items if n in ready)
+    safe_addstr(stdscr, cur_y, 2, f"Already GaMD-prepared: {n_ready} of {len(plist.items)}", hint_attr)
+    safe_addstr(stdscr, cur_y + 1, 2, summary_line("Current selection", sorted(selection), max(10, w - 4)))
+    menu_y = cur_y + 3
     options = [
         "1) Add all nonprocessed (recommended)",
         "2) Add all detected",
@@ -560,7 +518,7 @@ def draw(stdscr, title, hint_attr, namd_proc_dir, names, ready, selection, curso
     if msg:
         try: stdscr.addstr(info_y, 2, msg[: max(0, w - 4)], msg_attr)
         except curses.error: pass
-    stdscr.refresh()
+    end_frame(stdscr)
     return menu_y, len(options)
 
 def prompt(stdscr, top_line, hint_attr, y_start=None):
@@ -568,6 +526,8 @@ def prompt(stdscr, top_line, hint_attr, y_start=None):
     if y_start is None:
         y_start = h - 6
     try:
+        stdscr.move(y_start, 0)
+        stdscr.clrtobot()
         stdscr.addstr(y_start, 2, top_line, hint_attr)
         stdscr.addstr(y_start + 1, 2, "Separate by space or comma • Esc=Back", hint_attr)
         stdscr.addstr(y_start + 3, 2, "> ")
@@ -588,39 +548,129 @@ def prompt(stdscr, top_line, hint_attr, y_start=None):
         return None
     return s
 
-def submit_selected(stdscr, namd_proc_dir, selection, base_dir, conf, sbatch, sbatch_extra, hint_attr, err_attr):
+DEFAULT_GAMD_WORKERS = 4
+
+def gamd_workers_from_conf(conf):
+    try:
+        return max(1, int(str(conf.get("GAMD_WORKERS", "")).strip() or DEFAULT_GAMD_WORKERS))
+    except ValueError:
+        return DEFAULT_GAMD_WORKERS
+
+def _gamd_chain_task(row, lock, namd_proc_dir, base_dir, conf, sbatch, sbatch_extra):
+    def set_state(state, detail=""):
+        with lock:
+            row["state"], row["detail"] = state, detail
+            if state in ("ok", "failed"):
+                row["t_end"] = time.time()
+    combined = row["name"]
+    with lock:
+        row["t_start"] = time.time()
+    set_state("building")
+    try:
+        ok_b, det_b, scripts = build_gamd_chain(os.path.join(namd_proc_dir, combined), combined, base_dir, conf)
+    except Exception as e:
+        ok_b, det_b, scripts = False, f"build error: {e}", None
+    if not ok_b:
+        set_state("failed", det_b)
+        return False
+    set_state("submitting")
+    try:
+        ok_s, det_s = submit_gamd_chain(sbatch, sbatch_extra, scripts)
+    except Exception as e:
+        ok_s, det_s = False, f"submit error: {e}"
+    set_state("ok" if ok_s else "failed", det_s)
+    return ok_s
+
+def draw_pool_progress(stdscr, rows, cursor, started_at, workers, finished, hint_attr, err_attr):
+    begin_frame(stdscr)
+    h, w = stdscr.getmaxyx()
+    now = time.time()
+    total = len(rows)
+    counts = {}
+    for r in rows:
+        counts[r["state"]] = counts.get(r["state"], 0) + 1
+    done = counts.get("ok", 0) + counts.get("failed", 0) + counts.get("cancelled", 0)
+    pct = int((done / total) * 100) if total else 0
+    bar_w = max(20, w - 10)
+    filled = max(0, int((pct / 100.0) * (bar_w - 2)))
+    bar = "[" + "#" * filled + "-" * ((bar_w - 2) - filled) + "]"
+    elapsed = int(now - started_at)
+    head = "Done — press any key" if finished else f"Building + submitting with {workers} worker(s)… (q/Esc=cancel queued, ↑/↓ scroll)"
+    name_w = max(12, min(28, max((len(r["name"]) for r in rows), default=12)))
+    try:
+        stdscr.addstr(2, 2, head, hint_attr)
+        stdscr.addstr(3, 2, f"{done}/{total} • ok {counts.get('ok', 0)} • failed {counts.get('failed', 0)} • "
+                            f"active {counts.get('building', 0) + counts.get('submitting', 0)} • queued {counts.get('queued', 0)} • "
+                            f"Elapsed {elapsed//60}m {elapsed%60}s")
+        stdscr.addstr(4, 2, f"{pct:3d}% {bar}")
+        stdscr.addstr(6, 2, f"{'System'.ljust(name_w)}  {'State'.ljust(10)}  {'Time'.ljust(6)}  Detail"[: max(0, w - 4)], curses.A_UNDERLINE)
+    except curses.error:
+        pass
+    view_h = max(1, h - 9)
+    top = max(0, min(cursor - view_h + 1, total - view_h))
+    for i, r in enumerate(rows[top: top + view_h]):
+        t = int(((r["t_end"] or now) - r["t_start"])) if r["t_start"] else 0
+        line = f"{r['name'].ljust(name_w)}  {r['state'].ljust(10)}  {f'{t}s'.ljust(6)}  {r['detail']}"
+        attr = err_attr if r["state"] == "failed" else 0
+        if r["state"] == "ok":
+            attr = curses.color_pair(12) if curses.has_colors() else 0
+        if top + i == cursor:
+            attr |= curses.A_REVERSE
+        try:
+            stdscr.addstr(7 + i, 2, line[: max(0, w - 4)], attr)
+        except curses.error:
+            pass
+    end_frame(stdscr)
+
+def submit_selected(stdscr, namd_proc_dir, selection, base_dir, conf, sbatch, sbatch_extra, hint_attr, err_attr, workers=None):
     if not selection:
         return False, "Selection is empty"
-    okc = 0
-    failc = 0
-    last = ""
-    for combined in sorted(selection):
-        run_dir = os.path.join(namd_proc_dir, combined)
-        ok_b, det_b, scripts = build_gamd_chain(run_dir, combined, base_dir, conf)
-        if not ok_b:
-            failc += 1
-            last = f"{combined}: {det_b}"
-            continue
-        ok_s, det_s = submit_gamd_chain(sbatch, sbatch_extra, scripts)
-        if ok_s:
-            okc += 1
-            last = f"{combined}: {det_s}"
-        else:
-            failc += 1
-            last = f"{combined}: {det_s}"
+    workers = workers or gamd_workers_from_conf(conf)
+    rows = [{"name": c, "state": "queued", "detail": "", "t_start": None, "t_end": None} for c in sorted(selection)]
+    lock = threading.Lock()
+    t_start = time.time()
+    cursor = 0
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(rows)))
+    futures = {pool.submit(_gamd_chain_task, r, lock, namd_proc_dir, base_dir, conf, sbatch, sbatch_extra): r for r in rows}
+    frames = FrameLimiter()
+    stdscr.nodelay(True)
+    try:
+        while True:
+            ch = -1
+            try:
+                ch = stdscr.getch()
+                if ch in (27, ord('q')):
+                    for f, r in futures.items():
+                        if f.cancel():
+                            with lock:
+                                r["state"], r["detail"] = "cancelled", "not started"
+                elif ch in (curses.KEY_UP, ord('k')):
+                    cursor = max(0, cursor - 1)
+                elif ch in (curses.KEY_DOWN, ord('j')):
+                    cursor = min(len(rows) - 1, cursor + 1)
+            except curses.error:
+                pass
+            if frames.due(force=ch != -1):
+                with lock:
+                    draw_pool_progress(stdscr, rows, cursor, t_start, workers, False, hint_attr, err_attr)
+            if all(f.done() for f in futures):
+                break
+            time.sleep(0.1)
+    finally:
+        pool.shutdown(wait=True)
+        stdscr.nodelay(False)
+    draw_pool_progress(stdscr, rows, cursor, t_start, workers, True, hint_attr, err_attr)
+    stdscr.getch()
+    okc = sum(1 for r in rows if r["state"] == "ok")
+    failc = sum(1 for r in rows if r["state"] in ("failed", "cancelled"))
+    last = next((f"{r['name']}: {r['detail']}" for r in rows if r["state"] == "failed"), "")
+    if not last and rows:
+        last = f"{rows[-1]['name']}: {rows[-1]['detail']}"
     return True, f"Chains submitted={okc} failed={failc}. {last}"
 
 def run_run_gamd(stdscr, inherited_hint_attr=None):
-    namd_proc_dir, conf_path = read_config()
-    conf = {}
-    if os.path.exists(conf_path):
-        with open(conf_path, "r", encoding="utf-8") as f:
-            for line in f:
-                s = line.strip()
-                if not s or s.startswith("#") or "=" not in s:
-                    continue
-                k, v = s.split("=", 1)
-                conf[k.strip()] = v.strip()
+    conf = load_config()
+    namd_proc_dir = conf.namd_proc_dir
     sbatch = conf.get("SLURM_CMD", "sbatch").strip() or "sbatch"
     extra = conf.get("SBATCH_EXTRA", "").strip()
     sbatch_extra = extra.split() if extra else []
@@ -629,26 +679,48 @@ def run_run_gamd(stdscr, inherited_hint_attr=None):
     stdscr.keypad(True)
     err_attr, hint_attr_local = init_colors()
     hint_attr = inherited_hint_attr if inherited_hint_attr is not None else hint_attr_local
+    status = StatusRefresher(namd_proc_dir).start()
+    try:
+        _menu_loop(stdscr, namd_proc_dir, conf, sbatch, sbatch_extra, hint_attr, err_attr, status)
+    finally:
+        status.stop()
+
+def _menu_loop(stdscr, namd_proc_dir, conf, sbatch, sbatch_extra, hint_attr, err_attr, status):
     selection = set()
     focus = "menu"
     menu_cursor = 0
-    proc_cursor = 0
+    plist = VirtualList()
     while True:
         names = list_gamd_candidates(namd_proc_dir)
         ready = list_gamd_prepared(namd_proc_dir, names)
-        if proc_cursor >= len(names):
-            proc_cursor = max(0, len(names) - 1)
+        status.set_names(names)
+        plist.set_items(names)
         cfgs = {}
         cfgs["NAMD_PROC_DIR"] = namd_proc_dir
         for k in CFG_KEYS:
             if k == "NAMD_PROC_DIR":
                 continue
             cfgs[k] = conf.get(k, "")
-        _, options_len = draw(stdscr, SUBTITLE, hint_attr, namd_proc_dir, names, ready, selection, proc_cursor, focus, menu_cursor, cfgs)
+        def redraw(msg="", msg_attr=0):
+            return draw(stdscr, SUBTITLE, hint_attr, namd_proc_dir, plist, ready, selection, focus, menu_cursor, cfgs, msg, msg_attr, err_attr, status=status)
+        menu_y, options_len = redraw()
+        # Time out so the table (fed by the refresher) redraws without a keypress
+        stdscr.timeout(STATUS_TICK_MS)
         k = stdscr.getch()
+        stdscr.timeout(-1)
         choice = None
         if k in (9, curses.KEY_BTAB):
             focus = "proc" if focus == "menu" else "menu"
+        elif k == FILTER_KEY:
+            focus = "proc"
+            plist.edit_filter(stdscr, redraw, 8 + len(_cfg_lines(cfgs, stdscr.getmaxyx()[1])))
+        elif focus == "proc" and k in (curses.KEY_DOWN, ord('j')) and plist.at_last_row():
+            focus = "menu"
+        elif focus == "proc" and plist.handle_key(k):
+            pass
+        elif k in (curses.KEY_PPAGE, curses.KEY_NPAGE):
+            focus = "proc"
+            plist.handle_key(k)
         elif k in (curses.KEY_UP, ord('k')):
             if focus == "menu":
                 if menu_cursor == 0:
@@ -658,21 +730,12 @@ def run_run_gamd(stdscr, inherited_hint_attr=None):
         elif k in (curses.KEY_DOWN, ord('j')):
             if focus == "menu":
                 menu_cursor = (menu_cursor + 1) % options_len
-            elif focus == "proc":
-                focus = "menu"
-        elif k in (curses.KEY_LEFT, ord('h')):
-            if focus == "proc":
-                proc_cursor = max(0, proc_cursor - 1) if names else 0
-        elif k in (curses.KEY_RIGHT, ord('l')):
-            if focus == "proc":
-                if names:
-                    proc_cursor = min(len(names) - 1, proc_cursor + 1)
         elif k in (10, 13, curses.KEY_ENTER):
             if focus == "menu":
                 choice = menu_cursor
             elif focus == "proc":
-                if names:
-                    n = names[proc_cursor]
+                n = plist.current()
+                if n:
                     if n in selection:
                         selection.discard(n)
                     else:
@@ -691,17 +754,21 @@ def run_run_gamd(stdscr, inherited_hint_attr=None):
             choice = options_len - 1
         if choice is None:
             continue
+        # With a filter active, the bulk adds only take the filtered names
         if choice == 0:
-            nonprepared = [t for t in names if t not in ready]
+            nonprepared = [t for t in plist.view if t not in ready]
             if not nonprepared:
-                draw(stdscr, SUBTITLE, hint_attr, namd_proc_dir, names, ready, selection, proc_cursor, focus, menu_cursor, cfgs, "All detected appear GaMD-prepared", err_attr, err_attr)
+                redraw("All detected appear GaMD-prepared", err_attr)
                 stdscr.getch()
             else:
                 selection.update(nonprepared)
         elif choice == 1:
-            selection = set(names)
+            if plist.filtered():
+                selection.update(plist.view)
+            else:
+                selection = set(names)
         elif choice == 2:
-            y_in = compute_input_y(stdscr, names, ready, selection)
+            y_in = compute_input_y(stdscr, menu_y)
             s = prompt(stdscr, EXAMPLES_ADD, hint_attr, y_start=y_in)
             if s:
                 toks_all = tokens_from(s)
@@ -711,10 +778,10 @@ def run_run_gamd(stdscr, inherited_hint_attr=None):
                 if valid:
                     selection.update(valid)
                 if invalid:
-                    draw(stdscr, SUBTITLE, hint_attr, namd_proc_dir, names, ready, selection, proc_cursor, focus, menu_cursor, cfgs, "Invalid: " + ", ".join(invalid), err_attr, err_attr)
+                    redraw("Invalid: " + ", ".join(invalid), err_attr)
                     stdscr.getch()
         elif choice == 3:
-            y_in = compute_input_y(stdscr, names, ready, selection)
+            y_in = compute_input_y(stdscr, menu_y)
             s = prompt(stdscr, EXAMPLES_REMOVE, hint_attr, y_start=y_in)
             if s:
                 toks = tokens_from(s)
@@ -728,13 +795,15 @@ def run_run_gamd(stdscr, inherited_hint_attr=None):
                 if not_in_list:   msgs.append("Not found: " + ", ".join(not_in_list))
                 if not_selected:  msgs.append("Not in selection: " + ", ".join(not_selected))
                 if msgs:
-                    draw(stdscr, SUBTITLE, hint_attr, namd_proc_dir, names, ready, selection, proc_cursor, focus, menu_cursor, cfgs, " | ".join(msgs), err_attr, err_attr)
+                    redraw(" | ".join(msgs), err_attr)
                     stdscr.getch()
         elif choice == 4:
             selection = set()
         elif choice == 5:
             ok, msg = submit_selected(stdscr, namd_proc_dir, selection, ROOT_DIR, conf, sbatch, sbatch_extra, hint_attr, err_attr)
-            draw(stdscr, SUBTITLE, hint_attr, namd_proc_dir, names, ready, selection, proc_cursor, focus, menu_cursor, cfgs, msg, 0 if ("failed=0" in msg) else err_attr, err_attr)
+            get_project_index().invalidate()
+            status.kick()
+            redraw(msg, 0 if ("failed=0" in msg) else err_attr)
             stdscr.getch()
         elif choice == options_len - 1:
             return
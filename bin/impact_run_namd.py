@@ -6,21 +6,18 @@ import curses
 import time
 from pathlib import Path
 
-CONF_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "IMPACT.conf")
+from impact_slurm import get_cache
+from impact_config import load_config, find_conf
+from impact_render import begin_frame, end_frame
+from impact_stage_index import get_index
+from impact_namdlog import get_namdlog_index, stage_files, fmt_eta, fmt_rate, fmt_steps
+
 STAGES = ["mini", "equil", "NPT1", "NPT2"]
 STAMP_NAME = ".impact_submitted"
+REFRESH_MS = 1000
 
 def load_conf(path):
-    c = {}
-    if os.path.isfile(path):
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                s = line.strip()
-                if not s or s.startswith("#") or "=" not in s:
-                    continue
-                k, v = s.split("=", 1)
-                c[k.strip()] = v.strip()
-    return c
+    return load_config(path)
 
 def safe_addstr(stdscr, y, x, text, attr=0):
     try:
@@ -76,54 +73,45 @@ def list_targets_from_namd(namd_root):
             items.append({"label": label, "combined": entry, "dir": run_dir, "chain": chain})
     return items
 
+def chain_progress(item):
+    # (stage, StageProgress, chain ETA) for the first unfinished stage, or
+    # None once every stage log has finished
+    stages = [(c["stage"],) + stage_files(c["script"]) for c in item["chain"] if c["script"]]
+    for i, (st, _conf, log) in enumerate(stages):
+        if not get_index().is_done(log):
+            cur, eta = get_namdlog_index().chain([(c, l) for _, c, l in stages], i)
+            return st, cur, eta
+    return None
+
+def progress_cells(item):
+    p = chain_progress(item)
+    if p is None:
+        return "done", "", "", "", ""
+    st, cur, eta = p
+    return st, fmt_steps(cur), fmt_rate(cur.ns_per_day), fmt_eta(cur.eta_sec), fmt_eta(eta)
+
 def parse_jobid(s):
     m = re.search(r"\b(\d{3,})\b", (s or "").strip())
     return m.group(1) if m else "?"
 
-def sbatch_submit(sbatch, script_path, extra=None, dependency=None, cwd=None):
+def sbatch_submit(sbatch, script_path, extra=None, dependency=None, cwd=None, args=None):
     cmd = [sbatch]
     if dependency:
         cmd.append(f"--dependency=afterok:{dependency}")
     if extra:
         cmd += extra
     cmd.append(script_path)
+    if args:
+        cmd += [str(a) for a in args]
     r = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd)
     ok = (r.returncode == 0)
     out = r.stdout.strip() if r.stdout else r.stderr.strip()
     return ok, parse_jobid(out), out
 
-def job_running(jobid):
-    if jobid in ("?", "", None):
-        return False
-    r = subprocess.run(["squeue", "-h", "-j", str(jobid), "-o", "%i"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
-    return (r.returncode == 0) and (str(jobid) in r.stdout)
-
-def run_vmd(aux_dir, combined, run_dir):
-    tcl = os.path.join(aux_dir, "mini.tcl")
-    if not os.path.isfile(tcl):
-        return
-    cmd = 'module load vmd && vmd -dispdev text -e "{}" -args "{}"'.format(tcl.replace('"', '\\"'), combined.replace('"', '\\"'))
-    subprocess.run(["bash", "-lc", cmd], cwd=run_dir)
-
-def cleanup_restart_files(mini_dir):
-    try:
-        for f in os.listdir(mini_dir):
-            if f.endswith(".restart.") or ".restart." in f:
-                try:
-                    os.remove(os.path.join(mini_dir, f))
-                except Exception:
-                    pass
-    except Exception:
-        pass
-
-def move_lf_pdb(run_dir, combined):
-    src = os.path.join(run_dir, "mini", f"{combined}-mini-LF.pdb")
-    dst = os.path.join(run_dir, f"{combined}-mini-LF.pdb")
-    if os.path.isfile(src):
-        try:
-            os.replace(src, dst)
-        except Exception:
-            pass
+def lf_sbatch_extra(sbatch_extra):
+    # The LF job is a single-core step; keep only placement flags, not GPU/task requests
+    keep = ("--account", "--partition", "--qos", "--exclude", "-A", "-p")
+    return [o for o in (sbatch_extra or []) if o.startswith(keep)]
 
 def _ensure_cd(script_path, workdir):
     try:
@@ -151,21 +139,7 @@ def _ensure_cd(script_path, workdir):
 
 def existing_jobs_for(combined):
     # Treat job names like: {combined}_mini, {combined}_equi, {combined}_npt1, {combined}_npt2
-    needle = f"{combined}_"
-    try:
-        r = subprocess.run(["squeue", "-h", "-o", "%i %j %T"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
-        if r.returncode != 0:
-            return []
-        out = []
-        for line in r.stdout.splitlines():
-            parts = line.strip().split(None, 2)
-            if len(parts) >= 2:
-                jid, name = parts[0], parts[1]
-                if needle in name:
-                    out.append((jid, name))
-        return out
-    except Exception:
-        return []
+    return get_cache().jobs_matching(f"{combined}_")
 
 def has_recent_stamp(run_dir, max_age_sec=600):
     p = os.path.join(run_dir, STAMP_NAME)
@@ -202,8 +176,17 @@ def submit_chain_protocol(run_dir, combined, sbatch, sbatch_extra, aux_dir):
     equil_sh = find_stage_script(equil_dir, combined, "equil") if os.path.isdir(equil_dir) else None
     npt1_sh = find_stage_script(npt1_dir, combined, "NPT1") if os.path.isdir(npt1_dir) else None
     npt2_sh = find_stage_script(npt2_dir, combined, "NPT2") if os.path.isdir(npt2_dir) else None
+    lf_sh = os.path.join(aux_dir, "run_mini_lf.sh")
     if not mini_sh:
         return False, "mini script missing"
+    if not equil_sh:
+        return False, "equil script missing"
+    if not npt1_sh:
+        return False, "NPT1 script missing"
+    if not npt2_sh:
+        return False, "NPT2 script missing"
+    if not os.path.isfile(lf_sh):
+        return False, "run_mini_lf.sh missing"
 
     _ensure_cd(mini_sh, mini_dir)
     ok1, jid1, out1 = sbatch_submit(sbatch, mini_sh, extra=sbatch_extra, cwd=mini_dir)
@@ -213,37 +196,34 @@ def submit_chain_protocol(run_dir, combined, sbatch, sbatch_extra, aux_dir):
     # Stamp immediately so a second Enter can’t fire another chain
     write_stamp(run_dir, f"mini={jid1}")
 
-    # Wait for mini to leave the queue (queued or running both count as 'running' here)
-    while job_running(jid1):
-        curses.napms(10000)
-
-    cleanup_restart_files(mini_dir)
-    run_vmd(aux_dir, combined, run_dir)
-    move_lf_pdb(run_dir, combined)
+    # Restart cleanup + last-frame extraction run as a dependent job instead of blocking here
+    lf_opts = lf_sbatch_extra(sbatch_extra) + [
+        f"--job-name={combined}_lf",
+        f"--output=mini/{combined}-lf.out",
+        f"--error=mini/{combined}-lf.err",
+    ]
+    ok_lf, jid_lf, out_lf = sbatch_submit(sbatch, lf_sh, extra=lf_opts, dependency=jid1, cwd=run_dir, args=[aux_dir, combined])
+    if not ok_lf:
+        return False, f"lf-extract submit failed: {out_lf}"
 
-    if not equil_sh:
-        return False, "equil script missing"
     _ensure_cd(equil_sh, equil_dir)
-    ok2, jid2, out2 = sbatch_submit(sbatch, equil_sh, extra=sbatch_extra, cwd=equil_dir)
+    ok2, jid2, out2 = sbatch_submit(sbatch, equil_sh, extra=sbatch_extra, dependency=jid_lf, cwd=equil_dir)
     if not ok2:
         return False, f"equil submit failed: {out2}"
 
-    if not npt1_sh:
-        return False, "NPT1 script missing"
     _ensure_cd(npt1_sh, npt1_dir)
     ok3, jid3, out3 = sbatch_submit(sbatch, npt1_sh, extra=sbatch_extra, dependency=jid2, cwd=npt1_dir)
     if not ok3:
         return False, f"NPT1 submit failed: {out3}"
 
-    if not npt2_sh:
-        return False, "NPT2 script missing"
     _ensure_cd(npt2_sh, npt2_dir)
     ok4, jid4, out4 = sbatch_submit(sbatch, npt2_sh, extra=sbatch_extra, dependency=jid3, cwd=npt2_dir)
     if not ok4:
         return False, f"NPT2 submit failed: {out4}"
 
-    write_stamp(run_dir, f"mini={jid1}, equil={jid2}, npt1={jid3}, npt2={jid4}")
-    return True, f"mini={jid1}, equil={jid2}, npt1={jid3}, npt2={jid4}"
+    detail = f"mini={jid1}, lf={jid_lf}, equil={jid2}, npt1={jid3}, npt2={jid4}"
+    write_stamp(run_dir, detail)
+    return True, detail
 
 def sbatch_defaults_from_conf(conf):
     opts = []
@@ -268,9 +248,9 @@ def sbatch_defaults_from_conf(conf):
     return opts
 
 def draw(stdscr, items, sel, idx, msg):
-    stdscr.clear()
+    begin_frame(stdscr)
     h, w = stdscr.getmaxyx()
-    center(stdscr, 1, "Run NAMD: mini → equil → NPT1 → NPT2", curses.A_BOLD)
+    center(stdscr, 1, "Run NAMD: mini → lf-extract → equil → NPT1 → NPT2", curses.A_BOLD)
     center(stdscr, 3, "↑/↓ move • Space select • A all • N none • Enter run • R refresh • Esc back", curses.A_DIM)
     top = 5
     maxv = max(1, h - top - 3)
@@ -280,21 +260,23 @@ def draw(stdscr, items, sel, idx, msg):
         view_start = 0
         if len(items) > maxv:
             view_start = max(0, min(idx - maxv + 1, len(items) - maxv))
+        lw = min(48, max(len(it["label"]) for it in items))
+        safe_addstr(stdscr, top - 1, 2, f"    {'Target'.ljust(lw)}  {'Stage'.ljust(6)} {'Step'.rjust(5)} {'ns/day'.rjust(6)} {'ETA'.rjust(7)} {'Chain'.rjust(7)}"[:max(0, w - 4)], curses.A_UNDERLINE)
         for i in range(view_start, min(len(items), view_start + maxv)):
             mark = "[x]" if sel[i] else "[ ]"
             a = curses.A_REVERSE if i == idx else 0
-            safe_addstr(stdscr, top + (i - view_start), 2, f"{mark} {items[i]['label']}"[:max(0, w - 4)], a)
+            st, step, rate, eta, chain = progress_cells(items[i])
+            line = f"{mark} {items[i]['label'][:lw].ljust(lw)}  {st.ljust(6)} {step.rjust(5)} {rate.rjust(6)} {eta.rjust(7)} {chain.rjust(7)}"
+            safe_addstr(stdscr, top + (i - view_start), 2, line[:max(0, w - 4)], a)
+        get_index().save()
     if msg:
         safe_addstr(stdscr, h - 2, 2, msg[:max(0, w - 4)], curses.A_BOLD)
-    stdscr.refresh()
+    end_frame(stdscr)
 
 def run_run_namd(stdscr, hint_attr):
     base_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
-    conf = load_conf(CONF_PATH)
-    out2 = conf.get("NAMD_PROC_DIR", "2_output/").strip() or "2_output/"
-    if not out2.endswith("/"):
-        out2 += "/"
-    namd_root = os.path.join(base_dir, out2)
+    conf = load_conf(find_conf())
+    namd_root = conf.namd_proc_dir
     aux_dir = os.path.join(base_dir, "aux")
     items = list_targets_from_namd(namd_root)
     sel = [False] * len(items)
@@ -307,7 +289,10 @@ def run_run_namd(stdscr, hint_attr):
     stdscr.keypad(True)
     while True:
         draw(stdscr, items, sel, idx, msg)
+        # Time out so the Step / ns/day / ETA columns follow the logs
+        stdscr.timeout(REFRESH_MS)
         k = stdscr.getch()
+        stdscr.timeout(-1)
         if k in (27, ord('q')):
             return
         if k in (ord('r'), ord('R')):
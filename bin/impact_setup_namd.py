@@ -6,80 +6,33 @@ import tempfile
 import subprocess
 from typing import Optional, List, Tuple
 
+from impact_logs import LogFollower
+from impact_project_index import get_project_index
+from impact_config import load_config
+from impact_render import begin_frame, end_frame, FrameLimiter
+from impact_widgets import VirtualList, FILTER_KEY, summary_line
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(BASE_DIR)
-DEFAULT_CONF = os.path.join(ROOT_DIR, "IMPACT.conf")
 RUN_TESTS_SH = os.path.join(BASE_DIR, "impact_setup_namd.sh")
 
 SUBTITLE = "Setup NAMD"
 EXAMPLES_ADD = "Add: e.g., 06 07,08 09"
 EXAMPLES_REMOVE = "Remove: e.g., 06 07,08 09"
+LIST_Y = 12
+BELOW_LIST = 14   # summaries, menu and message under the list
 
 # -------------------- config helpers --------------------
 
-def find_conf():
-    if os.path.exists(DEFAULT_CONF):
-        return DEFAULT_CONF
-    p = os.path.join(os.getcwd(), "IMPACT.conf")
-    return p if os.path.exists(p) else None
-
 def read_config():
     """
     Returns: (pdb_proc_dir, namd_proc_dir, conf_path_abs)
     """
-    conf = find_conf()
-    pdb_proc_dir = "."
-    namd_proc_dir = os.path.join(ROOT_DIR, "1_output")
-    if conf and os.path.exists(conf):
-        base = os.path.dirname(conf)
-        with open(conf) as fh:
-            for line in fh:
-                s = line.strip()
-                if not s or s.startswith("#"):
-                    continue
-                if s.startswith("PDB_PROC_DIR"):
-                    _, v = s.split("=", 1)
-                    pdb_proc_dir = os.path.abspath(os.path.join(base, v.strip().strip('"').strip("'")))
-                elif s.startswith("NAMD_PROC_DIR"):
-                    _, v = s.split("=", 1)
-                    namd_proc_dir = os.path.abspath(os.path.join(base, v.strip().strip('"').strip("'")))
-    return pdb_proc_dir, namd_proc_dir, (conf if conf else DEFAULT_CONF)
+    cfg = load_config()
+    return cfg.pdb_proc_dir, cfg.namd_proc_dir, cfg.path
 
 # -------------------- UI helpers --------------------
 
-def wrap_tokens(stdscr, y, x, w, tokens, hi_idx=None, attr_hi=0, attr_norm=0):
-    if w <= 4:
-        return 0
-    cx, cy = x, y
-    used = 1
-    for i, tok in enumerate(tokens):
-        t = tok + " "
-        if cx + len(t) > w - 2:
-            cy += 1
-            cx = x
-            used += 1
-        attr = attr_hi if (hi_idx is not None and i == hi_idx) else attr_norm
-        try:
-            stdscr.addstr(cy, cx, t, attr)
-        except curses.error:
-            pass
-        cx += len(t)
-    return used
-
-def wrap_line(s, w):
-    if w <= 0:
-        return [""]
-    out, cur = [], ""
-    for tok in s.split():
-        if len(cur) + len(tok) + (1 if cur else 0) <= w:
-            cur = (cur + " " + tok).strip()
-        else:
-            out.append(cur)
-            cur = tok
-    if cur:
-        out.append(cur)
-    return out or [""]
-
 def tokens_from(s):
     s = s.replace(",", " ")
     return [t.strip() for t in s.split() if t.strip()]
@@ -101,66 +54,11 @@ def init_colors():
         curses.init_pair(11, curses.COLOR_YELLOW, -1)
     return err_attr, hint_attr
 
-def tail_lines(path, n=50, w=120):
-    try:
-        with open(path, "rb") as f:
-            f.seek(0, os.SEEK_END)
-            size = f.tell()
-            if size <= 0:
-                return []
-            block = 4096
-            chunks = []
-            read = 0
-            while size > 0 and read < 1024 * 1024 and sum(c.count(b"\n") for c in chunks) <= n + 4:
-                to_read = block if size >= block else size
-                size -= to_read
-                f.seek(size)
-                chunks.insert(0, f.read(to_read))
-                read += to_read
-            data = b"".join(chunks)
-            lines = data.decode(errors="ignore").splitlines()[-n:]
-            return [ln[: max(0, w - 6)] for ln in lines]
-    except Exception:
-        return []
-
 def list_processed_systems(pdb_proc_dir):
-    if not os.path.isdir(pdb_proc_dir):
-        return []
-    names = []
-    for f in os.listdir(pdb_proc_dir):
-        p = os.path.join(pdb_proc_dir, f)
-        if os.path.isdir(p):
-            names.append(f)
-        elif f.lower().endswith(".pdb"):
-            names.append(os.path.splitext(f)[0])
-    return sorted(set(names))
+    return get_project_index().processed_systems(pdb_proc_dir)
 
 def list_namd_prepared(namd_proc_dir, names):
-    ready = set()
-    if not os.path.isdir(namd_proc_dir):
-        return ready
-    existing = set(os.listdir(namd_proc_dir))
-    for n in names:
-        if n in existing:
-            ready.add(n)
-            continue
-        base = os.path.join(namd_proc_dir, n)
-        if os.path.isdir(base):
-            try:
-                for _root, _dirs, files in os.walk(base):
-                    for fn in files:
-                        lf = fn.lower()
-                        if lf.endswith((".psf", ".conf", ".namd", ".prm", ".xsc", ".pbc", ".pdb")):
-                            ready.add(n)
-                            raise StopIteration
-            except StopIteration:
-                pass
-        else:
-            for suf in (".psf", ".conf", ".namd", ".xsc"):
-                if os.path.exists(os.path.join(namd_proc_dir, n + suf)):
-                    ready.add(n)
-                    break
-    return ready
+    return get_project_index().namd_prepared(namd_proc_dir, names)
 
 # -------------------- drawing helpers --------------------
 
@@ -209,7 +107,7 @@ def draw_progress(
     filled = max(0, int((pct / 100.0) * (bar_w - 2)))
     bar = "[" + "#" * filled + "-" * ((bar_w - 2) - filled) + "]"
 
-    stdscr.clear()
+    begin_frame(stdscr)
     try:
         stdscr.addstr(y0, 2, "Running… (q/Esc=cancel, v=toggle logs, s=change split)", hint_attr)
         if extra_line:
@@ -232,7 +130,7 @@ def draw_progress(
 
     except curses.error:
         pass
-    stdscr.refresh()
+    end_frame(stdscr)
 
 def run_local_with_progress(
     stdscr, selections: List[str], conf_path: str, trial_num: int,
@@ -272,7 +170,10 @@ def run_local_with_progress(
     stdscr.nodelay(True)
     try:
         p = subprocess.Popen(cmd, stdout=out_f, stderr=err_f, text=True, cwd=ROOT_DIR)
+        out_log, err_log = LogFollower(out_path), LogFollower(err_path)
+        frames = FrameLimiter()
         while True:
+            ch = -1
             try:
                 ch = stdscr.getch()
                 if ch in (27, ord('q')):
@@ -280,6 +181,7 @@ def run_local_with_progress(
                     try: p.wait(timeout=5)
                     except Exception: pass
                     out_f.close(); err_f.close()
+                    out_log.close(); err_log.close()
                     try: os.unlink(sel_path)
                     except Exception: pass
                     return False, "Cancelled"
@@ -291,6 +193,9 @@ def run_local_with_progress(
                 pass
 
             rc = p.poll()
+            if rc is None and not frames.due(force=ch != -1):
+                time.sleep(0.1)
+                continue
 
             h, w = stdscr.getmaxyx()
             y0 = 2
@@ -300,8 +205,8 @@ def run_local_with_progress(
                 so, se = splits[split_idx]
                 out_n = max(3, int(available_rows * so))
                 err_n = max(3, available_rows - out_n)
-                out_tail = tail_lines(out_path, n=out_n, w=w)
-                err_tail = tail_lines(err_path, n=err_n, w=w)
+                out_tail = out_log.tail(n=out_n, w=w)
+                err_tail = err_log.tail(n=err_n, w=w)
                 split_label = f"{int(so*100)}/{int(se*100)}"
             else:
                 out_tail, err_tail, split_label = [], [], "logs hidden"
@@ -321,6 +226,7 @@ def run_local_with_progress(
 
         out_f.flush(); err_f.flush()
         out_f.close(); err_f.close()
+        out_log.close(); err_log.close()
         dt = time.time() - t0
         times.append(dt)
     finally:
@@ -333,27 +239,23 @@ def run_local_with_progress(
 
 # -------------------- layout math --------------------
 
-def compute_input_y(stdscr, names, ready, selection):
+def list_rows(h):
+    return max(3, h - LIST_Y - BELOW_LIST)
+
+def compute_input_y(stdscr, menu_y):
+    # Under the menu, but never so low that the 4-line prompt leaves the screen
     h, w = stdscr.getmaxyx()
-    names_lines = max(1, len(wrap_line(" ".join(names), max(10, w - 4))))
-    ready_line = " ".join(sorted(set(names) & set(ready))) or "(none)"
-    ready_lines = max(1, len(wrap_line(ready_line, max(10, w - 4))))
-    sel_line = " ".join(sorted(selection)) if selection else "(empty)"
-    sel_lines = max(1, len(wrap_line(sel_line, max(10, w - 4))))
-    cur_y = 11 + names_lines
-    cur2_y = cur_y + 1 + ready_lines + 1
-    menu_y = cur2_y + 2 + sel_lines + 1
-    return menu_y + 10
+    return max(0, min(menu_y + 9, h - 5))
 
 # -------------------- drawing --------------------
 
 def draw(
     stdscr, title, hint_attr, pdb_proc_dir, namd_proc_dir,
-    names, ready, selection, cursor_idx, focus, menu_cursor,
+    plist, ready, selection, focus, menu_cursor,
     trial_num,
     msg="", msg_attr=0, err_attr=0
 ) -> Tuple[int, int]:
-    stdscr.clear()
+    begin_frame(stdscr)
     h, w = stdscr.getmaxyx()
     tx = max(0, (w - len(title)) // 2)
     try:
@@ -362,38 +264,30 @@ def draw(
 
         stdscr.addstr(4, 2, "Focus: Tab switches • Esc/0 Back • Enter activates", hint_attr)
         stdscr.addstr(5, 2, "Menu: ↑/↓ or j/k move • 1–7 shortcuts • At trial: ↑/↓ to change", hint_attr)
-        stdscr.addstr(6, 2, "Processed: ←/→ or h/l move • Enter toggles add/remove • ←/→ moves between systems ⇄ trial ⇄ menu", hint_attr)
+        stdscr.addstr(6, 2, "Processed: arrows or h/j/k/l • PgUp/PgDn • / filter • Enter toggles add/remove", hint_attr)
 
         stdscr.addstr(8, 2, f"PDB_PROC_DIR:  {pdb_proc_dir}", hint_attr)
         stdscr.addstr(9, 2, f"NAMD_PROC_DIR: {namd_proc_dir}", hint_attr)
-        stdscr.addstr(11, 2, "Processed systems:", curses.A_UNDERLINE)
     except curses.error:
         pass
 
-    hi_idx = cursor_idx if (names and focus == "proc") else None
-    lines_used = wrap_tokens(stdscr, 12, 2, w, names, hi_idx=hi_idx, attr_hi=curses.A_REVERSE, attr_norm=0)
-
-    cur_y = 12 + max(1, lines_used)
+    def cell(name):
+        return ("[x] " if name in selection else "[ ] ") + name, (hint_attr if name in ready else 0)
+    used = plist.draw_grid(stdscr, LIST_Y, 2, w, list_rows(h), cell, focus == "proc")
     try:
-        stdscr.addstr(cur_y, 2, "Already NAMD-prepared: will be in the directory specified in NAMD_PROC_DIR in conf", curses.A_UNDERLINE)
+        stdscr.addstr(LIST_Y - 1, 2, plist.header("Processed systems")[: max(0, w - 4)], curses.A_UNDERLINE)
     except curses.error:
         pass
 
-    shown_ready = sorted(set(names) & set(ready))
-    ready_line = " ".join(shown_ready) if shown_ready else "(none)"
-    for j, line in enumerate(wrap_line(ready_line, max(10, w - 4))):
-        try: stdscr.addstr(cur_y + 1 + j, 2, line)
-        except curses.error: pass
-
-    cur2_y = cur_y + 2 + max(1, len(wrap_line(ready_line, max(10, w - 4))))
-    try: stdscr.addstr(cur2_y, 2, "Current selection:", curses.A_UNDERLINE)
-    except curses.error: pass
-    sel_line = " ".join(sorted(selection)) if selection else "(empty)"
-    for k, line in enumerate(wrap_line(sel_line, max(10, w - 4))):
-        try: stdscr.addstr(cur2_y + 1 + k, 2, line)
-        except curses.error: pass
+    cur_y = LIST_Y + used + 1
+    n_ready = sum(1 for n in plist.items if n in ready)
+    try:
+        stdscr.addstr(cur_y, 2, f"Already NAMD-prepared (in NAMD_PROC_DIR): {n_ready} of {len(plist.items)} (dimmed)", hint_attr)
+        stdscr.addstr(cur_y + 1, 2, summary_line("Current selection", sorted(selection), max(10, w - 4)))
+    except curses.error:
+        pass
 
-    menu_y = cur2_y + 3 + max(1, len(wrap_line(sel_line, max(10, w - 4))))
+    menu_y = cur_y + 3
     options = [
         "1) Add all nonprepared (recommended)",
         "2) Add all",
@@ -414,7 +308,7 @@ def draw(
         try: stdscr.addstr(info_y, 2, msg[: max(0, w - 4)], msg_attr)
         except curses.error: pass
 
-    stdscr.refresh()
+    end_frame(stdscr)
     return menu_y, len(options)
 
 # -------------------- small prompt --------------------
@@ -424,6 +318,8 @@ def prompt(stdscr, top_line, hint_attr, y_start=None):
     if y_start is None:
         y_start = h - 6
     try:
+        stdscr.move(y_start, 0)
+        stdscr.clrtobot()
         stdscr.addstr(y_start, 2, top_line, hint_attr)
         stdscr.addstr(y_start + 1, 2, "Separate by space or comma • Esc=Back", hint_attr)
         stdscr.addstr(y_start + 3, 2, "> ")
@@ -458,21 +354,23 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
     selection = set()
     focus = "menu"
     menu_cursor = 0
-    proc_cursor = 0
+    plist = VirtualList()
     trial_num = 1
 
     while True:
         names = list_processed_systems(pdb_proc_dir)
         ready = list_namd_prepared(namd_proc_dir, names)
-        if proc_cursor >= len(names):
-            proc_cursor = max(0, len(names) - 1)
+        plist.set_items(names)
+
+        def redraw(msg="", msg_attr=0):
+            return draw(
+                stdscr, SUBTITLE, hint_attr,
+                pdb_proc_dir, namd_proc_dir,
+                plist, ready, selection, focus, menu_cursor,
+                trial_num, msg, msg_attr, err_attr
+            )
 
-        _, options_len = draw(
-            stdscr, SUBTITLE, hint_attr,
-            pdb_proc_dir, namd_proc_dir,
-            names, ready, selection, proc_cursor, focus, menu_cursor,
-            trial_num
-        )
+        menu_y, options_len = redraw()
 
         k = stdscr.getch()
         choice = None
@@ -480,6 +378,20 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
         if k in (9, curses.KEY_BTAB):
             focus = "proc" if focus == "menu" else ("trial" if focus == "proc" else "menu")
 
+        elif k == FILTER_KEY:
+            focus = "proc"
+            plist.edit_filter(stdscr, redraw, LIST_Y - 1)
+
+        elif focus == "proc" and k in (curses.KEY_DOWN, ord('j')) and plist.at_last_row():
+            focus = "menu"
+
+        elif focus == "proc" and plist.handle_key(k):
+            pass
+
+        elif k in (curses.KEY_PPAGE, curses.KEY_NPAGE):
+            focus = "proc"
+            plist.handle_key(k)
+
         elif k in (curses.KEY_UP, ord('k')):
             if focus == "menu":
                 if menu_cursor == 0:
@@ -488,16 +400,12 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
                     menu_cursor = (menu_cursor - 1) % options_len
             elif focus == "trial":
                 trial_num = max(1, trial_num - 1)
-            elif focus == "proc":
-                pass
 
         elif k in (curses.KEY_DOWN, ord('j')):
             if focus == "menu":
                 menu_cursor = (menu_cursor + 1) % options_len
             elif focus == "trial":
                 trial_num = max(1, trial_num + 1)
-            elif focus == "proc":
-                focus = "menu"
 
         elif k in (curses.KEY_LEFT, ord('h')):
             if focus == "menu":
@@ -507,14 +415,9 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
                     focus = "trial"
             elif focus == "trial":
                 trial_num = max(1, trial_num - 1)
-            elif focus == "proc":
-                proc_cursor = max(0, proc_cursor - 1) if names else 0
 
         elif k in (curses.KEY_RIGHT, ord('l')):
-            if focus == "proc":
-                if names:
-                    proc_cursor = min(len(names) - 1, proc_cursor + 1)
-            elif focus == "trial":
+            if focus == "trial":
                 trial_num = max(1, trial_num + 1)
             elif focus == "menu":
                 if menu_cursor == 5:
@@ -526,8 +429,8 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
             if focus == "menu":
                 choice = menu_cursor
             elif focus == "proc":
-                if names:
-                    n = names[proc_cursor]
+                n = plist.current()
+                if n:
                     if n in selection:
                         selection.discard(n)
                     else:
@@ -554,21 +457,23 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
             continue
 
         # ---- map indices to actions ----
+        # With a filter active, the bulk adds only take the filtered names
         if choice == 0:  # Add all nonprepared
-            nonprepared = [t for t in names if t not in ready]
+            nonprepared = [t for t in plist.view if t not in ready]
             if not nonprepared:
-                draw(stdscr, SUBTITLE, hint_attr, pdb_proc_dir, namd_proc_dir,
-                     names, ready, selection, proc_cursor, focus, menu_cursor,
-                     trial_num, "All processed systems appear NAMD-ready", err_attr, err_attr)
+                redraw("All processed systems appear NAMD-ready", err_attr)
                 stdscr.getch()
             else:
                 selection.update(nonprepared)
 
         elif choice == 1:  # Add all
-            selection = set(names)
+            if plist.filtered():
+                selection.update(plist.view)
+            else:
+                selection = set(names)
 
         elif choice == 2:  # Add selection (text prompt)
-            y_in = compute_input_y(stdscr, names, ready, selection)
+            y_in = compute_input_y(stdscr, menu_y)
             s = prompt(stdscr, EXAMPLES_ADD, hint_attr, y_start=y_in)
             if s:
                 toks = tokens_from(s)
@@ -577,13 +482,11 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
                 if valid:
                     selection.update(valid)
                 if invalid:
-                    draw(stdscr, SUBTITLE, hint_attr, pdb_proc_dir, namd_proc_dir,
-                         names, ready, selection, proc_cursor, focus, menu_cursor,
-                         trial_num, "Invalid: " + ", ".join(invalid), err_attr, err_attr)
+                    redraw("Invalid: " + ", ".join(invalid), err_attr)
                     stdscr.getch()
 
         elif choice == 3:  # Remove selection (text prompt)
-            y_in = compute_input_y(stdscr, names, ready, selection)
+            y_in = compute_input_y(stdscr, menu_y)
             s = prompt(stdscr, EXAMPLES_REMOVE, hint_attr, y_start=y_in)
             if s:
                 toks = tokens_from(s)
@@ -596,9 +499,7 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
                 if not_in_list:   msgs.append("Not found: " + ", ".join(not_in_list))
                 if not_selected:  msgs.append("Not in selection: " + ", ".join(not_selected))
                 if msgs:
-                    draw(stdscr, SUBTITLE, hint_attr, pdb_proc_dir, namd_proc_dir,
-                         names, ready, selection, proc_cursor, focus, menu_cursor,
-                         trial_num, " | ".join(msgs), err_attr, err_attr)
+                    redraw(" | ".join(msgs), err_attr)
                     stdscr.getch()
 
         elif choice == 4:  # Remove all
@@ -614,19 +515,16 @@ def run_setup_namd(stdscr, inherited_hint_attr=None):
 
         elif choice == 6:  # Generate current selection (local)
             if not selection:
-                draw(stdscr, SUBTITLE, hint_attr, pdb_proc_dir, namd_proc_dir,
-                     names, ready, selection, proc_cursor, focus, menu_cursor,
-                     trial_num, "Selection is empty", err_attr, err_attr)
+                redraw("Selection is empty", err_attr)
                 stdscr.getch()
             else:
                 sels = sorted(selection)
                 ok, msg = run_local_with_progress(
-                    stdscr, sels, conf_path=DEFAULT_CONF, trial_num=trial_num,
+                    stdscr, sels, conf_path=conf_path, trial_num=trial_num,
                     hint_attr=hint_attr, err_attr=err_attr
                 )
-                draw(stdscr, SUBTITLE, hint_attr, pdb_proc_dir, namd_proc_dir,
-                     names, ready, selection, proc_cursor, focus, menu_cursor,
-                     trial_num, msg, 0 if ok else err_attr, err_attr)
+                get_project_index().invalidate()
+                redraw(msg, 0 if ok else err_attr)
                 stdscr.getch()
 
         elif choice == options_len - 1:  # Back
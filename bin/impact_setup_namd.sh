@@ -24,15 +24,7 @@ fi
 conf_abs="$(cd "$(dirname "$CONF_PATH")" && pwd)/$(basename "$CONF_PATH")"
 conf_dir="$(dirname "$conf_abs")"
 
-get_conf() {
-  awk -v k="$1" -F'=' '
-    $0 ~ "^[[:space:]]*"k"[[:space:]]*=" {
-      sub(/^[[:space:]]*[^=]+=[[:space:]]*/,"",$0);
-      gsub(/^["'"'"']|["'"'"']$/,"",$0);
-      gsub(/^[[:space:]]+|[[:space:]]+$/,"",$0);
-      print $0; exit
-    }' "$conf_abs"
-}
+source "$(dirname "${BASH_SOURCE[0]}")/impact_conf_env.sh"
 
 abspath() {
   case "$1" in
@@ -42,18 +34,13 @@ abspath() {
   esac
 }
 
-PDB_PROC_DIR_REL="$(get_conf 'PDB_PROC_DIR')"
-input_src_root="$(abspath "${PDB_PROC_DIR_REL:-1_output}")"
-
-NAMD_PROC_DIR_REL="$(get_conf 'NAMD_PROC_DIR')"
-namd_root="$(abspath "${NAMD_PROC_DIR_REL:-2_output}")"
+input_src_root="$IMPACT_PDB_PROC_DIR"
+namd_root="$IMPACT_NAMD_PROC_DIR"
 
 script_dir="$(abspath "gen_scripts")"
-aux_dir="$(abspath "aux")"
-run_gen_namd="${aux_dir}/run_gen_namd.sh"
-
-SLURM_ACCOUNT_VAL="$(get_conf 'SLURM_ACCOUNT')"
-SLURM_PARTITION_VAL="$(get_conf 'SLURM_PARTITION')"
+param_dir="$(abspath "param")"
+bin_dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+render_py="${bin_dir}/impact_templates.py"
 
 # -------------------- selection list --------------------
 declare -a selections
@@ -86,8 +73,8 @@ if [[ ! -d "$script_dir" ]]; then
   echo "gen_scripts directory not found: $script_dir" >&2
   exit 1
 fi
-if [[ ! -x "$run_gen_namd" ]]; then
-  echo "Helper script not executable: $run_gen_namd" >&2
+if [[ ! -f "$render_py" ]]; then
+  echo "Template renderer not found: $render_py" >&2
   exit 1
 fi
 
@@ -105,38 +92,6 @@ copy_required() {
   echo "  [✓] Copied $(basename "$src")"
 }
 
-inject_slurm_headers() {
-  local file="$1"
-  local part="$2"
-  local acct="$3"
-
-  local tmpf="${file}.tmp"
-  awk -v part="$part" -v acct="$acct" '
-    NR==1{
-      print $0
-      printed=0
-      # only add if not already present
-      p_seen=0; a_seen=0
-      next
-    }
-    {
-      body = body $0 ORS
-    }
-    END{
-      # Re-scan first few lines of body to detect existing lines
-      split(body, L, ORS)
-      for(i=1;i<=length(L)&&i<=10;i++){
-        if(L[i] ~ /^#SBATCH[[:space:]]+--partition=/) p_seen=1
-        if(L[i] ~ /^#SBATCH[[:space:]]+--account=/)   a_seen=1
-      }
-      if(part != "" && p_seen==0) print "#SBATCH --partition=" part
-      if(acct != "" && a_seen==0) print "#SBATCH --account=" acct
-      printf "%s", body
-    }
-  ' "$file" > "$tmpf"
-  mv "$tmpf" "$file"
-}
-
 # -------------------- main (local) --------------------
 echo "==> Trial: ${TRIAL}"
 echo "==> PDB_PROC_DIR (input): ${input_src_root}"
@@ -144,6 +99,7 @@ echo "==> NAMD_PROC_DIR (output root): ${namd_root}"
 echo "==> Prefixes: ${selections[*]}"
 echo
 
+declare -a ready=()
 for prefix in "${selections[@]}"; do
   echo "---- Processing: ${prefix} (trial ${TRIAL}) ----"
 
@@ -158,26 +114,17 @@ for prefix in "${selections[@]}"; do
   copy_required "${src_dir}/${combined_prefix}_solvated_ionized_centered.pdb"  "${dest_dir}/mini/${combined_prefix}_solvated_ionized_centered.pdb" || { echo "  Skipping ${prefix} due to missing files."; echo; continue; }
   copy_required "${src_dir}/${combined_prefix}_restrain.pdb"                   "${dest_dir}/mini/${combined_prefix}_restrain.pdb"                   || { echo "  Skipping ${prefix} due to missing files."; echo; continue; }
 
-  cp -f "$run_gen_namd" "${dest_dir}/"
-  (
-    cd "${dest_dir}"
-    chmod +x run_gen_namd.sh
-    ./run_gen_namd.sh "${script_dir}" "${prefix}" "${TRIAL}"
-
-    for f in *.sh; do
-      [[ -f "$f" ]] || continue
-      first="$(head -n1 "$f")"
-      if [[ "$first" != "#!"* ]]; then
-        printf '#!/bin/bash\n%s\n' "$(cat "$f")" > "$f"
-      fi
-      inject_slurm_headers "$f" "${SLURM_PARTITION_VAL}" "${SLURM_ACCOUNT_VAL}"
-    done
-
-    rm -f run_gen_namd.sh
-  )
-
-  echo "  [✓] Generated NAMD job files in ${dest_dir}"
+  ready+=("${prefix}")
   echo
 done
 
+# Render every stage for all copied systems in one process
+if [[ ${#ready[@]} -gt 0 ]]; then
+  "${PYTHON:-python3}" "$render_py" namd \
+    --root "$namd_root" --trial "$TRIAL" \
+    --templates "${script_dir}/namd" --param-dir "$param_dir" \
+    "${ready[@]}"
+  echo
+fi
+
 echo "All done."
\ No newline at end of file
@@ -8,9 +8,15 @@ import subprocess
 import shutil
 from typing import List, Tuple, Optional
 
+from impact_slurm import get_cache, is_terminal
+from impact_logs import LogFollower, tail_lines
+from impact_project_index import get_project_index
+from impact_config import load_config
+from impact_render import begin_frame, end_frame, FrameLimiter
+from impact_widgets import VirtualList, FILTER_KEY, summary_line
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(BASE_DIR)
-DEFAULT_CONF = os.path.join(ROOT_DIR, "IMPACT.conf")
 SETUP_SH = os.path.join(ROOT_DIR, "bin", "impact_setup_pdb.sh")
 LOG_DIR = os.path.join(ROOT_DIR, "log")
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -18,81 +24,21 @@ os.makedirs(LOG_DIR, exist_ok=True)
 SUBTITLE = "Setup PDB"
 EXAMPLES_ADD = "Add: e.g., 06 07,08 09"
 EXAMPLES_REMOVE = "Remove: e.g., 06 07,08 09"
+LIST_Y = 11
+BELOW_LIST = 18   # summaries, menu, SLURM info and message under the list
 
 def stdbuf_prefix():
     return ['stdbuf','-oL','-eL'] if shutil.which('stdbuf') else []
 
-def find_conf():
-    if os.path.exists(DEFAULT_CONF):
-        return DEFAULT_CONF
-    p = os.path.join(os.getcwd(), "IMPACT.conf")
-    return p if os.path.exists(p) else None
-
 def read_config():
-    conf = find_conf()
-    pdb_dir = "."
-    pdb_proc_dir = "."
-    slurm = {}
-    if conf and os.path.exists(conf):
-        base = os.path.dirname(conf)
-        with open(conf) as fh:
-            for line in fh:
-                s = line.strip()
-                if not s or s.startswith("#"):
-                    continue
-                if s.startswith("PDB_DIR"):
-                    _, v = s.split("=", 1)
-                    pdb_dir = os.path.abspath(os.path.join(base, v.strip().strip('"').strip("'")))
-                elif s.startswith("PDB_PROC_DIR"):
-                    _, v = s.split("=", 1)
-                    pdb_proc_dir = os.path.abspath(os.path.join(base, v.strip().strip('"').strip("'")))
-                elif s.startswith("SLURM_"):
-                    k, v = s.split("=", 1)
-                    slurm[k.strip()] = v.strip().strip('"').strip("'")
-    has_slurm = (
-        bool(slurm.get("SLURM_ACCOUNT")) and
-        bool(slurm.get("SLURM_PARTITION")) and
-        bool(slurm.get("SLURM_CMD"))
-    )
-    return pdb_dir, pdb_proc_dir, slurm, has_slurm, (conf if conf else DEFAULT_CONF)
-
-def wrap_tokens(stdscr, y, x, w, tokens, hi_idx=None, attr_hi=0, attr_norm=0):
-    if w <= 4:
-        return 0
-    cx, cy = x, y
-    used = 1
-    for i, tok in enumerate(tokens):
-        t = tok + " "
-        if cx + len(t) > w - 2:
-            cy += 1; cx = x; used += 1
-        attr = attr_hi if (hi_idx is not None and i == hi_idx) else attr_norm
-        try: stdscr.addstr(cy, cx, t, attr)
-        except curses.error: pass
-        cx += len(t)
-    return used
-
-def wrap_line(s, w):
-    if w <= 0: return [""]
-    out, cur = [], ""
-    for tok in s.split():
-        if len(cur) + len(tok) + (1 if cur else 0) <= w:
-            cur = (cur + " " + tok).strip()
-        else:
-            out.append(cur); cur = tok
-    if cur: out.append(cur)
-    return out or [""]
+    cfg = load_config()
+    return cfg.pdb_dir, cfg.pdb_proc_dir, cfg.slurm, cfg.has_slurm, cfg.path
 
 def list_pdbs(pdb_dir):
-    if not os.path.isdir(pdb_dir): return []
-    return sorted(os.path.splitext(f)[0] for f in os.listdir(pdb_dir) if f.lower().endswith(".pdb"))
+    return get_project_index().pdbs(pdb_dir)
 
 def list_processed(pdb_proc_dir):
-    if not os.path.isdir(pdb_proc_dir): return set()
-    out = set()
-    for f in os.listdir(pdb_proc_dir):
-        p = os.path.join(pdb_proc_dir, f)
-        out.add(f if os.path.isdir(p) else os.path.splitext(f)[0])
-    return out
+    return get_project_index().processed(pdb_proc_dir)
 
 def tokens_from(s):
     s = s.replace(",", " ")
@@ -112,44 +58,40 @@ def init_colors():
             hint_attr = curses.color_pair(10)
     return err_attr, hint_attr
 
-def draw(stdscr, title, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection,
-         pdb_cursor, focus, menu_cursor, has_slurm, slurm, msg="", msg_attr=0, err_attr=0,
+def list_rows(h):
+    return max(3, h - LIST_Y - BELOW_LIST)
+
+def draw(stdscr, title, hint_attr, pdb_dir, pdb_proc_dir, plist, processed, selection,
+         focus, menu_cursor, has_slurm, slurm, msg="", msg_attr=0, err_attr=0,
          slurm_override=False):
-    stdscr.clear()
+    begin_frame(stdscr)
     h, w = stdscr.getmaxyx()
     tx = max(0, (w - len(title)) // 2)
     try:
         stdscr.addstr(1, tx, title, curses.A_BOLD)
         stdscr.addstr(3, 2, "Focus: Tab • Esc/0 Back • Enter activate", hint_attr)
         stdscr.addstr(4, 2, "Menu: ↑/↓ or j/k • 1–7 shortcuts", hint_attr)
-        stdscr.addstr(5, 2, "PDBs: ←/→ or h/l • Enter toggles", hint_attr)
+        stdscr.addstr(5, 2, "PDBs: arrows or h/j/k/l • PgUp/PgDn • / filter • Enter toggles", hint_attr)
         stdscr.addstr(7, 2, f"PDB_DIR: {pdb_dir}", hint_attr)
         stdscr.addstr(8, 2, f"PDB_PROC_DIR: {pdb_proc_dir}", hint_attr)
-        stdscr.addstr(10, 2, "Available PDBs:", curses.A_UNDERLINE)
     except curses.error:
         pass
 
-    hi_idx = pdb_cursor if (pdbs and focus == "pdb") else None
-    lines_used = wrap_tokens(stdscr, 11, 2, w, pdbs, hi_idx=hi_idx, attr_hi=curses.A_REVERSE, attr_norm=0)
-
-    cur_y = 11 + max(1, lines_used)
-    try: stdscr.addstr(cur_y, 2, "Already processed:", curses.A_UNDERLINE)
+    def cell(name):
+        return ("[x] " if name in selection else "[ ] ") + name, (hint_attr if name in processed else 0)
+    used = plist.draw_grid(stdscr, LIST_Y, 2, w, list_rows(h), cell, focus == "pdb")
+    try: stdscr.addstr(LIST_Y - 1, 2, plist.header("Available PDBs")[: max(0, w - 4)], curses.A_UNDERLINE)
     except curses.error: pass
-    shown_proc = sorted(set(pdbs) & set(processed))
-    proc_line = " ".join(shown_proc) if shown_proc else "(none)"
-    for j, line in enumerate(wrap_line(proc_line, max(10, w - 4))):
-        try: stdscr.addstr(cur_y + 1 + j, 2, line)
-        except curses.error: pass
 
-    cur2_y = cur_y + 2 + max(1, len(wrap_line(proc_line, max(10, w - 4))))
-    try: stdscr.addstr(cur2_y, 2, "Current selection:", curses.A_UNDERLINE)
-    except curses.error: pass
-    sel_line = " ".join(sorted(selection)) if selection else "(empty)"
-    for k, line in enumerate(wrap_line(sel_line, max(10, w - 4))):
-        try: stdscr.addstr(cur2_y + 1 + k, 2, line)
-        except curses.error: pass
+    cur_y = LIST_Y + used + 1
+    n_proc = sum(1 for n in plist.items if n in processed)
+    try:
+        stdscr.addstr(cur_y, 2, f"Already processed: {n_proc} of {len(plist.items)} (dimmed)", hint_attr)
+        stdscr.addstr(cur_y + 1, 2, summary_line("Current selection", sorted(selection), max(10, w - 4)))
+    except curses.error:
+        pass
 
-    menu_y = cur2_y + 3 + max(1, len(wrap_line(sel_line, max(10, w - 4))))
+    menu_y = cur_y + 3
     options = [
         "1) Add all nonprocessed (recommended)",
         "2) Add all",
@@ -197,13 +139,15 @@ def draw(stdscr, title, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selec
         try: stdscr.addstr(info_y + 4, 2, msg[: max(0, w - 4)], msg_attr)
         except curses.error: pass
 
-    stdscr.refresh()
+    end_frame(stdscr)
     return menu_y, len(options), options
 
 def prompt(stdscr, top_line, hint_attr, y_start=None):
     h, w = stdscr.getmaxyx()
     if y_start is None: y_start = h - 6
     try:
+        stdscr.move(y_start, 0)
+        stdscr.clrtobot()
         stdscr.addstr(y_start, 2, top_line, hint_attr)
         stdscr.addstr(y_start + 1, 2, "Separate by space or comma • Esc=Back", hint_attr)
         stdscr.addstr(y_start + 3, 2, "> ")
@@ -222,37 +166,10 @@ def prompt(stdscr, top_line, hint_attr, y_start=None):
     if cancelled["v"]: return None
     return s
 
-def compute_input_y(stdscr, pdbs, processed, selection):
+def compute_input_y(stdscr, menu_y):
+    # Under the menu, but never so low that the 4-line prompt leaves the screen
     h, w = stdscr.getmaxyx()
-    pdb_lines = max(1, len(wrap_line(" ".join(pdbs), max(10, w - 4))))
-    proc_lines = max(1, len(wrap_line(" ".join(sorted(set(pdbs) & set(processed))) or "(none)", max(10, w - 4))))
-    sel_lines = max(1, len(wrap_line(" ".join(sorted(selection)) if selection else "(empty)", max(10, w - 4))))
-    cur_y = 11 + pdb_lines
-    cur2_y = cur_y + 1 + proc_lines + 1
-    menu_y = cur2_y + 2 + sel_lines + 1
-    return menu_y + 10
-
-def tail_lines(path, n=50, w=120):
-    try:
-        with open(path, "rb") as f:
-            f.seek(0, os.SEEK_END)
-            size = f.tell()
-            if size <= 0:
-                return []
-            block = 4096
-            chunks = []
-            read = 0
-            while size > 0 and read < 1024 * 1024 and sum(c.count(b"\n") for c in chunks) <= n + 4:
-                to_read = block if size >= block else size
-                size -= to_read
-                f.seek(size)
-                chunks.insert(0, f.read(to_read))
-                read += to_read
-            data = b"".join(chunks)
-            lines = data.decode(errors="ignore").splitlines()[-n:]
-            return [ln[: max(0, w - 6)] for ln in lines]
-    except Exception:
-        return []
+    return max(0, min(menu_y + 9, h - 5))
 
 def draw_progress(stdscr, y0, name, idx, total, started_at, item_started_at,
                   avg_sec, out_tail, err_tail, hint_attr, err_attr, split_label,
@@ -267,7 +184,7 @@ def draw_progress(stdscr, y0, name, idx, total, started_at, item_started_at,
     bar_w = max(20, w - 10)
     filled = max(0, int((pct / 100.0) * (bar_w - 2)))
     bar = "[" + "#" * filled + "-" * ((bar_w - 2) - filled) + "]"
-    stdscr.clear()
+    begin_frame(stdscr)
     try:
         stdscr.addstr(y0, 2, "Running… (q/Esc=cancel, v=logs, s=split)", hint_attr)
         if extra_line:
@@ -287,7 +204,7 @@ def draw_progress(stdscr, y0, name, idx, total, started_at, item_started_at,
                 stdscr.addstr(y, 2, ln); y += 1
     except curses.error:
         pass
-    stdscr.refresh()
+    end_frame(stdscr)
 
 def _run(cmd: List[str]) -> Tuple[int, str, str]:
     try:
@@ -305,34 +222,20 @@ def parse_jobid_from_sbatch(out: str) -> Optional[str]:
     m = re.search(r"\b(\d{5,})\b", s)
     return m.group(1) if m else None
 
-_TERMINAL = {"COMPLETED","FAILED","CANCELLED","TIMEOUT","OUT_OF_MEMORY","PREEMPTED","BOOT_FAIL"}
-
 def slurm_state(jobid: str) -> Optional[str]:
-    rc, out, err = _run(["sacct", "-j", jobid, "-n", "--format=State"])
-    if rc == 0 and out.strip() and "disabled" not in (out+err).lower():
-        return out.strip().splitlines()[0].split()[0]
-    rc, out, _ = _run(["scontrol", "show", "job", jobid])
-    if rc == 0 and out:
-        m = re.search(r"JobState=([A-Za-z_]+)", out)
-        if m:
-            return m.group(1)
-    rc, out, _ = _run(["squeue", "-j", jobid, "-h", "-o", "%T"])
-    if rc == 0:
-        st = out.strip()
-        if st:
-            return st
-    return "UNKNOWN_GONE"
-
-def is_terminal(state: Optional[str]) -> bool:
-    if not state: return False
-    u = state.upper()
-    return u in _TERMINAL or u == "UNKNOWN_GONE"
+    return get_cache().state(jobid)
 
 def slurm_log_paths(jobname: str) -> Tuple[str, str]:
+    # log/<jobname>.out|.err; array tasks use array_log_name()
     outp = os.path.join(LOG_DIR, f"{jobname}.out")
     errp = os.path.join(LOG_DIR, f"{jobname}.err")
     return outp, errp
 
+def array_log_name(jobid: str, task: int) -> str:
+    # matches --output=%x_%A_%a in impact_setup_pdb.sh, so a later array
+    # never shows (or overwrites) an earlier one's logs
+    return f"IMPACT_array_{jobid}_{task}"
+
 def run_local_with_progress(stdscr, selections, conf_path, script_path, hint_attr, err_attr):
     if not selections: return False, "Selection is empty"
     if not os.path.isfile(script_path): return False, f"Missing {script_path}"
@@ -354,8 +257,11 @@ def run_local_with_progress(stdscr, selections, conf_path, script_path, hint_att
             out_f = open(out_path, "w"); err_f = open(err_path, "w")
             cmd = stdbuf_prefix() + [script_path, "--local", "--conf", conf_path, sel_path]
             p = subprocess.Popen(cmd, stdout=out_f, stderr=err_f, text=True)
+            out_log, err_log = LogFollower(out_path), LogFollower(err_path)
             t0 = time.time()
+            frames = FrameLimiter()
             while True:
+                ch = -1
                 try:
                     ch = stdscr.getch()
                     if ch in (27, ord('q')):
@@ -363,6 +269,7 @@ def run_local_with_progress(stdscr, selections, conf_path, script_path, hint_att
                         try: p.wait(timeout=5)
                         except Exception: pass
                         out_f.close(); err_f.close()
+                        out_log.close(); err_log.close()
                         try: os.unlink(sel_path)
                         except Exception: pass
                         return False, "Cancelled"
@@ -371,6 +278,9 @@ def run_local_with_progress(stdscr, selections, conf_path, script_path, hint_att
                 except curses.error:
                     pass
                 rc = p.poll()
+                if rc is None and not frames.due(force=ch != -1):
+                    time.sleep(0.1)
+                    continue
                 h, w = stdscr.getmaxyx()
                 y0 = 2
                 available_rows = max(0, (h - (y0 + 5)) - 2)
@@ -378,18 +288,19 @@ def run_local_with_progress(stdscr, selections, conf_path, script_path, hint_att
                     so, se = splits[split_idx]
                     out_n = max(5, int(available_rows * so))
                     err_n = max(5, available_rows - out_n)
-                    out_tail = tail_lines(out_path, n=out_n, w=w)
-                    err_tail = tail_lines(err_path, n=err_n, w=w)
+                    out_tail = out_log.tail(n=out_n, w=w)
+                    err_tail = err_log.tail(n=err_n, w=w)
                     split_label = f"{int(so*100)}/{int(se*100)}"
                 else:
-                    out_tail = tail_lines(out_path, n=5, w=w)
-                    err_tail = tail_lines(err_path, n=5, w=w)
+                    out_tail = out_log.tail(n=5, w=w)
+                    err_tail = err_log.tail(n=5, w=w)
                     split_label = "compact"
                 avg = (sum(times) / len(times)) if times else max(1.0, time.time() - t0)
                 draw_progress(stdscr, y0, name, idx, total, t_start, t0, avg, out_tail, err_tail, hint_attr, err_attr, split_label)
                 if rc is not None: break
                 time.sleep(0.1)
             out_f.close(); err_f.close()
+            out_log.close(); err_log.close()
             dt = time.time() - t0
             try: os.unlink(sel_path)
             except Exception: pass
@@ -397,14 +308,14 @@ def run_local_with_progress(stdscr, selections, conf_path, script_path, hint_att
                 h, w = stdscr.getmaxyx()
                 long_err = "\n".join(tail_lines(err_path, n=max(12, h - 10), w=w))
                 stdscr.nodelay(False)
-                stdscr.clear()
+                begin_frame(stdscr)
                 try:
                     stdscr.addstr(2, 2, f"Error on {name} (exit {rc})", err_attr)
                     stdscr.addstr(4, 2, long_err, err_attr)
                     stdscr.addstr(h - 2, 2, "Press any key…", hint_attr)
                 except curses.error:
                     pass
-                stdscr.refresh()
+                end_frame(stdscr)
                 stdscr.getch()
                 return False, f"Error on {name} (exit {rc})"
             times.append(dt)
@@ -413,6 +324,234 @@ def run_local_with_progress(stdscr, selections, conf_path, script_path, hint_att
     total_dt = int(time.time() - t_start)
     return True, f"Completed {total} in {total_dt//60}m {total_dt%60}s"
 
+DEFAULT_LOCAL_JOBS = 4
+
+def local_jobs_from_conf(conf_path):
+    # LOCAL_JOBS in IMPACT.conf (default 4), capped at the core count
+    jobs = load_config(conf_path).get_int("LOCAL_JOBS", minimum=1) or DEFAULT_LOCAL_JOBS
+    return max(1, min(jobs, os.cpu_count() or 1))
+
+class LocalBatch:
+    # Runs `impact_setup_pdb.sh --local` once per system, up to `jobs` at a
+    # time. No curses in here: the caller drives it with poll() and reads items.
+    def __init__(self, selections, conf_path, script_path, jobs=1):
+        self.conf_path = conf_path
+        self.script_path = script_path
+        self.jobs = max(1, int(jobs))
+        self.started_at = time.time()
+        tmp = tempfile.gettempdir()
+        self.items = [{"name": n, "state": "waiting", "proc": None, "rc": None, "t0": None, "t1": None,
+                       "out": os.path.join(tmp, f"impact_{n}.out"), "err": os.path.join(tmp, f"impact_{n}.err"),
+                       "out_log": None, "err_log": None, "_files": None, "_sel": None} for n in selections]
+
+    def _start(self, it):
+        with tempfile.NamedTemporaryFile("w", delete=False, prefix=f"{it['name']}_", suffix=".sel") as fsel:
+            fsel.write(it["name"] + "\n")
+            it["_sel"] = fsel.name
+        out_f = open(it["out"], "w"); err_f = open(it["err"], "w")
+        cmd = stdbuf_prefix() + [self.script_path, "--local", "--conf", self.conf_path, it["_sel"]]
+        try:
+            it["proc"] = subprocess.Popen(cmd, stdout=out_f, stderr=err_f, text=True)
+        except OSError as e:
+            err_f.write(f"{e}\n")
+            out_f.close(); err_f.close()
+            it["state"], it["rc"], it["t0"], it["t1"] = "failed", 127, time.time(), time.time()
+            return
+        it["_files"] = (out_f, err_f)
+        it["out_log"], it["err_log"] = LogFollower(it["out"]), LogFollower(it["err"])
+        it["state"], it["t0"] = "running", time.time()
+
+    def _finish(self, it, rc, state=None):
+        if it["_files"]:
+            for f in it["_files"]:
+                try: f.close()
+                except Exception: pass
+            it["_files"] = None
+        try: os.unlink(it["_sel"])
+        except Exception: pass
+        it["rc"], it["t1"] = rc, time.time()
+        it["state"] = state or ("ok" if rc == 0 else "failed")
+
+    def poll(self) -> bool:
+        for it in self.items:
+            if it["state"] == "running":
+                rc = it["proc"].poll()
+                if rc is not None:
+                    self._finish(it, rc)
+        free = self.jobs - len(self.running())
+        for it in self.items:
+            if free <= 0:
+                break
+            if it["state"] == "waiting":
+                self._start(it)
+                free -= 1
+        return self.done
+
+    def cancel(self):
+        running = self.running()
+        for it in running:
+            try: it["proc"].terminate()
+            except Exception: pass
+        for it in running:
+            try: it["proc"].wait(timeout=5)
+            except Exception:
+                try: it["proc"].kill()
+                except Exception: pass
+            self._finish(it, it["proc"].returncode, state="cancelled")
+        for it in self.items:
+            if it["state"] == "waiting":
+                it["state"] = "cancelled"
+        self.close_logs()
+
+    def close_logs(self):
+        for it in self.items:
+            for k in ("out_log", "err_log"):
+                if it[k] is not None:
+                    it[k].close()
+
+    def running(self):
+        return [it for it in self.items if it["state"] == "running"]
+
+    def count(self, state):
+        return sum(1 for it in self.items if it["state"] == state)
+
+    @property
+    def done(self):
+        return all(it["state"] not in ("waiting", "running") for it in self.items)
+
+    def finished(self):
+        return [it for it in self.items if it["state"] in ("ok", "failed")]
+
+    def throughput(self):
+        # systems per minute
+        mins = (time.time() - self.started_at) / 60.0
+        return len(self.finished()) / mins if mins > 0 else 0.0
+
+def draw_local_pool(stdscr, y0, batch, verbose, hint_attr, err_attr):
+    h, w = stdscr.getmaxyx()
+    total = len(batch.items)
+    fin = len(batch.finished())
+    running = batch.running()
+    failed = [it["name"] for it in batch.items if it["state"] == "failed"]
+    rate = batch.throughput()
+    elapsed = int(time.time() - batch.started_at)
+    remain = total - fin
+    est = int(remain / rate * 60) if rate > 0 else 0
+    pct = int((fin / total) * 100) if total > 0 else 0
+    bar_w = max(20, w - 10)
+    filled = max(0, int((pct / 100.0) * (bar_w - 2)))
+    bar = "[" + "#" * filled + "-" * ((bar_w - 2) - filled) + "]"
+    begin_frame(stdscr)
+    try:
+        stdscr.addstr(y0, 2, f"Running {batch.jobs} at a time… (q/Esc=cancel all, v=logs)", hint_attr)
+        stdscr.addstr(y0 + 1, 2, f"{fin}/{total} done • {len(running)} running • {batch.count('waiting')} waiting • {len(failed)} failed • {rate:.1f} systems/min")
+        stdscr.addstr(y0 + 2, 2, f"{pct:3d}% {bar}")
+        stdscr.addstr(y0 + 3, 2, f"ETA ~ {est//60:d}m {est%60:d}s • Elapsed {elapsed//60}m {elapsed%60}s")
+    except curses.error:
+        pass
+    y = y0 + 5
+    bottom = h - 2 if failed else h - 1
+    panes = sorted(running, key=lambda it: it["t0"] or 0)
+    pane_h = max(2, (bottom - y) // max(1, len(panes))) if verbose else 1
+    for it in panes:
+        if y >= bottom:
+            break
+        dt = time.time() - (it["t0"] or time.time())
+        try:
+            if not verbose:
+                last = it["err_log"].last(w=w) or it["out_log"].last(w=w)
+                stdscr.addstr(y, 2, f"{it['name']} • {dt:.0f}s • {last}"[: max(0, w - 4)])
+                y += 1
+                continue
+            stdscr.addstr(y, 2, f"── {it['name']} • {dt:.0f}s "[: max(0, w - 4)], hint_attr)
+            body = min(pane_h - 1, bottom - y - 1)
+            err_n = min(2, body // 2)
+            err_tail = it["err_log"].tail(n=err_n, w=w) if err_n > 0 else []
+            out_tail = it["out_log"].tail(n=body - len(err_tail), w=w)
+            yy = y + 1
+            for ln in out_tail:
+                stdscr.addstr(yy, 4, ln[: max(0, w - 6)]); yy += 1
+            for ln in err_tail:
+                stdscr.addstr(yy, 4, ln[: max(0, w - 6)], err_attr); yy += 1
+        except curses.error:
+            pass
+        y += pane_h
+    if failed:
+        try: stdscr.addstr(h - 2, 2, ("Failed: " + ", ".join(failed))[: max(0, w - 4)], err_attr)
+        except curses.error: pass
+    end_frame(stdscr)
+
+def run_local_pool_progress(stdscr, selections, conf_path, script_path, hint_attr, err_attr, jobs=1):
+    if not selections: return False, "Selection is empty"
+    if not os.path.isfile(script_path): return False, f"Missing {script_path}"
+    if not os.path.isfile(conf_path): return False, f"Missing {conf_path}"
+    batch = LocalBatch(selections, conf_path, script_path, jobs=jobs)
+    verbose = True
+    frames = FrameLimiter()
+    stdscr.nodelay(True)
+    try:
+        while True:
+            ch = -1
+            try:
+                ch = stdscr.getch()
+                if ch in (27, ord('q')):
+                    stopped = len(batch.running())
+                    never = batch.count("waiting")
+                    batch.cancel()
+                    return False, f"Cancelled ({len(batch.finished())} finished, {stopped} stopped, {never} never started)"
+                elif ch in (ord('v'), ord('V')): verbose = not verbose
+            except curses.error:
+                pass
+            done = batch.poll()
+            if done or frames.due(force=ch != -1):
+                draw_local_pool(stdscr, 2, batch, verbose, hint_attr, err_attr)
+            if done: break
+            time.sleep(0.1)
+    finally:
+        stdscr.nodelay(False)
+        batch.close_logs()
+    total_dt = int(time.time() - batch.started_at)
+    failed = [it for it in batch.items if it["state"] == "failed"]
+    if not failed:
+        return True, f"Completed {len(batch.items)} in {total_dt//60}m {total_dt%60}s ({batch.jobs} at a time)"
+    h, w = stdscr.getmaxyx()
+    begin_frame(stdscr)
+    try:
+        stdscr.addstr(2, 2, f"{len(failed)} of {len(batch.items)} failed", err_attr)
+        y = 4
+        for it in failed:
+            if y >= h - 3: break
+            stdscr.addstr(y, 2, f"{it['name']} (exit {it['rc']})", err_attr); y += 1
+            for ln in tail_lines(it["err"], n=2, w=w - 2):
+                if y >= h - 3: break
+                stdscr.addstr(y, 4, ln, err_attr); y += 1
+        stdscr.addstr(h - 2, 2, "Press any key…", hint_attr)
+    except curses.error:
+        pass
+    end_frame(stdscr)
+    stdscr.getch()
+    return False, f"{len(batch.items) - len(failed)}/{len(batch.items)} completed in {total_dt//60}m {total_dt%60}s • failed: " + ", ".join(it["name"] for it in failed)
+
+def submit_one_slurm(name, conf_path, script_path, slurm_override=False) -> Tuple[bool, Optional[str], str]:
+    with tempfile.NamedTemporaryFile("w", delete=False, prefix=f"{name}_", suffix=".sel") as fsel:
+        fsel.write(name + "\n")
+        sel_path = fsel.name
+    env = os.environ.copy()
+    cmd = [script_path, "--slurm"] + (["--force"] if slurm_override else []) + ["--conf", conf_path, sel_path]
+    res = subprocess.run(cmd, text=True, capture_output=True, env=env)
+    try: os.unlink(sel_path)
+    except Exception: pass
+    if res.returncode != 0:
+        msg = (res.stderr or res.stdout or "").strip()
+        return False, None, msg[-300:]
+    jobid = parse_jobid_from_sbatch((res.stdout or "") + " " + (res.stderr or ""))
+    if not jobid:
+        return False, None, "could not parse job id"
+    outp, errp = slurm_log_paths(f"IMPACT_{name}")
+    os.makedirs(LOG_DIR, exist_ok=True)
+    open(outp, "a").close(); open(errp, "a").close()
+    return True, jobid, f"Submitted {jobid}"
+
 def run_slurm_submit_sequential_progress(stdscr, selections, conf_path, script_path, hint_attr, err_attr, slurm_override=False):
     if not selections: return False, "Selection is empty"
     if not os.path.isfile(script_path): return False, f"Missing {script_path}"
@@ -423,26 +562,12 @@ def run_slurm_submit_sequential_progress(stdscr, selections, conf_path, script_p
     stdscr.nodelay(True)
     try:
         for idx, name in enumerate(selections, 1):
-            with tempfile.NamedTemporaryFile("w", delete=False, prefix=f"{name}_", suffix=".sel") as fsel:
-                fsel.write(name + "\n")
-                sel_path = fsel.name
-            env = os.environ.copy()
-            cmd = [script_path, "--slurm"] + (["--force"] if slurm_override else []) + ["--conf", conf_path, sel_path]
-            res = subprocess.run(cmd, text=True, capture_output=True, env=env)
-            try: os.unlink(sel_path)
-            except Exception: pass
-            if res.returncode != 0:
-                msg = (res.stderr or res.stdout or "").strip()
+            ok, jobid, msg = submit_one_slurm(name, conf_path, script_path, slurm_override)
+            if not ok:
                 stdscr.nodelay(False)
-                return False, f"{name}: {msg[-300:]}"
-            jobid = parse_jobid_from_sbatch((res.stdout or "") + " " + (res.stderr or ""))
-            if not jobid:
-                stdscr.nodelay(False)
-                return False, f"{name}: could not parse job id"
-            jname = f"IMPACT_{name}"
-            outp, errp = slurm_log_paths(jname)
-            os.makedirs(LOG_DIR, exist_ok=True)
-            open(outp, "a").close(); open(errp, "a").close()
+                return False, f"{name}: {msg}"
+            outp, errp = slurm_log_paths(f"IMPACT_{name}")
+            out_log, err_log = LogFollower(outp), LogFollower(errp)
             t0 = time.time()
             verbose = True
             splits = [(0.7, 0.3), (0.5, 0.5), (0.3, 0.7)]
@@ -466,18 +591,19 @@ def run_slurm_submit_sequential_progress(stdscr, selections, conf_path, script_p
                     so, se = splits[split_idx]
                     out_n = max(5, int(available_rows * so))
                     err_n = max(5, available_rows - out_n)
-                    out_tail = tail_lines(outp, n=out_n, w=w)
-                    err_tail = tail_lines(errp, n=err_n, w=w)
+                    out_tail = out_log.tail(n=out_n, w=w)
+                    err_tail = err_log.tail(n=err_n, w=w)
                     split_label = f"{int(so*100)}/{int(se*100)}"
                 else:
-                    out_tail = tail_lines(outp, n=5, w=w)
-                    err_tail = tail_lines(errp, n=5, w=w)
+                    out_tail = out_log.tail(n=5, w=w)
+                    err_tail = err_log.tail(n=5, w=w)
                     split_label = "compact"
                 avg = (sum(times) / len(times)) if times else max(1.0, time.time() - t0)
                 draw_progress(stdscr, y0, f"{name} [{state}]", idx, total, t_start, t0, avg, out_tail, err_tail, hint_attr, err_attr, split_label)
                 if is_terminal(state):
                     dt = time.time() - t0
                     times.append(dt)
+                    out_log.close(); err_log.close()
                     break
                 time.sleep(0.5)
     finally:
@@ -508,8 +634,201 @@ def run_slurm_submit(selections, conf_path, script_path):
         err = (res.stderr or res.stdout or "").strip()
         return False, f"Error ({res.returncode}): {err[-2000:]}"
 
-def run_slurm_submit_all_progress(*args, **kwargs):
-    return run_slurm_submit_sequential_progress(*args, **kwargs)
+def _fmt_dt(sec):
+    sec = int(max(0, sec))
+    return f"{sec//3600}h{(sec%3600)//60:02d}m" if sec >= 3600 else f"{sec//60}m{sec%60:02d}s"
+
+def draw_dashboard(stdscr, y0, rows, cursor, started_at, max_inflight, verbose, hint_attr, err_attr, title="Pipelined submit…"):
+    h, w = stdscr.getmaxyx()
+    now = time.time()
+    total = len(rows)
+    done = sum(1 for r in rows if r["done"])
+    failed = sum(1 for r in rows if r["done"] and r["state"] not in ("COMPLETED",))
+    waiting = sum(1 for r in rows if r["jobid"] is None and not r["done"])
+    active = total - done - waiting
+    running = sum(1 for r in rows if not r["done"] and r["state"] == "RUNNING")
+    pct = int((done / total) * 100) if total > 0 else 0
+    bar_w = max(20, w - 10)
+    filled = max(0, int((pct / 100.0) * (bar_w - 2)))
+    bar = "[" + "#" * filled + "-" * ((bar_w - 2) - filled) + "]"
+    elapsed = int(now - started_at)
+    ends = [r["t_end"] - r["t_submit"] for r in rows if r["done"] and r["t_submit"] and r["t_end"]]
+    avg = (sum(ends) / len(ends)) if ends else 0
+    lanes = max_inflight if max_inflight > 0 else max(1, total)
+    est = int(((total - done) / lanes) * avg) if avg > 0 else 0
+    limit = str(max_inflight) if max_inflight > 0 else "all"
+    begin_frame(stdscr)
+    try:
+        stdscr.addstr(y0, 2, f"{title} (q/Esc=cancel all, ↑/↓ select, v=logs)", hint_attr)
+        stdscr.addstr(y0 + 1, 2, f"{done}/{total} done • {running} running • {active} in flight (limit {limit}) • {waiting} waiting • {failed} failed")
+        stdscr.addstr(y0 + 2, 2, f"{pct:3d}% {bar}")
+        stdscr.addstr(y0 + 3, 2, f"ETA ~ {est//60:d}m {est%60:d}s • Elapsed {elapsed//60}m {elapsed%60}s")
+    except curses.error:
+        pass
+    name_w = max(12, min(28, max((len(r["name"]) for r in rows), default=12)))
+    header = f"{'System'.ljust(name_w)}  {'JobID'.ljust(10)}  {'State'.ljust(14)}  {'Time'.ljust(7)}  Last log line"
+    y = y0 + 5
+    detail_rows = 8 if verbose else 0
+    table_h = max(1, h - y - 2 - detail_rows)
+    top = max(0, min(cursor - table_h + 1, total - table_h))
+    try:
+        stdscr.addstr(y, 2, header[: max(0, w - 4)], curses.A_UNDERLINE)
+    except curses.error:
+        pass
+    for i, r in enumerate(rows[top: top + table_h]):
+        ri = top + i
+        t = (r["t_end"] or now) - r["t_submit"] if r["t_submit"] else 0
+        last = r["note"]
+        if r["jobid"] and r["state"] not in ("SUBMITTED", "PENDING"):
+            last = r["err"].last(w=w) or r["out"].last(w=w)
+        line = f"{r['name'].ljust(name_w)}  {str(r['jobid'] or '-').ljust(10)}  {r['state'][:14].ljust(14)}  {_fmt_dt(t).ljust(7)}  {last}"
+        attr = err_attr if (r["done"] and r["state"] != "COMPLETED") else 0
+        if ri == cursor:
+            attr |= curses.A_REVERSE
+        try: stdscr.addstr(y + 1 + i, 2, line[: max(0, w - 4)], attr)
+        except curses.error: pass
+    if verbose and rows:
+        r = rows[cursor]
+        yy = y + 2 + min(table_h, total)
+        try:
+            stdscr.addstr(yy, 2, f"── {r['name']} stderr / stdout ", hint_attr)
+            for ln in r["err"].tail(n=3, w=w):
+                yy += 1
+                if yy >= h - 1: break
+                stdscr.addstr(yy, 2, ln, err_attr)
+            for ln in r["out"].tail(n=4, w=w):
+                yy += 1
+                if yy >= h - 1: break
+                stdscr.addstr(yy, 2, ln)
+        except curses.error:
+            pass
+    end_frame(stdscr)
+
+def _job_row(name, jobname, jobid=None):
+    outp, errp = slurm_log_paths(jobname)
+    return {"name": name, "jobid": jobid, "state": "SUBMITTED" if jobid else "WAITING", "done": False,
+            "t_submit": time.time() if jobid else None, "t_end": None, "out": LogFollower(outp, max_lines=50), "err": LogFollower(errp, max_lines=50), "note": ""}
+
+def advance_jobs(rows, max_inflight=0, submit=None, submit_per_tick=8):
+    # One tick of the pipeline: submit WAITING rows while under max_inflight,
+    # then refresh states of live jobs. Shared by the dashboard and the CLI.
+    if submit is not None:
+        inflight = sum(1 for r in rows if r["jobid"] and not r["done"])
+        submitted_now = 0
+        for r in rows:
+            if submitted_now >= submit_per_tick or (max_inflight > 0 and inflight >= max_inflight):
+                break
+            if r["state"] != "WAITING":
+                continue
+            submitted_now += 1
+            ok, jobid, msg = submit(r["name"])
+            r["t_submit"] = time.time()
+            if ok:
+                r["jobid"], r["state"] = jobid, "SUBMITTED"
+                inflight += 1
+            else:
+                r["state"], r["done"], r["t_end"], r["note"] = "SUBMIT_FAILED", True, time.time(), msg.splitlines()[-1] if msg else ""
+                r["out"].finish(); r["err"].finish()
+    get_cache().track(r["jobid"] for r in rows if r["jobid"] and not r["done"])
+    for r in rows:
+        if not r["jobid"] or r["done"]:
+            continue
+        state = slurm_state(r["jobid"]) or "SUBMITTED"
+        r["state"] = state
+        if is_terminal(state):
+            r["done"], r["t_end"] = True, time.time()
+            # Finished rows keep their last lines but not an open file each
+            r["out"].finish(); r["err"].finish()
+
+def track_jobs_progress(stdscr, rows, hint_attr, err_attr, max_inflight=0, submit=None, title="Pipelined submit…"):
+    t_start = time.time()
+    cursor = 0
+    verbose = True
+    stdscr.nodelay(True)
+    try:
+        while True:
+            try:
+                ch = stdscr.getch()
+                if ch in (27, ord('q')):
+                    live = [r["jobid"] for r in rows if r["jobid"] and not r["done"]]
+                    never = sum(1 for r in rows if r["state"] == "WAITING")
+                    if live:
+                        _run(["scancel"] + live)
+                    return False, f"Cancelled ({len(live)} job(s) scancelled, {never} never submitted)"
+                elif ch in (curses.KEY_UP, ord('k')): cursor = max(0, cursor - 1)
+                elif ch in (curses.KEY_DOWN, ord('j')): cursor = min(len(rows) - 1, cursor + 1)
+                elif ch in (ord('v'), ord('V')): verbose = not verbose
+            except curses.error:
+                pass
+            advance_jobs(rows, max_inflight=max_inflight, submit=submit)
+            draw_dashboard(stdscr, 2, rows, cursor, t_start, max_inflight, verbose, hint_attr, err_attr, title=title)
+            if all(r["done"] for r in rows):
+                break
+            time.sleep(0.5)
+    finally:
+        stdscr.nodelay(False)
+        for r in rows:
+            r["out"].close(); r["err"].close()
+    total_dt = int(time.time() - t_start)
+    failed = [r["name"] for r in rows if r["state"] != "COMPLETED"]
+    if failed:
+        return False, f"{len(rows) - len(failed)}/{len(rows)} completed in {total_dt//60}m {total_dt%60}s • not completed: " + ", ".join(failed)
+    return True, f"All {len(rows)} jobs completed in {total_dt//60}m {total_dt%60}s"
+
+def run_slurm_submit_pipelined_progress(stdscr, selections, conf_path, script_path, hint_attr, err_attr, slurm_override=False, max_inflight=0):
+    if not selections: return False, "Selection is empty"
+    if not os.path.isfile(script_path): return False, f"Missing {script_path}"
+    if not os.path.isfile(conf_path): return False, f"Missing {conf_path}"
+    rows = [_job_row(name, f"IMPACT_{name}") for name in selections]
+    submit = lambda name: submit_one_slurm(name, conf_path, script_path, slurm_override)
+    return track_jobs_progress(stdscr, rows, hint_attr, err_attr, max_inflight=max_inflight, submit=submit)
+
+def submit_array_slurm(selections, conf_path, script_path, slurm_override=False, max_inflight=0) -> Tuple[bool, Optional[str], str]:
+    with tempfile.NamedTemporaryFile("w", delete=False, prefix="impact_array_", suffix=".sel") as fsel:
+        for n in selections:
+            fsel.write(n + "\n")
+        sel_path = fsel.name
+    cmd = [script_path, "--slurm", "--array"] + (["--force"] if slurm_override else [])
+    if max_inflight > 0:
+        cmd += ["--max-inflight", str(max_inflight)]
+    cmd += ["--conf", conf_path, sel_path]
+    res = subprocess.run(cmd, text=True, capture_output=True)
+    try: os.unlink(sel_path)
+    except Exception: pass
+    if res.returncode != 0:
+        msg = (res.stderr or res.stdout or "").strip()
+        return False, None, msg[-300:]
+    jobid = parse_jobid_from_sbatch(res.stdout or "")
+    if not jobid:
+        return False, None, "could not parse job id"
+    return True, jobid, f"Submitted array {jobid}"
+
+def run_slurm_submit_array_progress(stdscr, selections, conf_path, script_path, hint_attr, err_attr, slurm_override=False, max_inflight=0):
+    if not selections: return False, "Selection is empty"
+    if not os.path.isfile(script_path): return False, f"Missing {script_path}"
+    if not os.path.isfile(conf_path): return False, f"Missing {conf_path}"
+    ok, jobid, msg = submit_array_slurm(selections, conf_path, script_path, slurm_override, max_inflight)
+    if not ok:
+        return False, f"Array submit failed: {msg}"
+    # Task i of the array runs the i-th manifest entry; the script keeps selection order.
+    rows = [_job_row(name, array_log_name(jobid, i), jobid=f"{jobid}_{i}") for i, name in enumerate(selections, 1)]
+    return track_jobs_progress(stdscr, rows, hint_attr, err_attr, max_inflight=max_inflight, title=f"Job array {jobid}…")
+
+def run_slurm_submit_all_progress(*args, mode="pipelined", **kwargs):
+    if mode == "sequential":
+        kwargs.pop("max_inflight", None)
+        return run_slurm_submit_sequential_progress(*args, **kwargs)
+    if mode == "array":
+        return run_slurm_submit_array_progress(*args, **kwargs)
+    return run_slurm_submit_pipelined_progress(*args, **kwargs)
+
+def slurm_submit_options(slurm_cfg):
+    mode = (slurm_cfg.get("SLURM_SUBMIT_MODE") or "pipelined").strip().lower()
+    try:
+        max_inflight = max(0, int(slurm_cfg.get("SLURM_MAX_INFLIGHT") or 0))
+    except ValueError:
+        max_inflight = 0
+    return mode, max_inflight
 
 def run_setup_pdb(stdscr, inherited_hint_attr=None):
     pdb_dir, pdb_proc_dir, slurm_cfg, has_slurm, conf_path = read_config()
@@ -520,7 +839,7 @@ def run_setup_pdb(stdscr, inherited_hint_attr=None):
     selection = set()
     focus = "menu"
     menu_cursor = 0
-    pdb_cursor = 0
+    plist = VirtualList()
     slurm_override = False
     def skip_disabled(idx, direction, total_opts):
         if has_slurm or slurm_override: return idx
@@ -529,33 +848,39 @@ def run_setup_pdb(stdscr, inherited_hint_attr=None):
     while True:
         pdbs = list_pdbs(pdb_dir)
         processed = list_processed(pdb_proc_dir)
-        if pdb_cursor >= len(pdbs):
-            pdb_cursor = max(0, len(pdbs) - 1)
-        draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, err_attr=err_attr, slurm_override=slurm_override)
+        plist.set_items(pdbs)
+        def redraw(msg="", msg_attr=0):
+            return draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, plist, processed, selection, focus, menu_cursor, has_slurm, slurm_cfg, msg, msg_attr, err_attr, slurm_override=slurm_override)[0]
+        menu_y = redraw()
         k = stdscr.getch()
         choice = None
         if k in (9, curses.KEY_BTAB):
             focus = "pdb" if focus == "menu" else "menu"
+        elif k == FILTER_KEY:
+            focus = "pdb"
+            plist.edit_filter(stdscr, redraw, LIST_Y - 1)
+        elif focus == "pdb" and k in (curses.KEY_DOWN, ord('j')) and plist.at_last_row():
+            focus = "menu"
+        elif focus == "pdb" and plist.handle_key(k):
+            pass
         elif k in (curses.KEY_UP, ord('k')):
             focus = "menu"; menu_cursor = (menu_cursor - 1) % 8; menu_cursor = skip_disabled(menu_cursor, -1, 8)
         elif k in (curses.KEY_DOWN, ord('j')):
             focus = "menu"; menu_cursor = (menu_cursor + 1) % 8; menu_cursor = skip_disabled(menu_cursor, +1, 8)
-        elif k in (curses.KEY_LEFT, ord('h')):
-            if pdbs: focus = "pdb"; pdb_cursor = max(0, pdb_cursor - 1)
-        elif k in (curses.KEY_RIGHT, ord('l')):
-            if pdbs: focus = "pdb"; pdb_cursor = min(len(pdbs) - 1, pdb_cursor + 1)
+        elif k in (curses.KEY_LEFT, ord('h'), curses.KEY_RIGHT, ord('l'), curses.KEY_PPAGE, curses.KEY_NPAGE):
+            if pdbs: focus = "pdb"; plist.handle_key(k)
         elif k in (ord('b'), ord('B')):
             slurm_override = not slurm_override
         elif k in (10, 13, curses.KEY_ENTER):
             if focus == "menu":
                 if (not has_slurm) and (menu_cursor == 6) and (not slurm_override):
-                    draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, "SLURM not configured. Press B to force submission anyway.", err_attr, err_attr, slurm_override=slurm_override)
+                    redraw("SLURM not configured. Press B to force submission anyway.", err_attr)
                     stdscr.getch()
                 else:
                     choice = menu_cursor
             else:
-                if pdbs:
-                    name = pdbs[pdb_cursor]
+                name = plist.current()
+                if name:
                     if name in selection: selection.discard(name)
                     else: selection.add(name)
         elif k in (ord('0'),):
@@ -564,7 +889,7 @@ def run_setup_pdb(stdscr, inherited_hint_attr=None):
             focus = "menu"
             desired = int(chr(k)) - 1
             if (not has_slurm) and (desired == 6) and (not slurm_override):
-                draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, "SLURM not configured. Press B to force submission anyway.", err_attr, err_attr, slurm_override=slurm_override)
+                redraw("SLURM not configured. Press B to force submission anyway.", err_attr)
                 stdscr.getch()
             else:
                 choice = desired
@@ -572,17 +897,19 @@ def run_setup_pdb(stdscr, inherited_hint_attr=None):
             focus = "menu"; choice = 7
         if choice is None:
             continue
+        # With a filter active, the bulk adds only take the filtered names
         if choice == 0:
-            nonprocessed = [t for t in pdbs if t not in processed]
+            nonprocessed = [t for t in plist.view if t not in processed]
             if not nonprocessed:
-                draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, "All available are already processed", err_attr, err_attr, slurm_override=slurm_override)
+                redraw("All available are already processed", err_attr)
                 stdscr.getch()
             else:
                 selection.update(nonprocessed)
         elif choice == 1:
-            selection = set(pdbs)
+            if plist.filtered(): selection.update(plist.view)
+            else: selection = set(pdbs)
         elif choice == 2:
-            y_in = compute_input_y(stdscr, pdbs, processed, selection)
+            y_in = compute_input_y(stdscr, menu_y)
             s = prompt(stdscr, EXAMPLES_ADD, hint_attr, y_start=y_in)
             if s:
                 toks = tokens_from(s)
@@ -590,10 +917,10 @@ def run_setup_pdb(stdscr, inherited_hint_attr=None):
                 valid = [t for t in toks if t in pdbs]
                 if valid: selection.update(valid)
                 if invalid:
-                    draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, "Invalid: " + ", ".join(invalid), err_attr, err_attr, slurm_override=slurm_override)
+                    redraw("Invalid: " + ", ".join(invalid), err_attr)
                     stdscr.getch()
         elif choice == 3:
-            y_in = compute_input_y(stdscr, pdbs, processed, selection)
+            y_in = compute_input_y(stdscr, menu_y)
             s = prompt(stdscr, EXAMPLES_REMOVE, hint_attr, y_start=y_in)
             if s:
                 toks = tokens_from(s)
@@ -605,19 +932,26 @@ def run_setup_pdb(stdscr, inherited_hint_attr=None):
                 if not_in_list: msgs.append("Not found: " + ", ".join(not_in_list))
                 if not_selected: msgs.append("Not in selection: " + ", ".join(not_selected))
                 if msgs:
-                    draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, " | ".join(msgs), err_attr, err_attr, slurm_override=slurm_override)
+                    redraw(" | ".join(msgs), err_attr)
                     stdscr.getch()
         elif choice == 4:
             selection = set()
         elif choice == 5:
             sels = sorted(selection)
-            ok, msg = run_local_with_progress(stdscr, sels, conf_path=conf_path, script_path=SETUP_SH, hint_attr=hint_attr, err_attr=err_attr)
-            draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, msg, 0 if ok else err_attr, err_attr, slurm_override=slurm_override)
+            jobs = local_jobs_from_conf(conf_path)
+            if jobs > 1 and len(sels) > 1:
+                ok, msg = run_local_pool_progress(stdscr, sels, conf_path=conf_path, script_path=SETUP_SH, hint_attr=hint_attr, err_attr=err_attr, jobs=jobs)
+            else:
+                ok, msg = run_local_with_progress(stdscr, sels, conf_path=conf_path, script_path=SETUP_SH, hint_attr=hint_attr, err_attr=err_attr)
+            get_project_index().invalidate()
+            redraw(msg, 0 if ok else err_attr)
             stdscr.getch()
         elif choice == 6:
             sels = sorted(selection)
-            ok, msg = run_slurm_submit_all_progress(stdscr, sels, conf_path=conf_path, script_path=SETUP_SH, hint_attr=hint_attr, err_attr=err_attr, slurm_override=slurm_override)
-            draw(stdscr, SUBTITLE, hint_attr, pdb_dir, pdb_proc_dir, pdbs, processed, selection, pdb_cursor, focus, menu_cursor, has_slurm, slurm_cfg, msg, 0 if ok else err_attr, err_attr, slurm_override=slurm_override)
+            mode, max_inflight = slurm_submit_options(slurm_cfg)
+            ok, msg = run_slurm_submit_all_progress(stdscr, sels, conf_path=conf_path, script_path=SETUP_SH, hint_attr=hint_attr, err_attr=err_attr, slurm_override=slurm_override, mode=mode, max_inflight=max_inflight)
+            get_project_index().invalidate()
+            redraw(msg, 0 if ok else err_attr)
             stdscr.getch()
         elif choice == 7:
             return
@@ -5,6 +5,8 @@ MODE="local"
 CONF_PATH="./IMPACT.conf"
 SELECTION_FILE=""
 FORCE=0
+ARRAY=0
+MAX_INFLIGHT=""
 
 while [[ $# -gt 0 ]]; do
   case "${1}" in
@@ -12,6 +14,8 @@ while [[ $# -gt 0 ]]; do
     --local) MODE="local"; shift ;;
     --conf)  CONF_PATH="${2:-./IMPACT.conf}"; shift 2 ;;
     --force) FORCE=1; shift ;;
+    --array) ARRAY=1; shift ;;
+    --max-inflight) MAX_INFLIGHT="${2:-}"; shift 2 ;;
     *)       SELECTION_FILE="${1}"; shift ;;
   esac
 done
@@ -25,21 +29,10 @@ fi
 conf_abs="$(cd "$(dirname "$CONF_PATH")" && pwd)/$(basename "$CONF_PATH")"
 conf_dir="$(dirname "$conf_abs")"
 
-get_conf() {
-  awk -v k="$1" -F'=' '
-    $0 ~ "^[[:space:]]*"k"[[:space:]]*=" {
-      sub(/^[[:space:]]*[^=]+=[[:space:]]*/,"",$0);
-      gsub(/^["'"'"']|["'"'"']$/,"",$0);
-      gsub(/^[[:space:]]+|[[:space:]]+$/,"",$0);
-      print $0; exit
-    }' "$conf_abs"
-}
-
-PDB_DIR_REL="$(get_conf 'PDB_DIR')"
-PDB_PROC_DIR_REL="$(get_conf 'PDB_PROC_DIR')"
-SLURM_ACCOUNT="$(get_conf 'SLURM_ACCOUNT')"
-SLURM_PARTITION="$(get_conf 'SLURM_PARTITION')"
-SLURM_CMD="$(get_conf 'SLURM_CMD')"
+source "$(dirname "${BASH_SOURCE[0]}")/impact_conf_env.sh"
+SLURM_ACCOUNT="${IMPACT_SLURM_ACCOUNT:-}"
+SLURM_PARTITION="${IMPACT_SLURM_PARTITION:-}"
+SLURM_CMD="${IMPACT_SLURM_CMD:-}"
 
 abspath() {
   case "$1" in
@@ -48,8 +41,8 @@ abspath() {
   esac
 }
 
-pdb_dir="$(abspath "${PDB_DIR_REL:-.}")"
-pdb_proc_dir="$(abspath "${PDB_PROC_DIR_REL:-.}")"
+pdb_dir="$IMPACT_PDB_DIR"
+pdb_proc_dir="$IMPACT_PDB_PROC_DIR"
 gen_sys_dir="$(abspath "NAMD/gen_system.tcl")"
 aux_dir="$(abspath "aux")"
 log_dir="$(abspath "log")"
@@ -123,6 +116,49 @@ vmd -dispdev text -e "\${aux_dir}/init_setup.tcl" -args "\${base_dir}" "\${gen_s
 EOF
 }
 
+submit_array() {
+  local manifest="${log_dir}/IMPACT_array_$(date +%Y%m%d-%H%M%S)_$$.txt"
+  local n="${#selections[@]}"
+  local throttle=""
+  if [[ -n "$MAX_INFLIGHT" && "$MAX_INFLIGHT" -gt 0 ]]; then
+    throttle="%${MAX_INFLIGHT}"
+  fi
+  printf "%s\n" "${selections[@]}" > "$manifest"
+  echo "Manifest: $manifest"
+  "$SLURM_CMD" <<EOF
+#!/bin/bash
+#SBATCH --job-name=IMPACT_array
+#SBATCH --array=1-${n}${throttle}
+#SBATCH --time=00:00:30
+#SBATCH --partition=${SLURM_PARTITION:-caslake}
+#SBATCH --account=${SLURM_ACCOUNT:-}
+#SBATCH --ntasks=1
+#SBATCH --cpus-per-task=24
+#SBATCH --output=${log_dir}/%x_%A_%a.out
+#SBATCH --error=${log_dir}/%x_%A_%a.err
+set -euo pipefail
+module load vmd || true
+pdb_dir="${pdb_dir}"
+pdb_proc_dir="${pdb_proc_dir}"
+gen_sys_dir="${gen_sys_dir}"
+aux_dir="${aux_dir}"
+name="\$(sed -n "\${SLURM_ARRAY_TASK_ID}p" "${manifest}")"
+if [[ -z "\${name}" ]]; then
+  echo "No manifest entry for task \${SLURM_ARRAY_TASK_ID}" >&2
+  exit 1
+fi
+base_dir="\${pdb_proc_dir}/\${name}"
+mkdir -p "\${base_dir}"
+cp -f "\${pdb_dir}/\${name}.pdb" "\${base_dir}/"
+vmd -dispdev text -e "\${aux_dir}/init_setup.tcl" -args "\${base_dir}" "\${gen_sys_dir}" "\${name}" "1"
+EOF
+}
+
+if [[ $ARRAY -eq 1 ]]; then
+  submit_array
+  exit 0
+fi
+
 for name in "${selections[@]}"; do
   submit_job "$name"
 done
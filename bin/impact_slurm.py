@@ -0,0 +1,137 @@
+# bin/impact_slurm.py
+# Shared SLURM state cache: one squeue (and, for finished jobs, one sacct)
+# call per TTL window serves every menu instead of per-job forks.
+import os
+import re
+import time
+import getpass
+import threading
+import subprocess
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TTL = 5.0
+TERMINAL_STATES = {"COMPLETED", "FAILED", "CANCELLED", "TIMEOUT", "OUT_OF_MEMORY", "PREEMPTED", "BOOT_FAIL", "NODE_FAIL", "DEADLINE"}
+GONE = "UNKNOWN_GONE"
+SQUEUE_RETRIES = 3          # failed refreshes in a row before jobs count as gone
+
+def _run(cmd: List[str], timeout: float = 10) -> Tuple[int, str, str]:
+    try:
+        res = subprocess.run(cmd, text=True, capture_output=True, timeout=timeout)
+        return res.returncode, res.stdout or "", res.stderr or ""
+    except FileNotFoundError:
+        return 127, "", f"{cmd[0]} not found"
+    except Exception as e:
+        return 1, "", str(e)
+
+def _user():
+    try:
+        return os.environ.get("USER") or getpass.getuser()
+    except Exception:
+        return ""
+
+def is_terminal(state: Optional[str]) -> bool:
+    if not state: return False
+    u = state.upper()
+    return u in TERMINAL_STATES or u == GONE
+
+def expand_jobid(jid: str) -> List[str]:
+    # squeue folds pending array tasks as 123_[4-10%2] or 123_[1,3,5-7]
+    m = re.match(r"^(\d+)_\[([^\]]+)\]$", jid)
+    if not m:
+        return [jid]
+    base, spec = m.group(1), m.group(2).split("%", 1)[0]
+    out = []
+    for part in spec.split(","):
+        if "-" in part:
+            a, b = part.split("-", 1)
+            try:
+                out.extend(f"{base}_{i}" for i in range(int(a), int(b) + 1))
+            except ValueError:
+                continue
+        elif part.strip():
+            out.append(f"{base}_{part.strip()}")
+    return out
+
+class SlurmStateCache:
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tracked = set()
+        self._by_id: Dict[str, Tuple[str, str]] = {}
+        self._finished: Dict[str, Tuple[str, str]] = {}
+        self._fetched_at = 0.0
+        self._squeue_ok = False
+        self._squeue_fails = 0
+
+    def track(self, jobids: Iterable[str]):
+        with self._lock:
+            new = {str(j) for j in jobids if j and j != "?"} - self._tracked
+            if new:
+                self._tracked |= new
+                self._fetched_at = 0.0
+
+    def refresh(self, force: bool = False):
+        with self._lock:
+            if not force and (time.time() - self._fetched_at) < self.ttl:
+                return
+            by_id = {}
+            rc, out, _ = _run(["squeue", "-h", "-u", _user(), "-o", "%i|%T|%j"])
+            self._squeue_ok = (rc == 0)
+            # squeue missing (127) or failing repeatedly: stop waiting on it
+            self._squeue_fails = 0 if rc == 0 else (SQUEUE_RETRIES if rc == 127 else self._squeue_fails + 1)
+            if rc == 0:
+                for ln in out.splitlines():
+                    parts = ln.strip().split("|", 2)
+                    if len(parts) != 3:
+                        continue
+                    jid, state, name = (p.strip() for p in parts)
+                    for j in expand_jobid(jid):
+                        by_id[j] = (state, name)
+            missing = sorted(j for j in self._tracked if j not in by_id and j not in self._finished)
+            if missing:
+                rc2, out2, err2 = _run(["sacct", "-n", "-P", "-X", "-j", ",".join(missing), "--format=JobID,State,JobName"])
+                if rc2 == 0 and "disabled" not in (out2 + err2).lower():
+                    for ln in out2.splitlines():
+                        parts = ln.strip().split("|", 2)
+                        if len(parts) < 2:
+                            continue
+                        jid = parts[0].strip()
+                        state = (parts[1].split() or [""])[0]
+                        name = parts[2].strip() if len(parts) > 2 else ""
+                        for j in expand_jobid(jid):
+                            if j in missing and is_terminal(state):
+                                self._finished[j] = (state, name)
+                            elif j in missing:
+                                by_id[j] = (state, name)
+            self._by_id = by_id
+            self._fetched_at = time.time()
+
+    def state(self, jobid: str) -> Optional[str]:
+        jobid = str(jobid)
+        self.track([jobid])
+        self.refresh()
+        with self._lock:
+            if jobid in self._by_id:
+                return self._by_id[jobid][0]
+            if jobid in self._finished:
+                return self._finished[jobid][0]
+            # None only while a squeue failure may still be transient
+            return GONE if self._squeue_ok or self._squeue_fails >= SQUEUE_RETRIES else None
+
+    def jobs_by_name(self) -> Dict[str, Tuple[str, str]]:
+        self.refresh()
+        with self._lock:
+            return {name: (jid, state) for jid, (state, name) in self._by_id.items()}
+
+    def jobs_matching(self, needle: str) -> List[Tuple[str, str]]:
+        self.refresh()
+        with self._lock:
+            return [(jid, name) for jid, (_state, name) in self._by_id.items() if needle in name]
+
+_CACHE: Optional[SlurmStateCache] = None
+
+def get_cache() -> SlurmStateCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = SlurmStateCache()
+    return _CACHE
@@ -0,0 +1,132 @@
+# bin/impact_stage_index.py
+# On-disk index of which stage logs have finished. Each log is keyed by
+# path and remembered with (size, mtime, inode, offset) and a hash of the
+# bytes before that size: a finished log is never read again, a growing one
+# is scanned only from where the last scan stopped, and one rewritten in
+# place (a rerun with >, same inode) is scanned as a new log.
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+DEFAULT_INDEX = os.path.join(ROOT_DIR, "log", "stage_index.json")
+
+DONE_RE = re.compile(rb"(?i:End of program)|\bWall[Cc]lock\b")
+FIRST_SCAN = 1_000_000
+CHUNK = 1 << 20
+OVERLAP = 64  # re-read this much so a marker split across scans still matches
+SIG_BYTES = 4096
+VERSION = 2
+
+class StageIndex:
+    def __init__(self, path: str = DEFAULT_INDEX):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == VERSION:
+                self._entries = dict(data.get("logs") or {})
+        except Exception:
+            self._entries = {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": VERSION, "logs": self._entries}
+            d = os.path.dirname(self.path)
+            tmp = None
+            try:
+                os.makedirs(d, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".stage_index.", dir=d)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except Exception:
+                if tmp:
+                    try: os.unlink(tmp)
+                    except Exception: pass
+
+    def _scan(self, log_path, start) -> Optional[int]:
+        # Returns the offset scanned up to, or None if a marker was found
+        with open(log_path, "rb") as f:
+            f.seek(start)
+            carry = b""
+            pos = start
+            while True:
+                buf = f.read(CHUNK)
+                if not buf:
+                    return pos
+                pos += len(buf)
+                if DONE_RE.search(carry + buf):
+                    return None
+                carry = buf[-OVERLAP:]
+
+    def _signature(self, log_path, end) -> str:
+        # Hash of the SIG_BYTES before offset end
+        with open(log_path, "rb") as f:
+            f.seek(max(0, end - SIG_BYTES))
+            return hashlib.sha1(f.read(min(end, SIG_BYTES))).hexdigest()[:16]
+
+    def is_done(self, log_path: str) -> bool:
+        key = os.path.abspath(log_path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self._dirty = True
+            return False
+        with self._lock:
+            e = self._entries.get(key)
+        same_file = e is not None and e.get("ino") == st.st_ino and st.st_size >= e.get("size", 0)
+        if same_file and e.get("size") == st.st_size and e.get("mtime") == st.st_mtime_ns:
+            return bool(e.get("done"))
+        if same_file:
+            # Changed: only an append if the bytes we saw are still there
+            try:
+                same_file = self._signature(key, e.get("size", 0)) == e.get("sig")
+            except OSError:
+                return False
+        if same_file and e.get("done"):
+            # Appended after the marker: still finished
+            start = None
+        elif same_file:
+            start = max(0, e.get("offset", 0) - OVERLAP)
+        else:
+            start = max(0, st.st_size - FIRST_SCAN)
+        try:
+            if start is None:
+                offset, done = st.st_size, True
+            else:
+                end = self._scan(key, start)
+                done = end is None
+                offset = st.st_size if done else end
+            sig = self._signature(key, st.st_size)
+        except OSError:
+            return False
+        with self._lock:
+            self._entries[key] = {"size": st.st_size, "mtime": st.st_mtime_ns, "ino": st.st_ino, "offset": offset,
+                                  "done": done, "sig": sig}
+            self._dirty = True
+        return done
+
+_INDEX: Optional[StageIndex] = None
+
+def get_index() -> StageIndex:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = StageIndex()
+    return _INDEX
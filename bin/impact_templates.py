@@ -0,0 +1,200 @@
+# bin/impact_templates.py
+# In-process renderer for the gen_scripts/ templates. Each template is parsed
+# once (and re-read only if its mtime changes); every output file is written
+# once, atomically. Mirrors gen_namd_scripts.sh / gen_gamd_scripts.sh:
+#   *.conf  TCR_## -> prefix, PBC block spliced after "Periodic boundary
+#           Conditions", ../../param -> param dir
+#   *.sh    TCR_## -> prefix, CONF_FILE -> <prefix>-<conf name>
+import os
+import re
+import sys
+import argparse
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+TEMPLATE_ROOT = os.path.join(ROOT_DIR, "gen_scripts")
+PARAM_DIR = os.path.join(ROOT_DIR, "param")
+
+PLACEHOLDER = "TCR_##"
+CONF_PLACEHOLDER = "CONF_FILE"
+PBC_MARKER = "Periodic boundary Conditions"
+PARAM_RE = re.compile(r"../../param")  # sed pattern in the original scripts; dots are wildcards there too
+
+# (stage dir, conf template, job template)
+NAMD_STAGES = [
+    ("mini", "mini.conf", "mini.sh"),
+    ("equil", "heatup-equil.conf", "equil.sh"),
+    ("NPT1", "npt1.conf", "NPT1.sh"),
+    ("NPT2", "npt2.conf", "NPT2.sh"),
+]
+
+def _umask():
+    m = os.umask(0)
+    os.umask(m)
+    return m
+
+_UMASK = _umask()
+
+class Template:
+    def __init__(self, path: str):
+        self.path = path
+        st = os.stat(path)
+        self.key = (st.st_mtime_ns, st.st_size)
+        self.mode = st.st_mode & 0o777
+        with open(path, "r", encoding="utf-8", errors="surrogateescape", newline="") as f:
+            self.text = f.read()
+        # Record view for .conf rendering (awk semantics: a trailing newline ends
+        # the last record, it does not start an empty one)
+        self.lines = self.text.split("\n")
+        if self.lines and self.lines[-1] == "":
+            self.lines.pop()
+        self.markers = {i for i, ln in enumerate(self.lines) if PBC_MARKER in ln}
+        self.pbc_at = min(self.markers) if self.markers else None
+
+    def render_conf(self, prefix: str, pbc_lines: List[str], param_dir: str) -> str:
+        out = []
+        for i, ln in enumerate(self.lines):
+            if i in self.markers:
+                # awk prints marker lines untouched; the block goes after the first only
+                out.append(ln)
+                if i == self.pbc_at:
+                    out.extend(pbc_lines)
+            else:
+                out.append(ln.replace(PLACEHOLDER, prefix))
+        text = "\n".join(out) + "\n" if out else ""
+        return PARAM_RE.sub(lambda _m: param_dir, text)
+
+    def render_job(self, prefix: str, conf_name: str) -> str:
+        return self.text.replace(PLACEHOLDER, prefix).replace(CONF_PLACEHOLDER, conf_name)
+
+_CACHE: Dict[str, Template] = {}
+
+def get_template(path: str) -> Optional[Template]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    t = _CACHE.get(path)
+    if t is None or t.key != (st.st_mtime_ns, st.st_size):
+        t = Template(path)
+        _CACHE[path] = t
+    return t
+
+def read_pbc(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8", errors="surrogateescape", newline="") as f:
+        lines = f.read().split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+def write_once(path: str, text: str, mode: int = 0o666):
+    d = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp.", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape", newline="") as f:
+            f.write(text)
+        os.chmod(tmp, mode & ~_UMASK)
+        os.replace(tmp, path)
+    except Exception:
+        try: os.unlink(tmp)
+        except Exception: pass
+        raise
+
+def generate_namd(dest_dir: str, prefix: str, template_dir: str = None, param_dir: str = PARAM_DIR,
+                  log: Callable[[str], None] = print) -> bool:
+    template_dir = template_dir or os.path.join(TEMPLATE_ROOT, "namd")
+    pbc_file = os.path.join(dest_dir, f"{prefix}_pbc.txt")
+    if not os.path.isfile(pbc_file):
+        log(f"Error: Text chunk file '{pbc_file}' not found!")
+        return False
+    pbc = read_pbc(pbc_file)
+    for stage, _conf, _sh in NAMD_STAGES:
+        os.makedirs(os.path.join(dest_dir, stage), exist_ok=True)
+    for stage, conf_name, sh_name in NAMD_STAGES:
+        conf_src = os.path.join(template_dir, conf_name)
+        new_conf = f"{prefix}-{conf_name}"
+        t = get_template(conf_src)
+        if t is not None:
+            write_once(os.path.join(dest_dir, stage, new_conf), t.render_conf(prefix, pbc, param_dir))
+            log(f"Processed {conf_src} into {stage}/{new_conf}")
+        else:
+            log(f"Configuration file '{conf_src}' not found, skipping...")
+        sh_src = os.path.join(template_dir, sh_name)
+        t = get_template(sh_src)
+        if t is not None:
+            new_sh = f"{stage}/{prefix}-{sh_name}"
+            write_once(os.path.join(dest_dir, new_sh), t.render_job(prefix, new_conf), t.mode)
+            log(f"Processed {sh_src} into {new_sh}")
+        else:
+            log(f"Job submission file '{sh_src}' not found, skipping...")
+    return True
+
+def render_gamd(run_dir: str, prefix: str, template_dir: str = None,
+                param_dir: str = PARAM_DIR) -> Optional[Dict[str, Tuple[str, int]]]:
+    # gamd/ file name -> (text, mode), nothing written; None if the PBC block is missing
+    template_dir = template_dir or os.path.join(TEMPLATE_ROOT, "gamd")
+    pbc_file = os.path.join(run_dir, f"{prefix}_pbc.txt")
+    if not os.path.isfile(pbc_file):
+        return None
+    pbc = read_pbc(pbc_file)
+    try:
+        names = sorted(os.listdir(template_dir))
+    except OSError:
+        names = []
+    out = {}
+    for fn in names:
+        if fn.endswith(".conf"):
+            t = get_template(os.path.join(template_dir, fn))
+            out[f"{prefix}-{fn}"] = (t.render_conf(prefix, pbc, param_dir), 0o666)
+    for fn in names:
+        if fn.endswith(".sh"):
+            t = get_template(os.path.join(template_dir, fn))
+            out[f"{prefix}-{fn}"] = (t.render_job(prefix, f"{prefix}-{fn[:-3]}.conf"), t.mode)
+    return out
+
+def generate_gamd(run_dir: str, prefix: str, template_dir: str = None, param_dir: str = PARAM_DIR,
+                  log: Callable[[str], None] = print) -> bool:
+    files = render_gamd(run_dir, prefix, template_dir, param_dir)
+    if files is None:
+        log(f"Error: Text chunk file '{os.path.join(run_dir, prefix + '_pbc.txt')}' not found!")
+        return False
+    gamd_dir = os.path.join(run_dir, "gamd")
+    os.makedirs(gamd_dir, exist_ok=True)
+    for fn, (text, mode) in files.items():
+        write_once(os.path.join(gamd_dir, fn), text, mode)
+        log(f"Processed gamd/{fn}")
+    return True
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Render NAMD job files from gen_scripts templates")
+    ap.add_argument("kind", choices=["namd", "gamd"])
+    ap.add_argument("--root", required=True, help="NAMD_PROC_DIR (one run dir per <prefix>_<trial>)")
+    ap.add_argument("--trial", required=True)
+    ap.add_argument("--templates", default=None)
+    ap.add_argument("--param-dir", default=PARAM_DIR)
+    ap.add_argument("prefixes", nargs="+")
+    args = ap.parse_args(argv)
+    gen = generate_namd if args.kind == "namd" else generate_gamd
+    failed = []
+    for prefix in args.prefixes:
+        combined = f"{prefix}_{args.trial}"
+        dest = os.path.join(args.root, combined)
+        try:
+            ok = gen(dest, combined, args.templates, args.param_dir)
+        except OSError as e:
+            print(f"  [!] {combined}: {e}", file=sys.stderr)
+            ok = False
+        if ok:
+            print(f"  [✓] Generated {args.kind.upper()} job files in {dest}")
+        else:
+            failed.append(combined)
+    sys.stdout.flush()
+    if failed:
+        print("Failed: " + " ".join(failed), file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
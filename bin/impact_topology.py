@@ -0,0 +1,284 @@
+# bin/impact_topology.py
+# PSF / PDB topology as numpy arrays, without VMD:
+#   - atoms are one structured array (segid, resid, resname, name, ...);
+#     PSF adds type, charge, mass and the bond list, PDB adds coordinates
+#     and the CRYST1 box
+#   - parsing is vectorized: the PSF atom block is tokenized once and
+#     reshaped, bonds go through np.fromstring, PDB columns are sliced out
+#     of a fixed-width byte matrix
+#   - the result is cached next to the file as .<file>.<sha1>.npz, so the
+#     next load of the same content is a hash plus an np.load
+# Resids keep their numeric part; a PSF insertion code ("52A") or PDB iCode
+# goes to icode.
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+CACHE_VERSION = 1
+
+PSF_DTYPE = np.dtype([
+    ("segid", "U8"), ("resid", "i4"), ("icode", "U1"), ("resname", "U8"),
+    ("name", "U8"), ("type", "U8"), ("charge", "f4"), ("mass", "f4"),
+])
+PDB_DTYPE = np.dtype([
+    ("segid", "U4"), ("resid", "i4"), ("icode", "U1"), ("resname", "U4"),
+    ("name", "U4"), ("chain", "U1"), ("altloc", "U1"), ("occupancy", "f4"),
+    ("beta", "f4"), ("element", "U2"),
+])
+
+class TopologyError(Exception):
+    pass
+
+class Topology(NamedTuple):
+    path: str
+    atoms: np.ndarray              # PSF_DTYPE or PDB_DTYPE records
+    bonds: np.ndarray              # (nbonds, 2) int32, 0-based atom indices
+    coords: Optional[np.ndarray]   # (natoms, 3) float32 (PDB only)
+    box: Optional[np.ndarray]      # a, b, c from CRYST1 (PDB only)
+
+    def __len__(self):
+        return len(self.atoms)
+
+    def residue_index(self, idx: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        # (residue number per atom, first atom of each residue), counting a
+        # new residue whenever segid/resid/icode changes in file order
+        a = self.atoms if idx is None else self.atoms[idx]
+        change = np.ones(len(a), dtype=bool)
+        if len(a):
+            change[1:] = ((a["segid"][1:] != a["segid"][:-1]) | (a["resid"][1:] != a["resid"][:-1])
+                          | (a["icode"][1:] != a["icode"][:-1]))
+        first = np.flatnonzero(change)
+        return (np.cumsum(change) - 1).astype(np.int32), first if idx is None else np.asarray(idx)[first]
+
+# -------------------- cache --------------------
+
+def _digest(path: str) -> str:
+    h = hashlib.sha1(f"v{CACHE_VERSION}:".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 22), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+def cache_path(path: str, digest: str) -> str:
+    d, base = os.path.split(os.path.abspath(path))
+    return os.path.join(d, f".{base}.{digest}.npz")
+
+def _load_cached(path: str, digest: str) -> Optional[Topology]:
+    try:
+        with np.load(cache_path(path, digest)) as z:
+            coords = z["coords"] if z["coords"].size else None
+            box = z["box"] if z["box"].size else None
+            return Topology(path, z["atoms"], z["bonds"], coords, box)
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _save_cached(topo: Topology, digest: str):
+    out = cache_path(topo.path, digest)
+    d, base = os.path.split(out)
+    stale = re.compile(re.escape(base.rsplit(".", 2)[0]) + r"\.[0-9a-f]{16}\.npz$")
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=".topo.", suffix=".npz", dir=d)
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, atoms=topo.atoms, bonds=topo.bonds,
+                     coords=topo.coords if topo.coords is not None else np.empty(0, np.float32),
+                     box=topo.box if topo.box is not None else np.empty(0, np.float32))
+        os.replace(tmp, out)
+        # Sidecars of earlier versions of the same file
+        for f in os.listdir(d):
+            if f != base and stale.match(f):
+                os.unlink(os.path.join(d, f))
+    except OSError:
+        pass
+
+def _cached(path: str, parse, use_cache: bool) -> Topology:
+    if not use_cache:
+        return parse(path)
+    digest = _digest(path)
+    topo = _load_cached(path, digest)
+    if topo is None:
+        topo = parse(path)
+        _save_cached(topo, digest)
+    return topo
+
+# -------------------- PSF --------------------
+
+_SECTION_RE = re.compile(rb"!(N[A-Z0-9]+)")
+_LETTERS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+def _sections(data: bytes) -> dict:
+    # {"NATOM": (count, body bytes), "NBOND": ...}; a header is a line
+    # "<count> [<count>] !NNAME[: comment]"
+    heads = []
+    for m in _SECTION_RE.finditer(data):
+        start = data.rfind(b"\n", 0, m.start()) + 1
+        nums = data[start:m.start()].split()
+        if not nums or not nums[0].isdigit():
+            continue
+        end = data.find(b"\n", m.end())
+        heads.append((m.group(1).decode(), int(nums[0]), start, len(data) if end < 0 else end))
+    out = {}
+    for k, (name, count, _start, end) in enumerate(heads):
+        out[name] = (count, data[end:heads[k + 1][2] if k + 1 < len(heads) else len(data)])
+    return out
+
+def _split_resid(raw: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # bytes resids -> (numeric part, insertion code)
+    try:
+        resid = np.char.rstrip(raw, _LETTERS).astype(np.int32)
+        icode = np.char.lstrip(raw, b"-0123456789").astype("U1")
+        return resid, icode
+    except ValueError:
+        pass
+    resid = np.zeros(len(raw), dtype=np.int32)
+    icode = np.full(len(raw), "", dtype="U1")
+    for i, r in enumerate(raw.astype(str)):
+        m = re.match(r"(-?\d+)(\D?)", r)
+        if m:
+            resid[i], icode[i] = int(m.group(1)), m.group(2)
+    return resid, icode
+
+def parse_psf(path: str) -> Topology:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(b"PSF"):
+        raise TopologyError(f"{path}: not a PSF file")
+    secs = _sections(data)
+    if "NATOM" not in secs:
+        raise TopologyError(f"{path}: no !NATOM section")
+    natom, body = secs["NATOM"]
+    tok = body.split()
+    ncol = len(tok) // natom if natom else 0
+    if natom and (ncol < 8 or ncol * natom != len(tok)):
+        # Ragged lines (mixed extra columns): fall back to per-line split
+        rows = body.strip().splitlines()[:natom]
+        if len(rows) < natom:
+            raise TopologyError(f"{path}: truncated atom section")
+        tok = [t for r in rows for t in (r.split() + [b""] * 8)[:8]]
+        ncol = 8
+    cols = np.array(tok).reshape(natom, ncol) if natom else np.empty((0, 8), dtype="S1")
+    atoms = np.empty(natom, dtype=PSF_DTYPE)
+    atoms["segid"] = cols[:, 1].astype("U8")
+    atoms["resid"], atoms["icode"] = _split_resid(cols[:, 2])
+    atoms["resname"] = cols[:, 3].astype("U8")
+    atoms["name"] = cols[:, 4].astype("U8")
+    atoms["type"] = cols[:, 5].astype("U8")
+    try:
+        atoms["charge"] = cols[:, 6].astype(np.float32)
+        atoms["mass"] = cols[:, 7].astype(np.float32)
+    except ValueError as e:
+        raise TopologyError(f"{path}: bad charge/mass column ({e})")
+    nbond, body = secs.get("NBOND", (0, b""))
+    ids = np.fromstring(body, dtype=np.int64, sep=" ") if nbond else np.empty(0, np.int64)
+    if len(ids) < 2 * nbond:
+        raise TopologyError(f"{path}: truncated bond section")
+    bonds = (ids[: 2 * nbond].reshape(-1, 2) - 1).astype(np.int32)
+    return Topology(path, atoms, bonds, None, None)
+
+def load_psf(path: str, use_cache: bool = True) -> Topology:
+    return _cached(path, parse_psf, use_cache)
+
+# -------------------- PDB --------------------
+
+def parse_pdb(path: str) -> Topology:
+    with open(path, "rb") as f:
+        data = f.read()
+    box = None
+    lines = []
+    for line in data.splitlines():
+        head = line[:6]
+        if head == b"ATOM  " or head == b"HETATM":
+            lines.append(line[:80].ljust(80))
+        elif head == b"CRYST1" and box is None:
+            try:
+                box = np.array([float(line[6:15]), float(line[15:24]), float(line[24:33])], dtype=np.float32)
+            except ValueError:
+                pass
+        elif head in (b"END   ", b"ENDMDL", b"END"):
+            break
+    if not lines:
+        raise TopologyError(f"{path}: no ATOM/HETATM records")
+    n = len(lines)
+    raw = np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(n, 80)
+
+    def col(a, b, strip=True):
+        c = np.ascontiguousarray(raw[:, a:b]).view(f"S{b - a}").ravel()
+        return np.char.strip(c) if strip else c
+
+    atoms = np.empty(n, dtype=PDB_DTYPE)
+    atoms["name"] = col(12, 16).astype("U4")
+    atoms["altloc"] = col(16, 17).astype("U1")
+    atoms["resname"] = col(17, 21).astype("U4")
+    atoms["chain"] = col(21, 22).astype("U1")
+    atoms["resid"], _ = _split_resid(col(22, 26))
+    atoms["icode"] = col(26, 27).astype("U1")
+    atoms["segid"] = col(72, 76).astype("U4")
+    atoms["element"] = col(76, 78).astype("U2")
+    try:
+        coords = np.stack([col(a, a + 8, False).astype(np.float32) for a in (30, 38, 46)], axis=1)
+    except ValueError as e:
+        raise TopologyError(f"{path}: bad coordinate column ({e})")
+    for fld, a, b in (("occupancy", 54, 60), ("beta", 60, 66)):
+        c = col(a, b)
+        c[c == b""] = b"0"
+        try:
+            atoms[fld] = c.astype(np.float32)
+        except ValueError:
+            atoms[fld] = 0.0
+    return Topology(path, atoms, np.empty((0, 2), np.int32), coords, box)
+
+def load_pdb(path: str, use_cache: bool = True) -> Topology:
+    return _cached(path, parse_pdb, use_cache)
+
+def load(path: str, use_cache: bool = True) -> Topology:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".psf":
+        return load_psf(path, use_cache)
+    if ext in (".pdb", ".ent"):
+        return load_pdb(path, use_cache)
+    raise TopologyError(f"{path}: expected a .psf or .pdb file")
+
+def summary(topo: Topology) -> dict:
+    a = topo.atoms
+    segs, counts = np.unique(a["segid"], return_counts=True)
+    out = {"path": topo.path, "natoms": len(a), "nresidues": int(len(topo.residue_index()[1])),
+           "nbonds": len(topo.bonds), "segments": dict(zip(segs.tolist(), counts.tolist()))}
+    if "mass" in a.dtype.names:
+        out["mass"] = round(float(a["mass"].sum(dtype=np.float64)), 3)
+        out["charge"] = round(float(a["charge"].sum(dtype=np.float64)), 4)
+    if topo.box is not None:
+        out["box"] = [round(float(v), 3) for v in topo.box]
+    return out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Load PSF/PDB topologies (and build their .npz cache)")
+    ap.add_argument("files", nargs="+")
+    ap.add_argument("--no-cache", action="store_true", help="parse without reading or writing the cache")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    rc, out = 0, []
+    for p in args.files:
+        try:
+            out.append(summary(load(p, not args.no_cache)))
+        except (OSError, TopologyError) as e:
+            out.append({"path": p, "error": str(e)})
+            rc = 1
+    if args.json:
+        print(json.dumps(out, indent=2))
+        return rc
+    for d in out:
+        if "error" in d:
+            print(f"{d['path']}: {d['error']}", file=sys.stderr)
+            continue
+        segs = " ".join(f"{k}:{v}" for k, v in d["segments"].items())
+        print(f"{d['path']}: {d['natoms']} atoms, {d['nresidues']} residues, {d['nbonds']} bonds  [{segs}]")
+    return rc
+
+if __name__ == "__main__":
+    sys.exit(main())
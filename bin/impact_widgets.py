@@ -0,0 +1,203 @@
+# bin/impact_widgets.py
+# VirtualList: the system picker shared by Setup PDB, Setup NAMD and Run
+# GaMD. Only the rows inside the window are formatted and drawn, so the cost
+# of a frame depends on the terminal size, not on how many systems exist.
+# Laid out either as a grid of names (draw_grid) or one row per item
+# (draw_table); the window follows the cursor, and "/" opens an incremental
+# filter (substring, or a glob if it contains * ? [).
+import fnmatch
+import curses
+from typing import Callable, List, Optional, Sequence, Tuple
+
+FILTER_KEY = ord('/')
+BACKSPACE_KEYS = (curses.KEY_BACKSPACE, 127, 8)
+
+def _put(stdscr, y, x, s, attr=0):
+    try:
+        stdscr.addstr(y, x, s, attr)
+    except curses.error:
+        pass
+
+class VirtualList:
+    def __init__(self, items: Sequence[str] = ()):
+        self.items: List[str] = []
+        self.view: List[str] = []
+        self.filter = ""
+        self.cursor = 0
+        self.top = 0      # first visible row
+        self.rows = 1     # visible rows at the last draw
+        self.cols = 1     # items per row at the last draw
+        self.longest = 0  # longest item, for stable column widths
+        self.set_items(items)
+
+    # -------------------- data --------------------
+
+    def set_items(self, items: Sequence[str]):
+        items = list(items)
+        if items == self.items:
+            return
+        keep = self.current()
+        self.items = items
+        self.longest = max((len(n) for n in items), default=0)
+        self._refilter(keep)
+
+    def set_filter(self, text: str):
+        if text != self.filter:
+            keep = self.current()
+            self.filter = text
+            self._refilter(keep)
+
+    def _refilter(self, keep=None):
+        f = self.filter.lower()
+        if not f:
+            self.view = self.items
+        elif any(c in f for c in "*?["):
+            self.view = [n for n in self.items if fnmatch.fnmatchcase(n.lower(), f)]
+        else:
+            self.view = [n for n in self.items if f in n.lower()]
+        if keep is not None and keep in self.view:
+            self.cursor = self.view.index(keep)
+        else:
+            self.cursor = max(0, min(self.cursor, len(self.view) - 1))
+        self._scroll(self.rows, self.cols)
+
+    def current(self) -> Optional[str]:
+        return self.view[self.cursor] if self.view else None
+
+    def at_last_row(self) -> bool:
+        return not self.view or self.cursor // self.cols == (len(self.view) - 1) // self.cols
+
+    def filtered(self) -> bool:
+        return bool(self.filter)
+
+    # -------------------- movement --------------------
+
+    def move(self, delta: int):
+        if self.view:
+            self.cursor = max(0, min(len(self.view) - 1, self.cursor + delta))
+
+    def handle_key(self, k) -> bool:
+        # Returns True if the key was a list movement
+        page = max(1, self.rows) * self.cols
+        if k in (curses.KEY_UP, ord('k')):
+            self.move(-self.cols)
+        elif k in (curses.KEY_DOWN, ord('j')):
+            self.move(self.cols)
+        elif k in (curses.KEY_LEFT, ord('h')):
+            self.move(-1)
+        elif k in (curses.KEY_RIGHT, ord('l')):
+            self.move(1)
+        elif k == curses.KEY_PPAGE:
+            self.move(-page)
+        elif k == curses.KEY_NPAGE:
+            self.move(page)
+        elif k in (curses.KEY_HOME, ord('g')):
+            self.cursor = 0
+        elif k in (curses.KEY_END, ord('G')):
+            self.cursor = max(0, len(self.view) - 1)
+        else:
+            return False
+        return True
+
+    def _scroll(self, rows: int, cols: int):
+        self.rows, self.cols = max(1, rows), max(1, cols)
+        total_rows = (len(self.view) + self.cols - 1) // self.cols
+        row = self.cursor // self.cols
+        if row < self.top:
+            self.top = row
+        elif row >= self.top + self.rows:
+            self.top = row - self.rows + 1
+        self.top = max(0, min(self.top, total_rows - self.rows))
+
+    def visible(self) -> List[Tuple[int, str]]:
+        start = self.top * self.cols
+        end = start + self.rows * self.cols
+        return list(enumerate(self.view[start:end], start))
+
+    def position(self) -> str:
+        vis = self.visible()
+        if not vis:
+            return "0 of 0"
+        return f"{vis[0][0] + 1}–{vis[-1][0] + 1} of {len(self.view)}"
+
+    def header(self, label: str) -> str:
+        s = f"{label} ({self.position()}"
+        if self.filter:
+            s += f" • filter: {self.filter} • {len(self.items)} total"
+        return s + ")"
+
+    # -------------------- drawing --------------------
+
+    def draw_grid(self, stdscr, y, x, w, rows, cell: Callable[[str], Tuple[str, int]], focused, prefix_w=4):
+        # cell(name) -> (text, attr); columns are sized from the longest name
+        # rows is the most the grid may use; returns the rows actually used
+        cell_w = self.longest + prefix_w + 2
+        cols = max(1, (w - x - 1) // max(1, cell_w))
+        self._scroll(min(rows, (len(self.view) + cols - 1) // cols), cols)
+        if not self.view:
+            _put(stdscr, y, x, "(no match)" if self.filter else "(none)")
+            return 1
+        for i, name in self.visible():
+            r, c = divmod(i - self.top * cols, cols)
+            text, attr = cell(name)
+            if focused and i == self.cursor:
+                attr |= curses.A_REVERSE
+            _put(stdscr, y + r, x + c * cell_w, text[: max(0, w - x - c * cell_w - 1)], attr)
+        return self.rows
+
+    def draw_table(self, stdscr, y, x, w, rows, header: str, render: Callable[[List[str]], List[Tuple[str, int]]], focused):
+        # render(visible names) -> [(line, attr)]; only the window is rendered
+        _put(stdscr, y, x, header[: max(0, w - x - 1)], curses.A_UNDERLINE)
+        self._scroll(max(1, rows - 1), 1)
+        vis = self.visible()
+        if not vis:
+            _put(stdscr, y + 1, x, "(no match)" if self.filter else "(none)")
+            return 2
+        for (i, _name), (line, attr) in zip(vis, render([n for _, n in vis])):
+            if focused and i == self.cursor:
+                attr |= curses.A_REVERSE
+            _put(stdscr, y + 1 + i - self.top, x, line[: max(0, w - x - 1)], attr)
+        return 1 + self.rows
+
+    # -------------------- filter box --------------------
+
+    def edit_filter(self, stdscr, redraw: Callable[[], None], y: int, x: int = 2):
+        # Live filter: every key re-filters and redraws. Enter keeps, Esc clears.
+        text = self.filter
+        try: curses.curs_set(1)
+        except curses.error: pass
+        try:
+            while True:
+                self.set_filter(text)
+                redraw()
+                h, w = stdscr.getmaxyx()
+                _put(stdscr, y, x, f"Filter: {text}"[: max(0, w - x - 1)], curses.A_BOLD)
+                try: stdscr.clrtoeol()
+                except curses.error: pass
+                k = stdscr.getch()
+                if k in (10, 13, curses.KEY_ENTER):
+                    return
+                if k == 27:
+                    self.set_filter("")
+                    return
+                if k in BACKSPACE_KEYS:
+                    text = text[:-1]
+                elif 32 <= k < 127:
+                    text += chr(k)
+        finally:
+            try: curses.curs_set(0)
+            except curses.error: pass
+
+def summary_line(label: str, names: Sequence[str], width: int) -> str:
+    # "label (n): a b c … +k more" cut to one screen line
+    if not names:
+        return f"{label}: (none)"
+    head = f"{label} ({len(names)}): "
+    out, used = [], len(head)
+    for i, n in enumerate(names):
+        more = f" … +{len(names) - i} more"
+        if used + len(n) + 1 + (len(more) if i < len(names) - 1 else 0) > width:
+            return head + " ".join(out) + more
+        out.append(n)
+        used += len(n) + 1
+    return head + " ".join(out)
@@ -0,0 +1,112 @@
+# diagnostics/startup_bench.py
+# Startup budget for IMPACT.py. Exits 1 if a check fails:
+#   - importing IMPACT must not pull in any submenu module (they load lazily)
+#   - median import time of IMPACT must stay under --import-budget-ms
+#   - median time-to-first-frame (spawn -> main menu title on a pty) must
+#     stay under --frame-budget-ms
+# Usage: python3 diagnostics/startup_bench.py [--runs 5] [--import-budget-ms 150] [--frame-budget-ms 800]
+import os
+import sys
+import pty
+import time
+import fcntl
+import select
+import struct
+import termios
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPACT_PY = os.path.join(ROOT_DIR, "IMPACT.py")
+SUBMENU_MODULES = ("impact_setup_pdb", "impact_setup_namd", "impact_run_namd", "impact_run_gamd", "impact_config_editor")
+FRAME_MARKER = b"Interactive Molecular"
+ROWS, COLS = 30, 100
+
+IMPORT_PROBE = r"""
+import sys, time, json
+sys.path.insert(0, sys.argv[1])
+t0 = time.perf_counter()
+import IMPACT
+dt = time.perf_counter() - t0
+print(json.dumps({"sec": dt, "loaded": sorted(m for m in sys.modules if m.startswith("impact_"))}))
+"""
+
+def measure_import():
+    import json
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE, ROOT_DIR], capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+def measure_first_frame(timeout=10.0):
+    # Time from spawn until the main menu title reaches the terminal
+    master, slave = pty.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", ROWS, COLS, 0, 0))
+    env = dict(os.environ, TERM=os.environ.get("TERM") or "xterm-256color")
+    t0 = time.perf_counter()
+    p = subprocess.Popen([sys.executable, IMPACT_PY], stdin=slave, stdout=slave, stderr=slave,
+                         cwd=ROOT_DIR, env=env, start_new_session=True)
+    os.close(slave)
+    buf = b""
+    dt = None
+    try:
+        while time.perf_counter() - t0 < timeout:
+            r, _, _ = select.select([master], [], [], 0.05)
+            if r:
+                try:
+                    chunk = os.read(master, 65536)
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                buf += chunk
+                if FRAME_MARKER in buf:
+                    dt = time.perf_counter() - t0
+                    break
+            elif p.poll() is not None:
+                break
+        try:
+            os.write(master, b"q")
+        except OSError:
+            pass
+        try:
+            p.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            p.kill()
+            p.wait()
+    finally:
+        os.close(master)
+    return dt
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="IMPACT.py startup budget")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--import-budget-ms", type=float, default=150.0)
+    ap.add_argument("--frame-budget-ms", type=float, default=800.0)
+    args = ap.parse_args(argv)
+    failed = False
+
+    imports = [measure_import() for _ in range(max(1, args.runs))]
+    eager = sorted(set(m for r in imports for m in r["loaded"]) & set(SUBMENU_MODULES))
+    imp_ms = statistics.median(r["sec"] for r in imports) * 1000
+    print(f"import IMPACT:      {imp_ms:7.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    if eager:
+        print(f"  FAIL: submenus imported at startup: {', '.join(eager)}")
+        failed = True
+    if imp_ms > args.import_budget_ms:
+        print("  FAIL: import time over budget")
+        failed = True
+
+    frames = [measure_first_frame() for _ in range(max(1, args.runs))]
+    if any(f is None for f in frames):
+        print("time to first frame: main menu never drawn")
+        return 1
+    frame_ms = statistics.median(frames) * 1000
+    print(f"time to first frame: {frame_ms:6.1f} ms (budget {args.frame_budget_ms:.0f} ms)")
+    if frame_ms > args.frame_budget_ms:
+        print("  FAIL: time to first frame over budget")
+        failed = True
+    print("FAIL" if failed else "OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# tests/conftest.py
+# The tools live as flat modules in bin/ and import each other by name.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bin"))
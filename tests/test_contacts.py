@@ -0,0 +1,30 @@
+# tests/test_contacts.py
+# Cell-list neighbour search against brute force (impact_contacts).
+import numpy as np
+import pytest
+
+from impact_contacts import neighbor_pairs
+
+def brute(a, b, cutoff, box=None):
+    d = a[:, None, :] - b[None, :, :]
+    if box is not None:
+        d -= box * np.round(d / box)
+    i, j = np.nonzero((d ** 2).sum(-1) < cutoff * cutoff)
+    return set(zip(i.tolist(), j.tolist()))
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_periodic_pairs_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    box = np.array([31.0, 27.5, 40.0])
+    # Atoms straddling the cell edges, some outside the primary cell
+    a = rng.uniform(-5, 36, (300, 3)) % (box + 5)
+    b = rng.uniform(-5, 36, (250, 3))
+    i, j = neighbor_pairs(a.astype(np.float32), b.astype(np.float32), 4.5, box)
+    assert set(zip(i.tolist(), j.tolist())) == brute(a, b, 4.5, box)
+
+def test_open_boundaries_match_brute_force():
+    rng = np.random.default_rng(5)
+    a = rng.uniform(0, 30, (200, 3))
+    b = rng.uniform(10, 40, (200, 3))
+    i, j = neighbor_pairs(a, b, 4.5)
+    assert set(zip(i.tolist(), j.tolist())) == brute(a, b, 4.5)
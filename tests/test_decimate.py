@@ -0,0 +1,82 @@
+# tests/test_decimate.py
+# .qtrj frame codec and file layout (impact_decimate).
+import struct
+
+import numpy as np
+import pytest
+
+import impact_decimate as qt
+
+def write_dcd(path, frames, cells=None):
+    # Minimal CHARMM-style DCD: frames (nframes, natoms, 3), cells (nframes, 6)
+    def rec(f, b):
+        f.write(struct.pack("<i", len(b)))
+        f.write(b)
+        f.write(struct.pack("<i", len(b)))
+    n = frames.shape[1]
+    icntrl = [len(frames), 0, 1, len(frames), 0, 0, 0, 0, 0, 0, 1 if cells is not None else 0] + [0] * 8 + [24]
+    with open(path, "wb") as f:
+        rec(f, b"CORD" + struct.pack("<9i", *icntrl[:9]) + struct.pack("<f", 0.04) + struct.pack("<10i", *icntrl[10:]))
+        rec(f, struct.pack("<i", 1) + b"REMARKS test".ljust(80))
+        rec(f, struct.pack("<i", n))
+        for i, fr in enumerate(frames):
+            if cells is not None:
+                rec(f, np.asarray(cells[i], "<f8").tobytes())
+            for ax in range(3):
+                rec(f, np.asarray(fr[:, ax], "<f4").tobytes())
+
+def test_frame_round_trip_within_half_precision():
+    rng = np.random.default_rng(1)
+    xyz = np.cumsum(rng.normal(0, 1.5, (1000, 3)), axis=0) + 50.0
+    for precision in (0.01, 0.001):
+        blob = qt.encode_frame(xyz, precision)
+        back = qt.decode_frame(blob, len(xyz), precision).T
+        assert np.abs(back - xyz).max() <= precision / 2 + 1e-4
+
+def test_small_steps_stay_int16():
+    xyz = np.cumsum(np.full((500, 3), 1.2), axis=0)
+    assert qt.encode_frame(xyz, 0.01)[0] == 2
+
+def test_large_jumps_switch_to_int32():
+    xyz = np.array([[0.0, 0.0, 0.0], [400.0, -400.0, 1.0], [0.5, 0.5, 0.5]])
+    blob = qt.encode_frame(xyz, 0.01)
+    assert blob[0] == 4
+    assert np.abs(qt.decode_frame(blob, 3, 0.01).T - xyz).max() <= 0.005 + 1e-4
+
+def test_decode_rejects_wrong_atom_count():
+    blob = qt.encode_frame(np.zeros((10, 3)))
+    with pytest.raises(qt.QTrajError):
+        qt.decode_frame(blob, 11)
+
+@pytest.fixture
+def qtrj(tmp_path):
+    rng = np.random.default_rng(2)
+    frames = rng.uniform(0, 60, (12, 40, 3))
+    cells = np.tile([60.0, 90.0, 61.0, 90.0, 90.0, 62.0], (12, 1))
+    dcd = tmp_path / "seg.dcd"
+    write_dcd(str(dcd), frames, cells)
+    keep = np.arange(0, 40, 2, dtype=np.int32)
+    out = tmp_path / "run-solute.qtrj"
+    nf, _ = qt._write(str(out), [("NPT1", str(dcd))], keep, 3, 0.01, 6, {"sources": []})
+    assert nf == 4
+    return out, frames, keep
+
+def test_file_index_and_random_access(qtrj):
+    out, frames, keep = qtrj
+    with qt.QTrajFile(str(out)) as q:
+        assert len(q) == 4 and q.natoms == len(keep)
+        assert np.array_equal(q.atom_indices, keep)
+        assert q.source(3) == ("NPT1", 9)
+        assert np.allclose(q.boxes()[0], [60.0, 61.0, 62.0])
+        fr = q.frame(-1)
+        assert np.abs(fr.xyz() - frames[9][keep]).max() <= 0.005 + 1e-4
+        x, _y, _z = q.coords(1, None, 2)
+        assert np.abs(x - frames[[3, 9]][:, keep, 0]).max() <= 0.005 + 1e-4
+
+@pytest.mark.parametrize("cut", [-1, -30, 4])
+def test_truncated_file_is_rejected(qtrj, cut):
+    out, _frames, _keep = qtrj
+    data = out.read_bytes()
+    out.write_bytes(data[:cut])
+    with pytest.raises(qt.QTrajError):
+        qt.QTrajFile(str(out))
@@ -0,0 +1,22 @@
+# tests/test_logs.py
+# LogFollower across appends and in-place rewrites.
+import os
+
+from impact_logs import LogFollower
+
+def test_append_then_rewrite_past_old_offset(tmp_path):
+    log = tmp_path / "IMPACT_x.out"
+    log.write_text("".join(f"old {i}\n" for i in range(20)))
+    lf = LogFollower(str(log))
+    assert lf.tail(n=2) == ["old 18", "old 19"]
+    with open(log, "a") as f:
+        f.write("old 20\n")
+    assert lf.last() == "old 20"
+    ino = os.stat(log).st_ino
+    # The job is resubmitted: same file truncated, then grows past the old offset unseen
+    with open(log, "r+") as f:
+        f.truncate(0)
+        f.write("".join(f"new {i}\n" for i in range(40)))
+    assert os.stat(log).st_ino == ino
+    tail = lf.tail(n=100)
+    assert tail[0] == "new 0" and tail[-1] == "new 39" and len(tail) == 40
@@ -0,0 +1,32 @@
+# tests/test_namdlog.py
+# LogProgress following a stage log across appends and in-place rewrites.
+import os
+
+from impact_namdlog import LogProgress
+
+def _timing(step):
+    return f"TIMING: {step}  CPU: 1.0, 0.01/step  Wall: 1.0, 0.01/step, 0.1 hours remaining\n"
+
+def test_append_is_read_incrementally(tmp_path):
+    log = tmp_path / "stage.log"
+    log.write_text("Info: TIMESTEP 2\n" + _timing(100))
+    lp = LogProgress(str(log))
+    assert lp.poll().step == 100
+    with open(log, "a") as f:
+        f.write(_timing(200))
+    assert lp.poll().step == 200
+
+def test_truncate_then_regrow_resets(tmp_path):
+    log = tmp_path / "stage.log"
+    log.write_text("Info: TIMESTEP 2\n" + "".join(_timing(s) for s in range(100, 5100, 100)) + "WallClock: 50.0\n")
+    lp = LogProgress(str(log))
+    p = lp.poll()
+    assert p.step == 5000 and p.done
+    ino = os.stat(log).st_ino
+    # Rerun with > into the same file, grown past the old offset before the next poll
+    with open(log, "r+") as f:
+        f.truncate(0)
+        f.write("Info: TIMESTEP 2\n" + "Info: padding line for the new run\n" * 200 + _timing(100))
+    assert os.stat(log).st_ino == ino and os.path.getsize(log) > lp._offset
+    p = lp.poll()
+    assert p.step == 100 and not p.done and not p.failed